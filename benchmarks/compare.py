@@ -0,0 +1,80 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    with path.open("r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def compare_results(
+    baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    """Return one row per benchmark present in both files with the relative median change."""
+    rows: List[Dict[str, Any]] = []
+    base_results = baseline.get("results", {})
+    cand_results = candidate.get("results", {})
+    for name in sorted(set(base_results) & set(cand_results)):
+        base, cand = base_results[name], cand_results[name]
+        if "median_s" not in base or "median_s" not in cand:
+            continue
+        change = (cand["median_s"] - base["median_s"]) / base["median_s"] if base["median_s"] else 0.0
+        rows.append(
+            {
+                "benchmark": name,
+                "baseline_s": base["median_s"],
+                "candidate_s": cand["median_s"],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def _warn_on_param_mismatch(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> None:
+    base_params = baseline.get("metadata", {}).get("params", {})
+    cand_params = candidate.get("metadata", {}).get("params", {})
+    if base_params != cand_params:
+        print(f"[WARN] Benchmark parameters differ: {base_params} vs {cand_params}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative median slowdown treated as a regression (0.10 = 10%%).",
+    )
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    _warn_on_param_mismatch(baseline, candidate)
+    rows = compare_results(baseline, candidate, args.threshold)
+
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(
+            f"{row['benchmark']:<28} {row['baseline_s'] * 1000:>10.2f} ms -> "
+            f"{row['candidate_s'] * 1000:>10.2f} ms  {row['change']:+.1%}  {flag}"
+        )
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
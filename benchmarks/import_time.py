@@ -0,0 +1,110 @@
+"""Startup-time regression check for the CLI entry points based on ``python -X importtime``.
+
+Fails (exit code 1) when importing a module pulls in a heavy dependency that
+should only load inside the stage that needs it, or when the cumulative
+import time exceeds ``--budget-ms``.
+
+Usage::
+
+    python -m benchmarks.import_time --module run_pipelines --budget-ms 300
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = [
+    "autogluon",
+    "torch",
+    "mlflow",
+    "boto3",
+    "botocore",
+    "sklearn",
+    "pandas",
+    "zenml",
+    "presidio_analyzer",
+]
+
+
+def measure_imports(module: str) -> Dict[str, int]:
+    """Return cumulative import time in microseconds for every module imported by ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def check_module(module: str, forbidden: List[str], budget_ms: float | None) -> Dict[str, object]:
+    cumulative = measure_imports(module)
+    total_ms = cumulative.get(module, 0) / 1000.0
+    loaded_heavy = sorted(
+        {name.split(".")[0] for name in cumulative if name.split(".")[0] in forbidden}
+    )
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:15]
+    return {
+        "module": module,
+        "total_ms": total_ms,
+        "heavy_modules_loaded": loaded_heavy,
+        "over_budget": budget_ms is not None and total_ms > budget_ms,
+        "slowest": [{"module": name, "cumulative_ms": us / 1000.0} for name, us in slowest],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check CLI import time and eager heavy imports.")
+    parser.add_argument(
+        "--module",
+        action="append",
+        default=None,
+        help="Module to import (repeatable). Defaults to run_pipelines and run_zenml_pipeline.",
+    )
+    parser.add_argument("--budget-ms", type=float, default=None, help="Max cumulative import time.")
+    parser.add_argument(
+        "--allow",
+        action="append",
+        default=[],
+        help="Heavy top-level package allowed at import time (repeatable).",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON report path.")
+    args = parser.parse_args()
+
+    modules = args.module or ["run_pipelines", "run_zenml_pipeline"]
+    forbidden = [name for name in HEAVY_MODULES if name not in args.allow]
+    reports = [check_module(module, forbidden, args.budget_ms) for module in modules]
+
+    failed = False
+    for report in reports:
+        status = "ok"
+        if report["heavy_modules_loaded"]:
+            status = f"eager heavy imports: {', '.join(report['heavy_modules_loaded'])}"
+            failed = True
+        if report["over_budget"]:
+            status = f"{status}; over budget" if status != "ok" else "over budget"
+            failed = True
+        print(f"{report['module']:<24} {report['total_ms']:>8.1f} ms  {status}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(reports, indent=2), encoding="utf-8")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
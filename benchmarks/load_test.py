@@ -0,0 +1,348 @@
+"""Replay JSONL prediction requests against a predictor and report latency percentiles.
+
+Each line of the request log is one ``POST /predict`` body: ``{"rows": [...]}``,
+a bare list of rows, or a single row object. ``--record N`` writes such a log
+from the processed test partition. Requests go either straight to a registry
+predictor in this process or over HTTP to ``run_pipelines.py --pipeline serve``.
+
+Closed loop: ``--concurrency`` clients, each sending its next request as soon
+as the previous one returns. Open loop: requests are issued at ``--rate`` per
+second regardless of completions, and latency is measured from the scheduled
+send time, so queueing delay is not hidden (no coordinated omission).
+
+Usage::
+
+    python -m benchmarks.load_test --record 500
+    python -m benchmarks.load_test --mode open --rate 200 --duration 30
+    python -m benchmarks.load_test --target http --url http://127.0.0.1:8080 --concurrency 16
+    python -m benchmarks.load_test --compare-versions previous current
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from urllib.parse import urlparse
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.run_benchmarks import _git_commit  # noqa: E402
+
+DEFAULT_REQUESTS = Path("artifacts/loadtest/requests.jsonl")
+PERCENTILES = {"p50": 50, "p95": 95, "p99": 99, "p999": 99.9}
+
+
+def load_requests(path: Path) -> List[List[Dict[str, Any]]]:
+    """Rows of every request in a JSONL log."""
+    requests: List[List[Dict[str, Any]]] = []
+    with path.open("r", encoding="utf-8") as fp:
+        for line_no, line in enumerate(fp, 1):
+            if not line.strip():
+                continue
+            payload = json.loads(line)
+            rows = payload.get("rows", [payload]) if isinstance(payload, dict) else payload
+            if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+                raise ValueError(f"{path}:{line_no}: expected rows as JSON objects")
+            requests.append(rows)
+    if not requests:
+        raise ValueError(f"No requests in {path}")
+    return requests
+
+
+def record_requests(
+    processed_path: str, label_column: str, output: Path, count: int, batch_size: int = 1, seed: int = 42
+) -> Path:
+    """Sample ``count`` requests of ``batch_size`` rows from the processed test partition."""
+    from src.data.load_data import load_processed_partition
+
+    test_df = load_processed_partition(processed_path, "test").drop(columns=[label_column], errors="ignore")
+    rng = np.random.default_rng(seed)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as fp:
+        for _ in range(count):
+            sample = test_df.iloc[rng.integers(0, len(test_df), size=batch_size)]
+            fp.write(json.dumps({"rows": json.loads(sample.to_json(orient="records"))}) + "\n")
+    print(f"[INFO] Recorded {count} requests to {output}")
+    return output
+
+
+def in_process_target(predictor: Any) -> Callable[[List[Dict[str, Any]]], Any]:
+    import pandas as pd
+
+    return lambda rows: predictor.predict(pd.DataFrame.from_records(rows))
+
+
+def http_target(url: str, timeout: float = 30.0) -> Callable[[List[Dict[str, Any]]], Any]:
+    """POST to ``<url>/predict`` over one keep-alive connection per client thread."""
+    parsed = urlparse(url)
+    local = threading.local()
+
+    def _call(rows: List[Dict[str, Any]]) -> Any:
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+        body = json.dumps({"rows": rows})
+        try:
+            conn.request("POST", "/predict", body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            local.conn = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {data[:200]!r}")
+        return data
+
+    return _call
+
+
+def summarize(latencies_ms: List[float], errors: int, wall_s: float) -> Dict[str, Any]:
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    summary: Dict[str, Any] = {
+        "requests": int(values.size + errors),
+        "completed": int(values.size),
+        "errors": int(errors),
+        "wall_s": wall_s,
+        "throughput_rps": values.size / wall_s if wall_s > 0 else 0.0,
+    }
+    if values.size:
+        summary.update({name: float(np.percentile(values, q)) for name, q in PERCENTILES.items()})
+        summary.update({"mean": float(values.mean()), "max": float(values.max())})
+        edges = np.logspace(np.log10(max(values.min(), 1e-3)), np.log10(values.max() * 1.0001), 21)
+        counts, edges = np.histogram(values, bins=edges)
+        summary["histogram_ms"] = {"edges": edges.tolist(), "counts": counts.tolist()}
+    return summary
+
+
+def run_closed_loop(
+    call: Callable[[List[Dict[str, Any]]], Any],
+    requests: List[List[Dict[str, Any]]],
+    concurrency: int,
+    duration_s: float,
+    max_requests: int | None,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(max_requests or sys.maxsize))
+    deadline = time.perf_counter() + duration_s
+
+    def _client() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            start = time.perf_counter()
+            try:
+                call(requests[index % len(requests)])
+            except Exception:  # pylint: disable=broad-except
+                with lock:
+                    errors += 1
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=_client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def run_open_loop(
+    call: Callable[[List[Dict[str, Any]]], Any],
+    requests: List[List[Dict[str, Any]]],
+    rate: float,
+    duration_s: float,
+    max_requests: int | None,
+    max_in_flight: int,
+) -> Dict[str, Any]:
+    total = int(rate * duration_s)
+    if max_requests:
+        total = min(total, max_requests)
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def _send(index: int, scheduled: float) -> None:
+        nonlocal errors
+        try:
+            call(requests[index % len(requests)])
+        except Exception:  # pylint: disable=broad-except
+            with lock:
+                errors += 1
+            return
+        elapsed = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for index in range(total):
+            scheduled = start + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(_send, index, scheduled)
+    result = summarize(latencies, errors, time.perf_counter() - start)
+    result["target_rps"] = rate
+    return result
+
+
+def run_load(call: Callable[[List[Dict[str, Any]]], Any], requests: List[List[Dict[str, Any]]], args) -> Dict[str, Any]:
+    for rows in requests[: args.warmup]:
+        call(rows)
+    if args.mode == "open":
+        return run_open_loop(call, requests, args.rate, args.duration, args.max_requests, args.max_in_flight)
+    return run_closed_loop(call, requests, args.concurrency, args.duration, args.max_requests)
+
+
+def _resolve_version(registry_dir: str, name: str) -> str:
+    from src.serving.registry import list_versions, read_current
+
+    versions = list_versions(registry_dir)
+    current = read_current(registry_dir)
+    if name == "current":
+        if current is None:
+            raise ValueError(f"No published version in {registry_dir}")
+        return current
+    if name == "previous":
+        older = [v for v in versions if current is None or v < current]
+        if not older:
+            raise ValueError(f"No version older than {current} in {registry_dir}")
+        return older[-1]
+    if name not in versions:
+        raise ValueError(f"Unknown version {name}; available: {versions}")
+    return name
+
+
+def _load_version(registry_dir: str, version: str, serving_cfg: Dict[str, Any], use_cache: bool) -> Any:
+    from src.serving.onnx_runtime import load_serving_predictor
+    from src.serving.registry import versions_root
+
+    cache_cfg = serving_cfg.get("cache") if use_cache else None
+    return load_serving_predictor(versions_root(registry_dir) / version, cache_config=cache_cfg)
+
+
+def _print_summary(label: str, summary: Dict[str, Any]) -> None:
+    if not summary.get("completed"):
+        print(f"[LOAD] {label}: no successful requests ({summary['errors']} errors)")
+        return
+    print(
+        f"[LOAD] {label}: {summary['throughput_rps']:.1f} req/s, "
+        + ", ".join(f"{name} {summary[name]:.2f} ms" for name in PERCENTILES)
+        + f", errors {summary['errors']}"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay prediction requests and measure serving latency.")
+    parser.add_argument("--config", default="src/config/config.yaml", help="Pipeline config.")
+    parser.add_argument("--requests", type=Path, default=DEFAULT_REQUESTS, help="JSONL request log.")
+    parser.add_argument("--record", type=int, default=0, help="First write N requests from the test partition.")
+    parser.add_argument("--record-batch-size", type=int, default=1, help="Rows per recorded request.")
+    parser.add_argument("--target", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="Server URL for --target http.")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=4, help="Clients in closed-loop mode.")
+    parser.add_argument("--rate", type=float, default=100.0, help="Requests per second in open-loop mode.")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Open-loop sender threads.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run.")
+    parser.add_argument("--max-requests", type=int, default=None, help="Stop after this many requests.")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests sent first.")
+    parser.add_argument("--version", default="current", help="Registry version for in-process runs.")
+    parser.add_argument(
+        "--compare-versions",
+        nargs=2,
+        metavar=("BASELINE", "CANDIDATE"),
+        help="Run the same workload against two registry versions in-process ('current'/'previous' allowed).",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=(
+            "Enable the prediction cache in-process. Off by default: the replay cycles a fixed request "
+            "set, so cached runs measure LRU hits rather than the model."
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("benchmarks/results/load_test.json"),
+        help="Where to write the JSON report.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    from src.utils.config_loader import load_config, thaw
+
+    args = parse_args()
+    cfg = load_config(args.config)
+    registry_dir = cfg["paths"]["registry_dir"]
+    serving_cfg = thaw(cfg.get("serving", {}))
+    if args.record:
+        record_requests(
+            cfg["paths"]["processed_data"], cfg["training"]["label_column"], args.requests, args.record, args.record_batch_size
+        )
+    requests = load_requests(args.requests)
+
+    report: Dict[str, Any] = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "git_commit": _git_commit(),
+        "cpu_count": os.cpu_count(),
+        "requests_file": str(args.requests),
+        "distinct_requests": len(requests),
+        "params": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("config", "requests", "output", "record", "record_batch_size")
+        },
+        "runs": {},
+    }
+    if args.target == "http":
+        report["runs"][args.url] = run_load(http_target(args.url), requests, args)
+    else:
+        names = args.compare_versions or [args.version]
+        for name in names:
+            version = _resolve_version(registry_dir, name)
+            predictor = _load_version(registry_dir, version, serving_cfg, args.cache)
+            report["runs"][version] = run_load(in_process_target(predictor), requests, args)
+        if args.compare_versions and len(report["runs"]) == 2:
+            baseline, candidate = report["runs"].values()
+            report["comparison"] = {
+                name: (candidate[name] - baseline[name]) / baseline[name] if baseline.get(name) else None
+                for name in (*PERCENTILES, "throughput_rps")
+                if name in baseline and name in candidate
+            }
+    for label, summary in report["runs"].items():
+        _print_summary(label, summary)
+    for name, change in (report.get("comparison") or {}).items():
+        if change is not None:
+            print(f"[COMPARE] {name}: {change:+.1%}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    print(f"[INFO] Load test report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
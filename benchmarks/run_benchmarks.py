@@ -0,0 +1,294 @@
+"""Run the pipeline hot-path benchmarks offline and write a JSON result file.
+
+Usage::
+
+    python -m benchmarks.run_benchmarks --rows 50000 --cols 40 --output bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.synthetic import make_dataset, make_model_dir, make_processed_dataset  # noqa: E402
+
+
+class StubPredictor:
+    """Predictor stand-in: thresholds the first numeric column, no model load."""
+
+    def __init__(self, column: str) -> None:
+        self.column = column
+
+    def predict(self, df):
+        return (df[self.column].fillna(0) > 0).astype(int)
+
+
+def _time_call(
+    func: Callable[[], Any], repeats: int, warmup: int = 1, setup: Callable[[], Any] | None = None
+) -> Dict[str, Any]:
+    """Time ``func``; ``setup`` runs untimed before every call (e.g. to drop a cache)."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    samples: List[float] = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        "repeats": repeats,
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "max_s": max(samples),
+    }
+
+
+def _package_versions(names: List[str]) -> Dict[str, str]:
+    import importlib.metadata
+
+    versions = {}
+    for name in names:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = "missing"
+    return versions
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, check=True, text=True
+        )
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def machine_metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "packages": _package_versions(
+            ["pandas", "numpy", "scikit-learn", "mlflow", "autogluon.tabular", "pyarrow"]
+        ),
+        "params": {
+            "rows": args.rows,
+            "cols": args.cols,
+            "object_ratio": args.object_ratio,
+            "pii_rate": args.pii_rate,
+            "repeats": args.repeats,
+            "seed": args.seed,
+            "model_files": args.model_files,
+            "model_file_size": args.model_file_size,
+        },
+    }
+
+
+def _configure_offline_mlflow(workdir: Path) -> None:
+    os.environ["MLFLOW_TRACKING_URI"] = f"file:{workdir / 'mlruns'}"
+    os.environ["MLFLOW_BACKEND_URI"] = f"file:{workdir / 'mlruns'}"
+    os.environ["AUTO_START_MLFLOW_SERVER"] = "false"
+    os.environ.pop("MLFLOW_ARTIFACT_ROOT", None)
+    # Keep the metrics store and blob index/cache of the evaluate benchmark out of the repo.
+    os.environ["MLOPS_METRICS_STORE"] = str(workdir / "metrics_store.sqlite")
+    os.environ["MLOPS_BLOB_INDEX"] = str(workdir / "blob_index.sqlite")
+    os.environ["MLOPS_BLOB_CACHE"] = str(workdir / "blob_cache")
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="mlops_bench_"))
+    try:
+        return _run_benchmarks(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _run_benchmarks(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    _configure_offline_mlflow(workdir)
+
+    raw_df = make_dataset(
+        args.rows, args.cols, args.object_ratio, pii_rate=args.pii_rate, seed=args.seed
+    )
+    raw_path = workdir / "raw.csv"
+    raw_df.to_csv(raw_path, index=False)
+    processed_df = make_processed_dataset(raw_df, seed=args.seed)
+    processed_path = workdir / "processed.csv"
+    processed_df.to_csv(processed_path, index=False)
+    model_dir = make_model_dir(workdir / "model", args.model_files, args.model_file_size, args.seed)
+
+    results: Dict[str, Any] = {}
+
+    def bench(
+        name: str, factory: Callable[[], Callable[[], Any]], setup: Callable[[], Any] | None = None
+    ) -> None:
+        try:
+            func = factory()
+        except ImportError as exc:
+            results[name] = {"skipped": f"missing dependency: {exc}"}
+            print(f"[SKIP] {name}: {exc}")
+            return
+        results[name] = _time_call(func, args.repeats, setup=setup)
+        print(f"[BENCH] {name}: median {results[name]['median_s'] * 1000:.2f} ms")
+
+    def load_raw():
+        from src.data.load_data import load_raw_data
+
+        return lambda: load_raw_data(str(raw_path))
+
+    def preprocess():
+        from src.data.preprocess import preprocess_data
+
+        return lambda: preprocess_data(raw_df.copy(), "target", 0.2, args.seed)
+
+    def data_checks():
+        from src.steps.security.owasp_checks import run_data_security_checks
+
+        return lambda: run_data_security_checks(str(processed_path))
+
+    def model_hash():
+        from src.steps.security.model_integrity import _calculate_hash
+
+        return lambda: _calculate_hash(str(model_dir))
+
+    def dependency_scan():
+        from src.steps.security.dependency_scan import scan_dependencies
+
+        requirements = str(ROOT_DIR / "requirements.txt")
+        config = {
+            "osv_path": str(ROOT_DIR / "data" / "osv"),
+            "index_path": str(workdir / "osv_index.sqlite"),
+            "cache_path": str(scan_cache),
+        }
+        return lambda: scan_dependencies(requirements, config=config)
+
+    # The result cache is dropped before every repeat so each one is a real scan
+    # (the OSV index stays warm, as it does between pipeline runs).
+    scan_cache = workdir / "dependency_scan_cache.json"
+
+    eval_runs: List[str] = []
+
+    def evaluate():
+        from src.training.evaluate import evaluate_model
+        from src.utils import mlflow_utils
+
+        predictor = StubPredictor(next(c for c in raw_df.columns if c.startswith("num_")))
+        run = mlflow_utils.start_run("benchmarks", run_name="bench-evaluate")
+        eval_runs.append(run.info.run_id)
+
+        def _call():
+            evaluate_model(
+                predictor=predictor,
+                processed_path=str(processed_path),
+                label_column="target",
+                experiment_name="benchmarks",
+                output_dir=str(workdir / "eval"),
+                run_id=run.info.run_id,
+            )
+
+        return _call
+
+    bench("load_raw_data", load_raw)
+    bench("preprocess_data", preprocess)
+    bench("run_data_security_checks", data_checks)
+    bench("model_integrity_hash", model_hash)
+    bench("scan_dependencies", dependency_scan, setup=lambda: scan_cache.unlink(missing_ok=True))
+    try:
+        bench("evaluate_model_stub", evaluate)
+    finally:
+        if eval_runs:
+            from src.utils import mlflow_utils
+
+            mlflow_utils.end_run(eval_runs[0])
+    if args.with_predictor:
+        results.update(_bench_predictor(processed_df, workdir, args))
+
+    return {"metadata": machine_metadata(args), "results": results}
+
+
+def _bench_predictor(processed_df, workdir: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    """Fit a tiny LightGBM-only predictor, then time load and predict latency."""
+    try:
+        from autogluon.tabular import TabularPredictor
+    except ImportError as exc:
+        print(f"[SKIP] predictor benchmarks: {exc}")
+        return {"predictor_load": {"skipped": f"missing dependency: {exc}"}}
+
+    train_df = processed_df[processed_df["split"] == "train"].drop(columns=["split"])
+    test_df = processed_df[processed_df["split"] == "test"].drop(columns=["split", "target"])
+    model_path = workdir / "predictor"
+    TabularPredictor(label="target", path=str(model_path), verbosity=0).fit(
+        train_df, hyperparameters={"GBM": {}}, time_limit=60
+    )
+
+    results = {"predictor_load": _time_call(lambda: TabularPredictor.load(str(model_path)), args.repeats)}
+    predictor = TabularPredictor.load(str(model_path))
+    single_row = test_df.head(1)
+    results["predict_single_row"] = _time_call(lambda: predictor.predict(single_row), args.repeats * 10)
+    results["predict_batch"] = _time_call(lambda: predictor.predict(test_df), args.repeats)
+    results["predict_batch"]["rows"] = len(test_df)
+    for name in ("predictor_load", "predict_single_row", "predict_batch"):
+        print(f"[BENCH] {name}: median {results[name]['median_s'] * 1000:.2f} ms")
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline hot paths on synthetic data.")
+    parser.add_argument("--rows", type=int, default=20000, help="Synthetic dataset rows.")
+    parser.add_argument("--cols", type=int, default=30, help="Synthetic feature columns.")
+    parser.add_argument(
+        "--object-ratio", type=float, default=0.2, help="Share of feature columns stored as strings."
+    )
+    parser.add_argument("--pii-rate", type=float, default=0.001, help="Share of string cells holding emails.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repetitions per benchmark.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data generation.")
+    parser.add_argument("--model-files", type=int, default=64, help="Files in the synthetic model dir.")
+    parser.add_argument(
+        "--model-file-size", type=int, default=1 << 20, help="Bytes per synthetic model file."
+    )
+    parser.add_argument(
+        "--with-predictor",
+        action="store_true",
+        help="Also fit a tiny AutoGluon predictor and time load/predict latency.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("benchmarks/results/latest.json"),
+        help="Where to write the JSON results.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    payload = run_benchmarks(args)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"[INFO] Benchmark results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Deterministic synthetic tabular data and model directories for benchmarks."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_WORDS = np.array(["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"])
+
+
+def make_dataset(
+    rows: int,
+    cols: int,
+    object_ratio: float = 0.2,
+    label_column: str = "target",
+    pii_rate: float = 0.0,
+    nan_rate: float = 0.01,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """Build a binary-classification frame with ``cols`` features, a share of them strings."""
+    rng = np.random.default_rng(seed)
+    n_object = int(round(cols * object_ratio))
+    n_numeric = cols - n_object
+    data = {}
+    numeric = rng.normal(size=(rows, n_numeric))
+    if nan_rate:
+        numeric[rng.random(numeric.shape) < nan_rate] = np.nan
+    for idx in range(n_numeric):
+        data[f"num_{idx}"] = numeric[:, idx]
+    for idx in range(n_object):
+        values = _WORDS[rng.integers(0, len(_WORDS), size=rows)].astype(object)
+        if pii_rate:
+            mask = rng.random(rows) < pii_rate
+            values[mask] = [f"user{i}@example.com" for i in np.flatnonzero(mask)]
+        data[f"cat_{idx}"] = values
+    df = pd.DataFrame(data)
+    signal = np.nan_to_num(numeric[:, 0]) if n_numeric else rng.normal(size=rows)
+    df[label_column] = (signal + rng.normal(scale=0.5, size=rows) > 0).astype(int)
+    return df
+
+
+def make_processed_dataset(df: pd.DataFrame, test_size: float = 0.2, seed: int = 42) -> pd.DataFrame:
+    """Attach the ``split`` column the way ``preprocess_data`` does, without sklearn."""
+    rng = np.random.default_rng(seed)
+    processed = df.copy()
+    processed["split"] = np.where(rng.random(len(df)) < test_size, "test", "train")
+    return processed
+
+
+def make_model_dir(root: Path, files: int, file_size: int, seed: int = 42) -> Path:
+    """Write ``files`` random binary files across nested folders, like a predictor tree."""
+    rng = np.random.default_rng(seed)
+    for idx in range(files):
+        path = root / f"models/model_{idx % 8}/part_{idx}.pkl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(rng.bytes(file_size))
+    return root
@@ -27,7 +27,7 @@ PY
 
 run_pipeline() {
   case "${PIPELINE}" in
-    data|train|deploy|all)
+    data|train|deploy|serve|all)
       python run_pipelines.py --pipeline "${PIPELINE}"
       ;;
     zenml_data)
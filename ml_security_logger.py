@@ -1,31 +1,258 @@
-"""Log Garak security scan metrics to MLflow."""
+"""Log aggregated security scan metrics (Bandit, Safety, Trivy, Presidio, others) to MLflow.
+
+Reports are streamed item by item (with ``ijson`` when installed) and reduced to
+per-tool aggregates such as severity counts instead of one metric per JSON leaf.
+Reports whose content hash matches the last ingested one are skipped; reports
+that fail to parse are skipped without recording their hash, so they are
+retried on the next run.
+"""
 from __future__ import annotations
 import argparse
+import hashlib
 import json
 import math
 import os
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
 
 from dotenv import load_dotenv
-import mlflow
+
+try:  # Optional: incremental parsing for very large reports.
+    import ijson
+except ImportError:  # pragma: no cover - fallback path
+    ijson = None
+
+# MLflow accepts at most 1000 metrics per log_batch call.
+BATCH_SIZE = 1000
+STATE_PATH = Path("artifacts/security/ingest_state.json")
 
 
 def _is_number(val: Any) -> bool:
-    return isinstance(val, (int, float)) and not math.isnan(val)
+    return isinstance(val, (int, float)) and not isinstance(val, bool) and not math.isnan(val)
+
+
+class ReportParseError(ValueError):
+    """A report is not valid JSON."""
+
+
+def _metric_key(*parts: str) -> str:
+    key = ".".join(str(part) for part in parts if part != "")
+    return "".join(ch if ch.isalnum() or ch in "_-./ " else "_" for ch in key)
+
+
+def _walk(obj: Any, path: List[str]) -> Iterator[Any]:
+    """In-memory equivalent of ``ijson.items(fp, prefix)`` for the json.load fallback."""
+    if not path:
+        yield obj
+        return
+    head, rest = path[0], path[1:]
+    if head == "item" and isinstance(obj, list):
+        for value in obj:
+            yield from _walk(value, rest)
+    elif isinstance(obj, dict) and head in obj:
+        yield from _walk(obj[head], rest)
+
+
+def iter_prefixed(path: Path, prefixes: Iterable[str]) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(prefix, object)`` for every object at any of ``prefixes`` in one pass over the file.
+
+    Prefixes use ijson syntax (e.g. ``results.item``) and must not nest in each
+    other. Raises ``ReportParseError`` when the file is not valid JSON.
+    """
+    wanted = set(prefixes)
+    if ijson is None:
+        try:
+            data = _load_json(path)
+        except ValueError as exc:
+            raise ReportParseError(f"{path}: {exc}") from exc
+        for prefix in wanted:
+            for obj in _walk(data, prefix.split(".") if prefix else []):
+                yield prefix, obj
+        return
+
+    with path.open("rb") as f:
+        builder = None
+        owner = ""
+        depth = 0
+        try:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is not None:
+                    builder.event(event, value)
+                    if event in ("start_map", "start_array"):
+                        depth += 1
+                    elif event in ("end_map", "end_array"):
+                        depth -= 1
+                        if depth == 0:
+                            yield owner, builder.value
+                            builder = None
+                elif prefix in wanted:
+                    if event in ("start_map", "start_array"):
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                        owner, depth = prefix, 1
+                    elif event not in ("map_key", "end_map", "end_array"):
+                        yield prefix, value
+        except (ijson.JSONError, UnicodeDecodeError) as exc:
+            raise ReportParseError(f"{path}: {exc}") from exc
+
+
+def iter_items(path: Path, prefix: str) -> Iterator[Any]:
+    """Yield the objects at ``prefix`` (ijson syntax, e.g. ``results.item``) without loading the file."""
+    for _, obj in iter_prefixed(path, [prefix]):
+        yield obj
+
+
+_last_loaded: Tuple[Tuple[str, int], Any] | None = None
+
+
+def _load_json(path: Path) -> Any:
+    """json.load fallback; keeps only the most recent file so repeated prefixes parse once."""
+    global _last_loaded
+    key = (str(path.resolve()), path.stat().st_mtime_ns)
+    if _last_loaded is None or _last_loaded[0] != key:
+        with path.open("r", encoding="utf-8") as f:
+            _last_loaded = (key, json.load(f))
+    return _last_loaded[1]
+
+
+def _severity_counts(items: Iterator[Dict[str, Any]], field: str, tool: str, group: str = "") -> Dict[str, float]:
+    counts: Counter[str] = Counter()
+    total = 0
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        total += 1
+        counts[str(item.get(field) or "UNKNOWN").upper()] += 1
+    metrics = {_metric_key(tool, group, "total"): float(total)}
+    for severity, count in counts.items():
+        metrics[_metric_key(tool, group, "severity", severity.lower())] = float(count)
+    return metrics
+
+
+def aggregate_bandit(path: Path) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    confidence: Counter[str] = Counter()
+    severity: Counter[str] = Counter()
+    total = 0
+    errors = 0
+    for prefix, item in iter_prefixed(path, ("results.item", "errors.item", "metrics._totals")):
+        if prefix == "results.item":
+            total += 1
+            severity[str(item.get("issue_severity", "UNKNOWN")).lower()] += 1
+            confidence[str(item.get("issue_confidence", "UNKNOWN")).lower()] += 1
+        elif prefix == "errors.item":
+            errors += 1
+        elif isinstance(item, dict) and _is_number(item.get("loc")):
+            metrics["bandit.loc"] = float(item["loc"])
+    metrics["bandit.issues.total"] = float(total)
+    metrics.update({f"bandit.issues.severity.{k}": float(v) for k, v in severity.items()})
+    metrics.update({f"bandit.issues.confidence.{k}": float(v) for k, v in confidence.items()})
+    metrics["bandit.errors"] = float(errors)
+    return metrics
+
+
+def aggregate_safety(path: Path) -> Dict[str, float]:
+    packages = set()
+
+    def _items() -> Iterator[Dict[str, Any]]:
+        for item in iter_items(path, "vulnerabilities.item"):
+            if isinstance(item, dict):
+                packages.add(str(item.get("package_name")))
+                yield item
+
+    metrics = _severity_counts(_items(), "severity", "safety", "vulnerabilities")
+    metrics["safety.vulnerabilities.packages"] = float(len(packages))
+    return metrics
+
 
+def aggregate_trivy(path: Path) -> Dict[str, float]:
+    metrics: Dict[str, float] = Counter()
+    targets = 0
+    # One Results entry per scan target; each is small compared to the whole report.
+    for result in iter_items(path, "Results.item"):
+        targets += 1
+        for group in ("Vulnerabilities", "Misconfigurations", "Secrets"):
+            for key, value in _severity_counts(
+                iter(result.get(group) or []), "Severity", "trivy", group.lower()
+            ).items():
+                metrics[key] += value
+    metrics["trivy.targets"] = float(targets)
+    return dict(metrics)
 
-def _flatten(prefix: str, obj: Any, out: Dict[str, float]) -> None:
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            key = f"{prefix}.{k}" if prefix else str(k)
-            _flatten(key, v, out)
-    elif isinstance(obj, list):
-        for idx, v in enumerate(obj):
-            key = f"{prefix}[{idx}]"
-            _flatten(key, v, out)
-    elif _is_number(obj):
-        out[prefix] = float(obj)
+
+def aggregate_presidio(path: Path) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    detections = 0
+    for prefix, value in iter_prefixed(path, ("total_rows_scanned", "entity_counts", "detections.item")):
+        if prefix == "total_rows_scanned" and _is_number(value):
+            metrics["presidio.rows_scanned"] = float(value)
+        elif prefix == "entity_counts" and isinstance(value, dict):
+            for entity, count in value.items():
+                metrics[_metric_key("presidio", "entities", entity.lower())] = float(count)
+        elif prefix == "detections.item":
+            detections += 1
+    metrics["presidio.detections"] = float(detections)
+    return metrics
+
+
+def aggregate_generic(path: Path) -> Dict[str, float]:
+    """Top-level numbers and list lengths only; nested items are never flattened."""
+    metrics: Dict[str, float] = {}
+    for data in iter_items(path, ""):
+        if not isinstance(data, dict):
+            continue
+        for key, value in data.items():
+            if _is_number(value):
+                metrics[_metric_key(path.stem, key)] = float(value)
+            elif isinstance(value, list):
+                metrics[_metric_key(path.stem, key, "count")] = float(len(value))
+            elif isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    if _is_number(sub_value):
+                        metrics[_metric_key(path.stem, key, sub_key)] = float(sub_value)
+    return metrics
+
+
+AGGREGATORS: List[Tuple[str, Callable[[Path], Dict[str, float]]]] = [
+    ("bandit", aggregate_bandit),
+    ("safety", aggregate_safety),
+    ("trivy", aggregate_trivy),
+    ("presidio", aggregate_presidio),
+]
+
+
+def aggregate_report(path: Path) -> Dict[str, float]:
+    name = path.stem.lower()
+    for tool, aggregator in AGGREGATORS:
+        if tool in name:
+            return aggregator(path)
+    return aggregate_generic(path)
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_state(path: Path = STATE_PATH) -> Dict[str, str]:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def save_state(state: Dict[str, str], path: Path = STATE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
 
 
 def parse_args() -> argparse.Namespace:
@@ -47,29 +274,70 @@ def parse_args() -> argparse.Namespace:
         default="security_controls",
         help="Name for MLflow run.",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ingest reports even if their hash matches the last ingested one.",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default=STATE_PATH,
+        help="File recording the hash of each ingested report.",
+    )
     return parser.parse_args()
 
 
-def load_report(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def collect_metrics(reports: List[Path]) -> Dict[str, float]:
+def collect_metrics(
+    reports: List[Path], state: Dict[str, str] | None = None, force: bool = False
+) -> Tuple[Dict[str, float], List[Path], Dict[str, str]]:
+    """Aggregate changed reports; returns (metrics, ingested paths, updated hash state)."""
+    state = dict(state or {})
     metrics: Dict[str, float] = {}
+    ingested: List[Path] = []
     for report in reports:
         if not report.exists():
             print(f"[WARN] Report missing: {report}; skipping.")
             continue
-        data = load_report(report)
-        _flatten(report.stem, data, metrics)
-    return metrics
+        digest = file_hash(report)
+        key = str(report.resolve())
+        if not force and state.get(key) == digest:
+            print(f"[INFO] Report unchanged since last ingest: {report}; skipping.")
+            continue
+        try:
+            report_metrics = aggregate_report(report)
+        except ReportParseError as exc:
+            print(f"[WARN] Could not parse {exc}; skipping without recording it.")
+            continue
+        metrics.update(report_metrics)
+        ingested.append(report)
+        state[key] = digest
+    return metrics, ingested, state
+
+
+def log_metrics_batched(run_id: str, metrics: Dict[str, float]) -> None:
+    from mlflow.entities import Metric
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient()
+    timestamp = int(time.time() * 1000)
+    entries = [Metric(key, value, timestamp, 0) for key, value in sorted(metrics.items())]
+    for start in range(0, len(entries), BATCH_SIZE):
+        client.log_batch(run_id, metrics=entries[start : start + BATCH_SIZE])
 
 
 def main() -> None:
     args = parse_args()
     report_paths = [Path(r) for r in args.reports]
 
+    state = load_state(args.state)
+    metrics, ingested, new_state = collect_metrics(report_paths, state, force=args.force)
+    if not ingested:
+        print("[INFO] No new security reports to ingest.")
+        return
+
+    import mlflow
+
     load_dotenv()
     tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "file:./mlruns")
     experiment = os.getenv("MLFLOW_EXPERIMENT", "mlops_experiment")
@@ -77,16 +345,15 @@ def main() -> None:
     mlflow.set_tracking_uri(tracking_uri)
     mlflow.set_experiment(experiment)
 
-    metrics = collect_metrics(report_paths)
-
-    with mlflow.start_run(run_name=args.run_name):
-        mlflow.log_param("security_reports", ",".join(str(p) for p in report_paths))
+    with mlflow.start_run(run_name=args.run_name) as run:
+        mlflow.log_param("security_reports", ",".join(str(p) for p in ingested))
         if metrics:
-            mlflow.log_metrics(metrics)
-        for path in report_paths:
-            if path.exists():
-                mlflow.log_artifact(str(path), artifact_path="security_reports")
+            log_metrics_batched(run.info.run_id, metrics)
+        for path in ingested:
+            mlflow.log_artifact(str(path), artifact_path="security_reports")
         print(f"[INFO] Logged {len(metrics)} security metrics to MLflow at {tracking_uri}.")
+    # Only remember hashes once the run has been logged successfully.
+    save_state(new_state, args.state)
 
 
 if __name__ == "__main__":
@@ -1,40 +1,44 @@
 import argparse
+import json
 import os
-import shutil
 from pathlib import Path
-import tempfile
-from typing import Any, Dict
+from typing import Any, Mapping
 
-import mlflow
 from dotenv import load_dotenv
-import yaml
-from autogluon.tabular import TabularPredictor
-
-from src.data.load_data import load_raw_data
-from src.data.preprocess import preprocess_data
-from src.training.evaluate import evaluate_model
-from src.training.train_autogluon import train_autogluon
+from src.training.gating import (
+    gate_challenger,
+    install_challenger,
+    prepare_staging,
+    promote_challenger,
+    read_decision,
+    write_decision,
+)
 from src.utils import mlflow_utils
-from src.utils.config_loader import load_config
+from src.utils.config_loader import FrozenConfig, load_config, load_yaml, thaw
 from src.utils.dvc_utils import setup_dvc_remote, test_s3_connection
-from src.utils.logger import get_logger
-from src.steps.security.owasp_checks import run_data_security_checks, run_adversarial_noise_test
-from src.steps.security.model_integrity import record_model_integrity
-from src.steps.security.dependency_scan import scan_dependencies
-from src.steps.security.atlas_mapping import map_to_atlas
-from src.steps.security.generate_security_report import generate_security_report
+from src.utils.logger import get_logger, log_context
+from src.utils.profiling import (
+    enable_profiling,
+    reset_records,
+    stage_timer,
+    substep,
+    timing_metrics,
+    write_timing_report,
+)
+
+# Stage dependencies (pandas, sklearn, AutoGluon, MLflow, security checks) are
+# imported inside the stage functions so short jobs only pay for what they run.
 
 logger = get_logger(__name__)
 
 
-def _load_mlflow_config(path: str = "src/config/mlflow_config.yaml") -> Dict[str, Any]:
+def _load_mlflow_config(path: str = "src/config/mlflow_config.yaml") -> Mapping[str, Any]:
     if not os.path.exists(path):
         return {}
-    with open(path, "r", encoding="utf-8") as fp:
-        return yaml.safe_load(fp) or {}
+    return FrozenConfig(load_yaml(path) or {})
 
 
-def _apply_mlflow_env(config: Dict[str, Any]) -> None:
+def _apply_mlflow_env(config: Mapping[str, Any]) -> None:
     tracking_uri = config.get("tracking_uri")
     backend = config.get("backend_uri")
     artifact_root = config.get("artifact_root")
@@ -49,26 +53,180 @@ def _apply_mlflow_env(config: Dict[str, Any]) -> None:
         os.environ.setdefault("MLFLOW_PORT", str(port))
 
 
-def run_data_local(config_path: str) -> str:
+def _optimize_processed(cfg: Mapping[str, Any], processed):
+    from src.data.dtypes import optimize_dtypes
+
+    preprocess_cfg = cfg["preprocess"]
+    if not preprocess_cfg.get("optimize_dtypes", True):
+        return processed
+    with substep("optimize_dtypes"):
+        return optimize_dtypes(
+            processed,
+            exclude=[cfg["training"]["label_column"]],
+            max_category_ratio=preprocess_cfg.get("max_category_ratio", 0.5),
+            float_rtol=preprocess_cfg.get("float_rtol"),
+        )
+
+
+def _write_derived_outputs(cfg: Mapping[str, Any], processed) -> None:
+    """Column profile and drift reference; both follow every change to the processed data."""
+    from src.data.profile import profile_csv, profile_dataframe, write_profile
+    from src.monitoring.drift import build_reference, save_reference
+
+    processed_path = cfg["paths"]["processed_data"]
+    profile_cfg = cfg.get("data_profile", {})
+    with substep("profile"):
+        if profile_cfg.get("streaming", False):
+            profile = profile_csv(
+                processed_path,
+                chunksize=profile_cfg.get("chunksize", 100_000),
+                bins=profile_cfg.get("bins", 20),
+            )
+        else:
+            profile = profile_dataframe(processed, bins=profile_cfg.get("bins", 20))
+        write_profile(profile, processed_path)
+
+    monitoring_cfg = cfg.get("monitoring", {})
+    with substep("drift_reference"):
+        reference = build_reference(
+            processed,
+            label_column=cfg["training"]["label_column"],
+            bins=monitoring_cfg.get("bins", 10),
+            ks_points=monitoring_cfg.get("ks_points", 100),
+            top_k=monitoring_cfg.get("top_k", 50),
+        )
+        save_reference(
+            reference,
+            monitoring_cfg.get("reference_path", "artifacts/monitoring/drift_reference.json"),
+        )
+
+
+def _run_data_incremental(cfg: Mapping[str, Any]) -> bool:
+    """Fold rows appended to the raw CSV into the processed data; False means rebuild fully."""
+    from src.data.arrow_io import arrow_path_for, read_arrow, write_arrow
+    from src.data.incremental import (
+        load_watermark,
+        merge_partitions,
+        preprocess_delta,
+        read_delta,
+        write_watermark,
+    )
+    from src.utils.fingerprint import file_sha256
+
+    paths = cfg["paths"]
+    processed_path = paths["processed_data"]
+    arrow_path = arrow_path_for(processed_path)
+    watermark = load_watermark(processed_path)
+    if (
+        watermark is None
+        or watermark.raw_path != paths["raw_data"]
+        or watermark.label_column != cfg["training"]["label_column"]
+        or not arrow_path.exists()
+    ):
+        return False
+    with substep("read_delta"):
+        result = read_delta(watermark)
+    if result is None:
+        return False
+    delta, new_offset = result
+    with substep("preprocess_delta"):
+        delta, hashes = preprocess_delta(delta, watermark, processed_path)
+
+    state = {**watermark.to_dict(), "last_delta_rows": len(delta), "byte_offset": new_offset}
+    if delta.empty:
+        logger.info("No new raw rows since the last run; processed data is current.")
+    else:
+        with substep("merge"):
+            existing = read_arrow(arrow_path)
+            delta = delta[existing.columns]
+            processed = _optimize_processed(cfg, merge_partitions(existing, delta))
+        with substep("csv_write"):
+            # Appending keeps the CSV write proportional to the delta.
+            delta.to_csv(processed_path, mode="a", header=False, index=False)
+        with substep("arrow_write"):
+            write_arrow(processed, arrow_path, source_fingerprint=file_sha256(processed_path))
+        _write_derived_outputs(cfg, processed)
+        logger.info("Appended %d new rows to %s", len(delta), processed_path)
+
+    write_watermark(
+        processed_path,
+        paths["raw_data"],
+        raw_df=delta,
+        label_column=state["label_column"],
+        test_size=state["test_size"],
+        medians=state["medians"],
+        key_columns=state["key_columns"],
+        last_delta_rows=state["last_delta_rows"],
+        byte_offset=new_offset,
+        hashes=hashes,
+    )
+    return True
+
+
+def run_data_local(config_path: str, incremental: bool | None = None) -> str:
+    from src.data.arrow_io import arrow_path_for, write_arrow
+    from src.data.incremental import write_watermark
+    from src.data.load_data import load_raw_data
+    from src.data.preprocess import preprocess_data
+    from src.utils.fingerprint import file_sha256
+
     cfg = load_config(config_path)
     paths = cfg["paths"]
     preprocess_cfg = cfg["preprocess"]
     training_cfg = cfg["training"]
+    incremental_cfg = cfg.get("incremental", {})
+    if incremental is None:
+        incremental = incremental_cfg.get("enabled", False)
+
+    if incremental and os.path.exists(paths["processed_data"]) and _run_data_incremental(cfg):
+        return paths["processed_data"]
 
     df = load_raw_data(paths["raw_data"])
-    processed = preprocess_data(
-        df,
-        label_column=training_cfg["label_column"],
-        test_size=preprocess_cfg["test_size"],
-        random_state=preprocess_cfg["random_state"],
-    )
+    with substep("preprocess"):
+        # Incremental mode splits by key hash so later appends and rebuilds agree.
+        processed = preprocess_data(
+            df,
+            label_column=training_cfg["label_column"],
+            test_size=preprocess_cfg["test_size"],
+            random_state=preprocess_cfg["random_state"],
+            split_keys=list(incremental_cfg.get("key_columns") or []) if incremental else None,
+        )
+    processed = _optimize_processed(cfg, processed)
     Path(paths["processed_data"]).parent.mkdir(parents=True, exist_ok=True)
-    processed.to_csv(paths["processed_data"], index=False)
+    with substep("csv_write"):
+        processed.to_csv(paths["processed_data"], index=False)
+    # Stamped with the CSV's hash so load_processed_partition knows it is current.
+    with substep("arrow_write"):
+        write_arrow(
+            processed,
+            arrow_path_for(paths["processed_data"]),
+            source_fingerprint=file_sha256(paths["processed_data"]),
+        )
     logger.info("Saved processed data to %s", paths["processed_data"])
+
+    with substep("watermark"):
+        deduped = df.drop_duplicates()
+        # Median imputation leaves column medians unchanged, so these are the stats
+        # preprocess_data used; incremental runs reuse them for appended rows.
+        write_watermark(
+            paths["processed_data"],
+            paths["raw_data"],
+            raw_df=deduped,
+            label_column=training_cfg["label_column"],
+            test_size=preprocess_cfg["test_size"],
+            medians=deduped.select_dtypes(include="number").median().to_dict(),
+            key_columns=list(incremental_cfg.get("key_columns") or []),
+            last_delta_rows=len(deduped),
+        )
+    _write_derived_outputs(cfg, processed)
     return paths["processed_data"]
 
 
 def run_train_local(config_path: str) -> dict:
+    from src.orchestration.resources import apply_budget, stage_budget
+    from src.training.evaluate import evaluate_model
+    from src.training.train_autogluon import train_autogluon
+
     cfg = load_config(config_path)
     paths = cfg["paths"]
     training_cfg = cfg["training"]
@@ -80,15 +238,44 @@ def run_train_local(config_path: str) -> dict:
     if not os.path.exists(paths["processed_data"]):
         run_data_local(config_path)
 
+    time_limit = training_cfg["time_limit"]
+    hyperparameters = thaw(training_cfg.get("hyperparameters"))
+    incremental_cfg = cfg.get("incremental", {})
+    trained_rows = None
+    if incremental_cfg.get("enabled", False):
+        from src.data.incremental import load_watermark
+        from src.training.incremental import refit_plan
+
+        watermark = load_watermark(paths["processed_data"])
+        if watermark is not None:
+            trained_rows = watermark.rows
+            previous_rows = (read_decision(models_dir) or {}).get("trained_rows")
+            if previous_rows == watermark.rows:
+                logger.info(
+                    "Last gated model was trained on the current %d rows; skipping training.", watermark.rows
+                )
+                return {"processed_path": paths["processed_data"], "model_dir": models_dir, "skipped": True}
+            # Rows added since the last gated training run, not just since the last data run.
+            delta_rows = watermark.rows - previous_rows if previous_rows else watermark.last_delta_rows
+            plan = refit_plan(training_cfg, incremental_cfg, models_dir, delta_rows, watermark.rows)
+            if plan is not None:
+                time_limit, hyperparameters = plan["time_limit"], thaw(plan["hyperparameters"])
+
+    budget = stage_budget("train", cfg.get("resources"), training_cfg.get("num_cpus", "auto"))
+    apply_budget(budget)
+    resources = budget.autogluon_kwargs() if budget else {"num_cpus": training_cfg.get("num_cpus", "auto")}
+    # The challenger only replaces models_dir if it wins the gate below.
+    staging = prepare_staging(models_dir)
     predictor, leaderboard_path, fi_path, run_id, model_uri = train_autogluon(
         processed_path=paths["processed_data"],
         label_column=training_cfg["label_column"],
         presets=training_cfg["presets"],
-        time_limit=training_cfg["time_limit"],
+        time_limit=time_limit,
         eval_metric=training_cfg["eval_metric"],
-        models_dir=models_dir,
+        models_dir=staging,
         experiment_name=experiment_name,
-        hyperparameters=training_cfg.get("hyperparameters"),
+        hyperparameters=hyperparameters,
+        **resources,
     )
 
     metrics, metrics_path = evaluate_model(
@@ -96,14 +283,23 @@ def run_train_local(config_path: str) -> dict:
         processed_path=paths["processed_data"],
         label_column=training_cfg["label_column"],
         experiment_name=experiment_name,
-        output_dir=models_dir,
+        output_dir=staging,
         run_id=run_id,
     )
 
-    mlflow_utils.log_artifacts_to_run(
-        run_id=run_id, artifact_path="autogluon_model_artifacts", path=models_dir
-    )
-    version = mlflow_utils.register_model(model_uri=model_uri, name=model_name, run_id=run_id)
+    gating_cfg = cfg.get("gating", {})
+    decision = gate_challenger(gating_cfg, model_name, run_id, metrics, staging, trained_rows=trained_rows)
+    version = None
+    if decision.promote:
+        version = promote_challenger(gating_cfg, model_name, model_uri, run_id, metrics)
+        install_challenger(staging, models_dir)
+        leaderboard_path = os.path.join(models_dir, os.path.basename(leaderboard_path))
+        fi_path = os.path.join(models_dir, os.path.basename(fi_path))
+        metrics_path = os.path.join(models_dir, os.path.basename(metrics_path))
+    else:
+        # models_dir keeps the champion; the decision tells deploy there is nothing new.
+        write_decision(models_dir, decision)
+        logger.info("Challenger not registered (kept in %s): %s", staging, decision.reason)
     mlflow_utils.end_run(run_id)
 
     artifacts = {
@@ -115,35 +311,116 @@ def run_train_local(config_path: str) -> dict:
         "model_uri": model_uri,
         "model_name": model_name,
         "model_version": version,
+        "promoted": decision.promote,
     }
     logger.info("Training completed with artifacts: %s", artifacts)
     return artifacts
 
 
+def _export_onnx(cfg: Mapping[str, Any], predictor, version_dir: Path, test_df) -> dict:
+    from src.serving.onnx_export import export_metrics, export_onnx
+
+    onnx_cfg = cfg.get("deploy", {}).get("onnx", {})
+    report = export_onnx(predictor, test_df, cfg["training"]["label_column"], version_dir, onnx_cfg)
+    if onnx_cfg.get("log_to_mlflow", True):
+        run = mlflow_utils.start_run(cfg["mlflow"]["experiment_name"], run_name="onnx-export")
+        mlflow_utils.log_params({"onnx_status": report["status"], "onnx_best_model": report["best_model"]})
+        mlflow_utils.log_metrics(export_metrics(report))
+        mlflow_utils.end_run(run.info.run_id)
+    return report
+
+
 def run_deploy_local(config_path: str) -> str:
+    from autogluon.tabular import TabularPredictor
+
+    from src.data.load_data import load_processed_partition
+    from src.serving.registry import (
+        WARMUP_FILE,
+        discard_staging,
+        new_staging_dir,
+        prune_versions,
+        publish_version,
+        versions_root,
+    )
+
     cfg = load_config(config_path)
     paths = cfg["paths"]
     training_cfg = cfg["training"]
+    serving_cfg = cfg.get("serving", {})
     registry_dir = paths["registry_dir"]
     Path(registry_dir).mkdir(parents=True, exist_ok=True)
 
-    models_dir = Path(paths["models_dir"])
-    tmp_dir = Path(tempfile.mkdtemp(prefix="deploy_models_"))
-    tmp_model_dir = tmp_dir / "models"
-    shutil.copytree(models_dir, tmp_model_dir, dirs_exist_ok=True)
+    decision = read_decision(paths["models_dir"])
+    if decision is not None and not decision.get("promote", True):
+        logger.info(
+            "Skipping deploy: model in %s lost the champion gate (%s).",
+            paths["models_dir"],
+            decision.get("reason"),
+        )
+        return registry_dir
+
+    # Build the new version beside the live one; serving only sees it once CURRENT is replaced.
+    staging_dir = new_staging_dir(registry_dir)
     try:
-        predictor = TabularPredictor.load(tmp_model_dir)
-        best_model = predictor.get_model_best() if hasattr(predictor, "get_model_best") else predictor.model_best
-        predictor.save(registry_dir)
-    finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
-    best_path = os.path.join(registry_dir, best_model)
+        with substep("load_predictor"):
+            source = TabularPredictor.load(paths["models_dir"])
+        with substep("save_registry"):
+            predictor = source.clone_for_deployment(path=str(staging_dir), return_clone=True)
+        best_model = predictor.model_best
+        test_df = load_processed_partition(paths["processed_data"], "test")
+        warmup_rows = int(serving_cfg.get("hot_swap", {}).get("warmup_rows", 64))
+        test_df.drop(columns=[training_cfg["label_column"]]).head(warmup_rows).to_csv(
+            staging_dir / WARMUP_FILE, index=False
+        )
+        onnx_cfg = cfg.get("deploy", {}).get("onnx", {})
+        if onnx_cfg.get("enabled", True):
+            with substep("onnx_export"):
+                _export_onnx(cfg, predictor, staging_dir, test_df)
+        with substep("publish_version"):
+            version = publish_version(registry_dir, staging_dir)
+    except BaseException:
+        discard_staging(staging_dir)
+        raise
+    prune_versions(registry_dir, int(serving_cfg.get("hot_swap", {}).get("keep_versions", 5)))
+    best_path = os.path.join(versions_root(registry_dir), version, best_model)
     logger.info("Deployed best model %s to %s", best_model, best_path)
     logger.info("Registered model name: %s", training_cfg.get("model_name", "autogluon_best"))
     return best_path
 
 
+def _run_parallel(tasks: Mapping[str, Any], workers: int) -> dict:
+    """Run independent callables as timed sub-steps on up to ``workers`` threads.
+
+    Each task runs in a copy of the caller's context so timings and log fields
+    stay attributed to the current stage.
+    """
+    import contextvars
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _timed(name: str, func: Any) -> Any:
+        with substep(name):
+            return func()
+
+    if workers <= 1:
+        return {name: _timed(name, func) for name, func in tasks.items()}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="security") as pool:
+        futures = {
+            name: pool.submit(contextvars.copy_context().run, _timed, name, func) for name, func in tasks.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
 def run_security_checks(config_path: str) -> str:
+    from functools import partial
+
+    from src.orchestration.resources import apply_budget, stage_budget
+    from src.steps.security.atlas_mapping import map_to_atlas
+    from src.steps.security.dependency_scan import scan_dependencies
+    from src.steps.security.generate_security_report import generate_security_report
+    from src.steps.security.model_integrity import record_model_integrity
+    from src.data.profile import load_profile
+    from src.steps.security.owasp_checks import run_adversarial_noise_test, run_data_security_checks
+
     cfg = load_config(config_path)
     paths = cfg["paths"]
     training_cfg = cfg["training"]
@@ -155,20 +432,42 @@ def run_security_checks(config_path: str) -> str:
     security_dir = Path("artifacts/security")
     security_dir.mkdir(parents=True, exist_ok=True)
 
-    data_results = run_data_security_checks(processed_data)
-    adversarial_results = run_adversarial_noise_test(
-        models_dir=paths["models_dir"],
-        processed_path=processed_data,
-        label_column=training_cfg["label_column"],
-    )
-    model_integrity = record_model_integrity(paths["models_dir"], security_dir)
-    dependency_results = scan_dependencies("requirements.txt")
+    profile = load_profile(processed_data)
+    security_cfg = cfg.get("security", {})
+    budget = stage_budget("security", cfg.get("resources"))
+    apply_budget(budget)
+
+    checks = {
+        "data_checks": partial(
+            run_data_security_checks,
+            processed_data,
+            profile=profile,
+            anomaly_config=security_cfg.get("anomaly"),
+            sampling_config=security_cfg.get("sampling"),
+        ),
+        "adversarial_test": partial(
+            run_adversarial_noise_test,
+            models_dir=paths["models_dir"],
+            processed_path=processed_data,
+            label_column=training_cfg["label_column"],
+            profile=profile,
+        ),
+        "model_integrity": partial(record_model_integrity, paths["models_dir"], security_dir),
+        "dependency_scan": partial(
+            scan_dependencies, "requirements.txt", config=security_cfg.get("dependency_scan")
+        ),
+    }
+    results = _run_parallel(checks, budget.workers if budget else 1)
+    data_results = results["data_checks"]
+    adversarial_results = results["adversarial_test"]
+    model_integrity = results["model_integrity"]
+    dependency_results = results["dependency_scan"]
     atlas_summary = map_to_atlas(
         data_results.to_dict(),
         adversarial_results,
         dependency_results,
     )
-    mlflow.end_run()
+    mlflow_utils.end_active_run()
     report_path = generate_security_report(
         security_dir / "security_report.json",
         data_results.to_dict(),
@@ -185,7 +484,14 @@ def run_security_checks(config_path: str) -> str:
         "security_pii_matches": sum(data_results.pii_matches.values()),
         "security_adversarial_change_ratio": adversarial_results["change_ratio"],
         "security_dependency_vulns": len(dependency_results["vulnerabilities"]),
+        "security_installed_vulns": len(dependency_results.get("installed_vulnerabilities", [])),
     }
+    for method, count in data_results.anomaly_methods.items():
+        metrics[f"security_anomaly_rows_{method}"] = count
+    if data_results.sampling is not None:
+        metrics["security_sample_rows"] = data_results.sampling["sample_rows"]
+        metrics["security_pii_row_rate_upper"] = data_results.sampling["pii_row_rate"]["upper"]
+        metrics["security_anomaly_row_rate_upper"] = data_results.sampling["anomaly_row_rate"]["upper"]
     mlflow_utils.log_metrics(metrics)
     mlflow_utils.log_artifact(str(report_path))
     mlflow_utils.log_artifacts_to_run(run.info.run_id, "security", str(security_dir))
@@ -194,16 +500,159 @@ def run_security_checks(config_path: str) -> str:
     return str(report_path)
 
 
+def run_drift_monitor(config_path: str, batch_path: str) -> str:
+    import pandas as pd
+
+    from src.monitoring.drift import DriftMonitor, drift_metrics, load_reference
+
+    cfg = load_config(config_path)
+    monitoring_cfg = cfg.get("monitoring", {})
+    reference_path = monitoring_cfg.get("reference_path", "artifacts/monitoring/drift_reference.json")
+    if not os.path.exists(reference_path):
+        run_data_local(config_path)
+    monitor = DriftMonitor(load_reference(reference_path))
+
+    with substep("scan_batch"):
+        for chunk in pd.read_csv(batch_path, chunksize=monitoring_cfg.get("chunksize", 100_000)):
+            monitor.update(chunk)
+    result = monitor.result(monitoring_cfg.get("psi_threshold", 0.2))
+    result["batch_path"] = batch_path
+
+    report_path = Path(monitoring_cfg.get("report_path", "artifacts/monitoring/drift_report.json"))
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    if result["drifted_columns"]:
+        logger.warning("Drift detected in columns: %s", ", ".join(result["drifted_columns"]))
+    else:
+        logger.info("No drift above PSI %.2f across %d rows.", result["psi_threshold"], result["rows"])
+
+    if monitoring_cfg.get("log_to_mlflow", True):
+        run = mlflow_utils.start_run(cfg["mlflow"]["experiment_name"], run_name="drift-monitor")
+        mlflow_utils.log_params({"drift_batch_path": batch_path})
+        mlflow_utils.log_metrics(drift_metrics(result))
+        mlflow_utils.log_artifact(str(report_path))
+        mlflow_utils.end_run(run.info.run_id)
+    return str(report_path)
+
+
+def run_serve(config_path: str) -> None:
+    from src.serving.server import serve_registry
+
+    cfg = load_config(config_path)
+    serve_registry(cfg["paths"]["registry_dir"], thaw(cfg.get("serving", {})))
+
+
+def run_job_chain(config_path: str) -> dict:
+    """Data -> train -> evaluate for one job config; runs inside a scheduler worker."""
+    reset_records()
+    with stage_timer("data"):
+        run_data_local(config_path)
+    with stage_timer("train"):
+        artifacts = run_train_local(config_path)
+    profiling_cfg = load_config(config_path).get("profiling", {})
+    artifacts["timing_report"] = str(write_timing_report(profiling_cfg["report_path"]))
+    return artifacts
+
+
+def run_multi_job(config_path: str, jobs_path: str) -> str:
+    from src.orchestration.jobs import load_jobs, run_jobs, write_summary
+
+    jobs, pool = load_jobs(jobs_path, config_path)
+    results = run_jobs(
+        jobs,
+        run_job_chain,
+        max_cpus=pool.get("max_cpus"),
+        max_workers=pool.get("max_workers"),
+        start_method=pool.get("start_method", "spawn"),
+        warm_imports=pool.get("warm_imports"),
+    )
+    summary_path = write_summary(results, Path(pool.get("output_root", "artifacts/jobs")) / "summary.json")
+
+    cfg = load_config(config_path)
+    run = mlflow_utils.start_run(cfg["mlflow"]["experiment_name"], run_name="multi-job-summary")
+    mlflow_utils.log_metrics(
+        {
+            "jobs_total": len(results),
+            "jobs_succeeded": sum(result.status == "succeeded" for result in results),
+            "jobs_failed": sum(result.status == "failed" for result in results),
+            "jobs_wall_s_max": max((result.duration_s for result in results), default=0.0),
+        }
+    )
+    mlflow_utils.log_artifact(str(summary_path))
+    mlflow_utils.end_run(run.info.run_id)
+    for result in results:
+        logger.info("Job %s: %s (%.1fs)", result.name, result.status, result.duration_s)
+    return str(summary_path)
+
+
+def _report_timings(config_path: str, profile: bool) -> None:
+    """Write the timing report and log it as an MLflow run for ``--profile`` or ``log_to_mlflow``."""
+    cfg = load_config(config_path)
+    profiling_cfg = cfg.get("profiling", {})
+    report_path = write_timing_report(
+        profiling_cfg.get("report_path", "artifacts/timings/timing_report.json")
+    )
+    if not (profile or profiling_cfg.get("log_to_mlflow", False)):
+        return
+    try:
+        run = mlflow_utils.start_run(cfg["mlflow"]["experiment_name"], run_name="stage-timings")
+        mlflow_utils.log_metrics(timing_metrics())
+        mlflow_utils.log_artifact(str(report_path))
+        mlflow_utils.end_run(run.info.run_id)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("Logging stage timings to MLflow failed: %s", exc)
+
+
 def main():
     load_dotenv()
     parser = argparse.ArgumentParser(description="Run MLOps pipelines.")
     parser.add_argument(
         "--pipeline",
-        choices=["data", "train", "deploy", "security", "all"],
+        choices=["data", "train", "deploy", "security", "monitor", "jobs", "serve", "all"],
         default="all",
         help="Which pipeline to run.",
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Dump cProfile output for each stage into artifacts/profiles.",
+    )
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="Scoring batch CSV to compare against the training reference (monitor pipeline).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process raw rows appended since the last run and refit with a reduced budget.",
+    )
+    parser.add_argument(
+        "--jobs",
+        default="src/config/jobs.yaml",
+        help="Multi-job spec used by --pipeline jobs.",
+    )
     args = parser.parse_args()
+    if args.pipeline == "monitor" and not args.batch:
+        parser.error("--pipeline monitor requires --batch")
+    config_path = "src/config/config.yaml"
+    if args.incremental:
+        # Same mechanism as any other MLOPS__ override, so every stage sees it.
+        os.environ["MLOPS__INCREMENTAL__ENABLED"] = "true"
+    # Validate once up front so a bad config fails before any expensive stage runs.
+    cfg = load_config(config_path)
+    store_cfg = cfg.get("metrics_store", {})
+    os.environ.setdefault("MLOPS_METRICS_STORE", store_cfg.get("path", "artifacts/metrics_store.sqlite"))
+    os.environ.setdefault("MLOPS_METRICS_STORE_ENABLED", str(store_cfg.get("enabled", True)).lower())
+    blob_cfg = cfg.get("artifact_store", {})
+    os.environ.setdefault("MLOPS_ARTIFACT_DEDUP", str(blob_cfg.get("dedup", True)).lower())
+    os.environ.setdefault("MLOPS_BLOB_INDEX", blob_cfg.get("index_path", "artifacts/blob_index.sqlite"))
+    os.environ.setdefault("MLOPS_BLOB_CACHE", blob_cfg.get("cache_dir", "artifacts/blob_cache"))
+    from src.orchestration.resources import log_limits
+
+    log_limits(cfg.get("resources"))
+    if args.profile:
+        enable_profiling("artifacts/profiles")
 
     mlflow_cfg = _load_mlflow_config()
     _apply_mlflow_env(mlflow_cfg)
@@ -220,20 +669,36 @@ def main():
     except Exception as exc:
         logger.warning("S3 connectivity check raised an exception: %s", exc)
 
-    config_path = "src/config/config.yaml"
     processed_path = None
     if args.pipeline in ("data", "all"):
-        processed_path = run_data_local(config_path)
+        with log_context(stage="data"), stage_timer("data"):
+            processed_path = run_data_local(config_path)
     if args.pipeline in ("train", "all"):
-        processed_path = processed_path or run_data_local(config_path)
-        artifacts = run_train_local(config_path)
-        logger.info("Training artifacts: %s", artifacts)
+        with log_context(stage="train"), stage_timer("train"):
+            processed_path = processed_path or run_data_local(config_path)
+            artifacts = run_train_local(config_path)
+            logger.info("Training artifacts: %s", artifacts)
     if args.pipeline in ("deploy", "all"):
-        best_path = run_deploy_local(config_path)
-        logger.info("Deployment completed: %s", best_path)
+        with log_context(stage="deploy"), stage_timer("deploy"):
+            best_path = run_deploy_local(config_path)
+            logger.info("Deployment completed: %s", best_path)
     if args.pipeline in ("security", "all"):
-        report = run_security_checks(config_path)
-        logger.info("Security report generated: %s", report)
+        with log_context(stage="security"), stage_timer("security"):
+            report = run_security_checks(config_path)
+            logger.info("Security report generated: %s", report)
+    if args.pipeline == "jobs":
+        with log_context(stage="jobs"), stage_timer("jobs"):
+            summary = run_multi_job(config_path, args.jobs)
+            logger.info("Multi-job summary: %s", summary)
+    if args.pipeline == "monitor":
+        with log_context(stage="monitor"), stage_timer("monitor"):
+            report = run_drift_monitor(config_path, args.batch)
+            logger.info("Drift report generated: %s", report)
+    if args.pipeline == "serve":
+        with log_context(stage="serve"):
+            run_serve(config_path)
+        return
+    _report_timings(config_path, args.profile)
 
 
 if __name__ == "__main__":
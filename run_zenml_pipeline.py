@@ -3,9 +3,7 @@ from __future__ import annotations
 
 import argparse
 
-from src.pipelines.data_pipeline import run_data_pipeline
-from src.pipelines.train_pipeline import run_train_pipeline
-from src.pipelines.deploy_pipeline import run_deploy_pipeline
+from src.utils.config_loader import load_config
 
 
 def main() -> None:
@@ -21,15 +19,22 @@ def main() -> None:
         help="Path to config file.",
     )
     args = parser.parse_args()
+    load_config(args.config)
 
+    # Import only the selected pipeline so ZenML/AutoGluon load on demand.
     if args.pipeline == "data":
+        from src.pipelines.data_pipeline import run_data_pipeline
+
         run_data_pipeline(config_path=args.config)
     elif args.pipeline == "train":
+        from src.pipelines.train_pipeline import run_train_pipeline
+
         run_train_pipeline(config_path=args.config)
     else:
+        from src.pipelines.deploy_pipeline import run_deploy_pipeline
+
         run_deploy_pipeline(config_path=args.config)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,100 @@
+"""Arrow IPC (Feather v2) read/write helpers with memory-mapped loads."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Schema metadata key holding the SHA256 of the CSV the Arrow copy mirrors.
+SOURCE_FINGERPRINT_KEY = b"mlops.source_sha256"
+
+
+def write_arrow(df: pd.DataFrame, path: str | Path, source_fingerprint: str | None = None) -> Path:
+    """Write ``df`` as an uncompressed Arrow IPC file so it can be memory-mapped.
+
+    The file is written beside the target and renamed over it: truncating a file
+    in place would change the pages under any reader that still has it mapped.
+    ``source_fingerprint`` (the content hash of the CSV this copy mirrors) is
+    stored in the schema metadata for ``arrow_is_current``.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=None)
+    if source_fingerprint:
+        metadata = {**(table.schema.metadata or {}), SOURCE_FINGERPRINT_KEY: source_fingerprint.encode("ascii")}
+        table = table.replace_schema_metadata(metadata)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_arrow_table(path: str | Path) -> pa.Table:
+    """Open an Arrow IPC file via mmap; column buffers stay backed by the page cache."""
+    source = pa.memory_map(str(path), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def read_arrow(path: str | Path) -> pd.DataFrame:
+    # split_blocks avoids consolidating columns into one 2-D block (an extra full copy).
+    return read_arrow_table(path).to_pandas(split_blocks=True)
+
+
+def arrow_source_fingerprint(path: str | Path) -> str | None:
+    """Source CSV hash recorded by ``write_arrow``; reads only the file footer."""
+    with pa.memory_map(str(path), "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    value = metadata.get(SOURCE_FINGERPRINT_KEY)
+    return value.decode("ascii") if value else None
+
+
+def arrow_is_current(
+    arrow_path: str | Path, source_path: str | Path, source_fingerprint: str | None = None
+) -> bool:
+    """True when the Arrow copy holds the same rows as the CSV at ``source_path``.
+
+    Compares the recorded content hash with the CSV's (``source_fingerprint``
+    when the caller already has it), so copies restored by ``dvc checkout`` or
+    ``git`` with arbitrary mtimes are still used. Copies written without a hash
+    fall back to the mtime comparison.
+    """
+    from src.utils.fingerprint import file_sha256
+
+    arrow_path = Path(arrow_path)
+    if not arrow_path.exists() or not os.path.exists(source_path):
+        return False
+    try:
+        recorded = arrow_source_fingerprint(arrow_path)
+    except (OSError, pa.ArrowInvalid):
+        return False
+    if recorded is not None:
+        return recorded == (source_fingerprint or file_sha256(source_path))
+    return arrow_path.stat().st_mtime_ns >= os.stat(source_path).st_mtime_ns
+
+
+def arrow_path_for(processed_path: str | Path) -> Path:
+    """``data/processed/processed.csv`` -> ``data/processed/processed.arrow``."""
+    return Path(processed_path).with_suffix(".arrow")
+
+
+def read_partition(path: str | Path, split: str, split_column: str = "split") -> pd.DataFrame:
+    """Rows of one split from an Arrow file, without the split column.
+
+    The processed data is written train-then-test, so a split is a contiguous
+    row range and is returned as a zero-copy slice of the memory-mapped table.
+    """
+    table = read_arrow_table(path)
+    positions = np.flatnonzero(table.column(split_column).to_pandas().to_numpy() == split)
+    if positions.size == 0:
+        table = table.slice(0, 0)
+    elif positions[-1] - positions[0] + 1 == positions.size:
+        table = table.slice(int(positions[0]), int(positions.size))
+    else:
+        table = table.take(pa.array(positions))
+    table = table.drop_columns([split_column])
+    return table.to_pandas(split_blocks=True)
@@ -0,0 +1,70 @@
+"""Shrink DataFrame dtypes before the processed data is persisted."""
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _downcast_float(series: pd.Series, rtol: float) -> pd.Series:
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = values[np.isfinite(values)]
+    if finite.size and np.abs(finite).max() > np.finfo(np.float32).max:
+        return series
+    narrowed = values.astype(np.float32)
+    # Keep float32 only when every value round-trips within ``rtol`` (NaN matching NaN).
+    restored = narrowed.astype(np.float64)
+    close = np.isclose(restored, values, rtol=rtol, atol=0.0, equal_nan=True)
+    if not close.all():
+        return series
+    return pd.Series(narrowed, index=series.index, name=series.name)
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    exclude: Iterable[str] = (),
+    max_category_ratio: float = 0.5,
+    float_rtol: float | None = None,
+) -> pd.DataFrame:
+    """Downcast numerics to the smallest safe width and low-cardinality strings to categoricals.
+
+    Integers are narrowed losslessly. Floats stay float64 unless ``float_rtol``
+    is set: then a column goes to float32 when every value round-trips within
+    that relative tolerance (0 means exactly; measured data almost never does,
+    float32 itself carries about 6e-8). String columns whose distinct/non-null ratio
+    is at most ``max_category_ratio`` become ``category``. Columns in ``exclude``
+    (typically the label) are left untouched.
+    """
+    skip = set(exclude)
+    before = df.memory_usage(deep=True).sum()
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in skip:
+            columns[col] = series
+        elif pd.api.types.is_bool_dtype(series):
+            columns[col] = series
+        elif pd.api.types.is_integer_dtype(series):
+            kind = "unsigned" if series.min() >= 0 else "integer"
+            columns[col] = pd.to_numeric(series, downcast=kind)
+        elif pd.api.types.is_float_dtype(series):
+            columns[col] = series if float_rtol is None else _downcast_float(series, float_rtol)
+        elif series.dtype == object:
+            non_null = int(series.notna().sum())
+            if non_null and series.nunique(dropna=True) / non_null <= max_category_ratio:
+                columns[col] = series.astype("category")
+            else:
+                columns[col] = series
+        else:
+            columns[col] = series
+    optimized = pd.DataFrame(columns, index=df.index)
+    after = optimized.memory_usage(deep=True).sum()
+    logger.info(
+        "Optimized dtypes: %.1f MB -> %.1f MB", before / (1 << 20), after / (1 << 20)
+    )
+    return optimized
@@ -0,0 +1,209 @@
+"""Incremental ingestion of rows appended to the raw CSV.
+
+A watermark records how many raw bytes have been processed, a hash of that
+prefix and the imputation medians. When the raw file only grew, the bytes past
+the watermark are parsed, deduplicated against stored row hashes, imputed with
+the stored medians and assigned to train/test by a stable key hash, so earlier
+assignments never move.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_CHUNK_SIZE = 1 << 20
+# Split buckets: a row is "test" when its key hash falls in the first test_size share.
+_BUCKETS = 10_000
+# Bumped whenever row hashing changes; an older watermark forces a full rebuild.
+HASH_VERSION = 2
+
+
+@dataclass
+class Watermark:
+    raw_path: str
+    byte_offset: int
+    prefix_sha256: str
+    header: str
+    rows: int
+    label_column: str
+    test_size: float
+    medians: Dict[str, float]
+    key_columns: List[str] = field(default_factory=list)
+    last_delta_rows: int = 0
+    updated_at: str = ""
+    hash_version: int = 1
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def state_paths(processed_path: str | Path) -> tuple[Path, Path]:
+    """(watermark JSON, sorted row-hash array) stored next to the processed CSV."""
+    processed_path = Path(processed_path)
+    return (
+        processed_path.with_suffix(".watermark.json"),
+        processed_path.with_suffix(".rowhashes.npy"),
+    )
+
+
+def _prefix_sha256(path: str | Path, length: int) -> str:
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, "rb") as fp:
+        while remaining > 0:
+            chunk = fp.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def _complete_length(path: str | Path) -> int:
+    """File size up to and including the last newline, so a half-written row is left for later."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as fp:
+        fp.seek(max(size - _CHUNK_SIZE, 0))
+        tail = fp.read()
+    last_newline = tail.rfind(b"\n")
+    if last_newline == -1:
+        return size
+    return size - len(tail) + last_newline + 1
+
+
+def _canonical(df: pd.DataFrame) -> pd.DataFrame:
+    """Dtype-independent view for hashing: numbers as float64, everything else as str.
+
+    ``hash_pandas_object`` hashes by dtype, and the same value can arrive as
+    int64 in a clean delta but float64 in base data with a NaN in that column.
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            columns[col] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            columns[col] = series.astype(str).mask(series.isna()).astype(object)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(_canonical(df), index=False).to_numpy(dtype=np.uint64)
+
+
+def assign_split(df: pd.DataFrame, key_columns: Sequence[str], test_size: float) -> pd.Series:
+    """Deterministic train/test assignment from a hash of the key columns."""
+    keys = df[list(key_columns)] if key_columns else df
+    buckets = row_hashes(keys) % _BUCKETS
+    return pd.Series(
+        np.where(buckets < int(test_size * _BUCKETS), "test", "train"), index=df.index, name="split"
+    )
+
+
+def load_watermark(processed_path: str | Path) -> Watermark | None:
+    path, _ = state_paths(processed_path)
+    if not path.exists():
+        return None
+    return Watermark(**json.loads(path.read_text(encoding="utf-8")))
+
+
+def write_watermark(
+    processed_path: str | Path,
+    raw_path: str,
+    raw_df: pd.DataFrame,
+    label_column: str,
+    test_size: float,
+    medians: Dict[str, float],
+    key_columns: Sequence[str] = (),
+    last_delta_rows: int = 0,
+    byte_offset: int | None = None,
+    hashes: np.ndarray | None = None,
+) -> Watermark:
+    """Record the processed raw prefix; ``raw_df`` is the deduplicated raw data it covers."""
+    offset = _complete_length(raw_path) if byte_offset is None else byte_offset
+    with open(raw_path, "rb") as fp:
+        header = fp.readline().decode("utf-8")
+    watermark = Watermark(
+        raw_path=str(raw_path),
+        byte_offset=offset,
+        prefix_sha256=_prefix_sha256(raw_path, offset),
+        header=header,
+        rows=int(len(raw_df)) if hashes is None else int(hashes.size),
+        label_column=label_column,
+        test_size=float(test_size),
+        medians={k: float(v) for k, v in medians.items()},
+        key_columns=list(key_columns),
+        last_delta_rows=int(last_delta_rows),
+        updated_at=datetime.utcnow().isoformat() + "Z",
+        hash_version=HASH_VERSION,
+    )
+    state_path, hashes_path = state_paths(processed_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(hashes_path, np.sort(row_hashes(raw_df) if hashes is None else hashes))
+    state_path.write_text(json.dumps(watermark.to_dict(), indent=2), encoding="utf-8")
+    return watermark
+
+
+def read_delta(watermark: Watermark) -> tuple[pd.DataFrame, int] | None:
+    """Rows appended since the watermark and the new offset; None when a full rebuild is needed."""
+    raw_path = watermark.raw_path
+    if not os.path.exists(raw_path):
+        return None
+    if watermark.hash_version != HASH_VERSION:
+        logger.info("Stored row hashes use an older scheme; falling back to a full rebuild.")
+        return None
+    end = _complete_length(raw_path)
+    if end < watermark.byte_offset:
+        logger.info("Raw data shrank since the last run; falling back to a full rebuild.")
+        return None
+    if _prefix_sha256(raw_path, watermark.byte_offset) != watermark.prefix_sha256:
+        logger.info("Already-processed raw rows changed; falling back to a full rebuild.")
+        return None
+    with open(raw_path, "rb") as fp:
+        fp.seek(watermark.byte_offset)
+        payload = fp.read(end - watermark.byte_offset)
+    if not payload.strip():
+        return pd.DataFrame(columns=watermark.header.strip().split(",")), end
+    delta = pd.read_csv(io.BytesIO(watermark.header.encode("utf-8") + payload))
+    return delta, end
+
+
+def preprocess_delta(
+    delta: pd.DataFrame, watermark: Watermark, processed_path: str | Path
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Dedupe, impute with stored medians and split the delta; returns it and the merged row hashes."""
+    _, hashes_path = state_paths(processed_path)
+    known = np.load(hashes_path) if hashes_path.exists() else np.empty(0, dtype=np.uint64)
+    delta = delta.drop_duplicates().reset_index(drop=True)
+    hashes = row_hashes(delta)
+    fresh = ~np.isin(hashes, known)
+    delta, hashes = delta[fresh].reset_index(drop=True), hashes[fresh]
+
+    if watermark.label_column not in delta.columns:
+        raise ValueError(f"Label column {watermark.label_column} not found in appended data.")
+    # Split on the raw values, as preprocess_data does, so imputation never moves a row.
+    split = assign_split(delta, watermark.key_columns, watermark.test_size)
+    medians = {col: value for col, value in watermark.medians.items() if col in delta.columns}
+    delta = delta.fillna(value=medians)
+    delta["split"] = split
+    return delta, np.union1d(known, hashes)
+
+
+def merge_partitions(existing: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Keep the train-then-test row layout the Arrow reader relies on."""
+    combined = pd.concat([existing, delta[existing.columns]], ignore_index=True)
+    order = np.argsort((combined["split"] == "test").to_numpy(), kind="stable")
+    return combined.iloc[order].reset_index(drop=True)
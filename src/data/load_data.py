@@ -1,8 +1,8 @@
 import os
 import pandas as pd
-from sklearn.datasets import load_breast_cancer
 
 from src.utils.logger import get_logger
+from src.utils.profiling import substep
 
 logger = get_logger(__name__)
 
@@ -10,12 +10,40 @@ logger = get_logger(__name__)
 def load_raw_data(raw_path: str) -> pd.DataFrame:
     """Load raw data from CSV; if missing, create a demo dataset."""
     if not os.path.exists(raw_path):
+        from sklearn.datasets import load_breast_cancer
+
         logger.info("Raw data not found at %s. Creating demo dataset.", raw_path)
         data = load_breast_cancer(as_frame=True)
         df = data.frame
         df.rename(columns={"target": "target"}, inplace=True)
         os.makedirs(os.path.dirname(raw_path), exist_ok=True)
         df.to_csv(raw_path, index=False)
-    df = pd.read_csv(raw_path)
+    with substep("csv_read"):
+        df = pd.read_csv(raw_path)
     logger.info("Loaded raw data with shape %s", df.shape)
     return df
+
+
+def load_processed_partition(
+    processed_path: str, split: str | None = None, fingerprint: str | None = None
+) -> pd.DataFrame:
+    """Load the processed data (optionally one split, without the split column).
+
+    Reads the memory-mapped Arrow copy written next to the CSV when it mirrors
+    the CSV's content (see ``arrow_is_current``; pass the CSV's ``fingerprint``
+    when it is already known), falling back to the CSV otherwise.
+    """
+    from src.data.arrow_io import arrow_is_current, arrow_path_for, read_arrow, read_partition
+
+    arrow_path = arrow_path_for(processed_path)
+    if arrow_is_current(arrow_path, processed_path, fingerprint):
+        with substep("arrow_read"):
+            if split is None:
+                return read_arrow(arrow_path)
+            return read_partition(arrow_path, split)
+    logger.info("No current Arrow copy of %s; parsing the CSV", processed_path)
+    with substep("csv_read"):
+        df = pd.read_csv(processed_path)
+    if split is None:
+        return df
+    return df[df["split"] == split].drop(columns=["split"])
@@ -1,18 +1,46 @@
+from typing import Sequence
+
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
 
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-def preprocess_data(df: pd.DataFrame, label_column: str, test_size: float, random_state: int) -> pd.DataFrame:
-    """Basic preprocessing: drop duplicates, fill numeric NaNs, split marker flag."""
+def preprocess_data(
+    df: pd.DataFrame,
+    label_column: str,
+    test_size: float,
+    random_state: int,
+    split_keys: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """Basic preprocessing: drop duplicates, fill numeric NaNs, split marker flag.
+
+    With ``split_keys`` (a list, empty meaning all columns) rows are assigned by
+    the same stable key hash as incremental appends (``incremental.assign_split``)
+    instead of a random stratified split, so a full rebuild keeps every row's split.
+    """
+    from sklearn.model_selection import train_test_split
+
     df = df.drop_duplicates().reset_index(drop=True)
-    numeric_cols = df.select_dtypes(include="number").columns
-    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
     if label_column not in df.columns:
         raise ValueError(f"Label column {label_column} not found in data.")
+    split = None
+    if split_keys is not None:
+        from src.data.incremental import assign_split
+
+        # Hash the raw values: the medians shift as rows are appended.
+        split = assign_split(df, split_keys, test_size)
+    numeric_cols = df.select_dtypes(include="number").columns
+    df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
+    if split is not None:
+        df["split"] = split
+        # Train rows first, as the Arrow partition reader expects.
+        order = np.argsort((df["split"] == "test").to_numpy(), kind="stable")
+        processed = df.iloc[order].reset_index(drop=True)
+        logger.info("Processed data shape: %s (stable key split)", processed.shape)
+        return processed
     df["split"] = "train"
     train_df, test_df = train_test_split(
         df, test_size=test_size, random_state=random_state, stratify=df[label_column]
@@ -0,0 +1,245 @@
+"""Single-pass column profiling persisted next to the processed data."""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+TOP_K = 20
+
+
+def profile_path_for(processed_path: str | Path) -> Path:
+    """``data/processed/processed.csv`` -> ``data/processed/processed.stats.json``."""
+    return Path(processed_path).with_suffix(".stats.json")
+
+
+def _histogram(values: np.ndarray, bins: int) -> Dict[str, List[float]]:
+    if values.size == 0:
+        return {"edges": [], "counts": []}
+    counts, edges = np.histogram(values, bins=bins)
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def _top_values(series: pd.Series) -> Dict[str, int]:
+    counts = series.value_counts(dropna=True).head(TOP_K)
+    return {str(k): int(v) for k, v in counts.items()}
+
+
+def _numeric_stats(numeric: pd.DataFrame, bins: int) -> Dict[str, Dict[str, Any]]:
+    if numeric.empty:
+        return {}
+    # Column-wise reductions run as one vectorised pass per statistic.
+    count = numeric.count()
+    mean = numeric.mean()
+    std = numeric.std(ddof=0)
+    minimum = numeric.min()
+    maximum = numeric.max()
+    quantiles = numeric.quantile(list(QUANTILES))
+    stats: Dict[str, Dict[str, Any]] = {}
+    for col in numeric.columns:
+        values = numeric[col].to_numpy(dtype=float, na_value=np.nan)
+        stats[col] = {
+            "count": int(count[col]),
+            "mean": float(mean[col]),
+            "std": float(std[col]),
+            "min": float(minimum[col]),
+            "max": float(maximum[col]),
+            "quantiles": {str(q): float(quantiles.at[q, col]) for q in QUANTILES},
+            "histogram": _histogram(values[~np.isnan(values)], bins),
+        }
+    return stats
+
+
+def profile_dataframe(df: pd.DataFrame, bins: int = 20) -> Dict[str, Any]:
+    """Per-column dtype, nulls, cardinality and, for numeric columns, moments/quantiles/histograms."""
+    numeric = df.select_dtypes(include="number")
+    numeric_stats = _numeric_stats(numeric, bins)
+    nulls = df.isna().sum()
+    cardinality = df.nunique(dropna=True)
+    columns: Dict[str, Dict[str, Any]] = {}
+    for col in df.columns:
+        entry: Dict[str, Any] = {
+            "dtype": str(df[col].dtype),
+            "null_count": int(nulls[col]),
+            "cardinality": int(cardinality[col]),
+        }
+        if col in numeric_stats:
+            entry.update(numeric_stats[col])
+        else:
+            entry["top_values"] = _top_values(df[col])
+        columns[col] = entry
+    return {
+        "rows": int(len(df)),
+        "numeric_columns": list(numeric.columns),
+        "columns": columns,
+    }
+
+
+class _StreamingColumn:
+    """Running count/mean/M2/min/max plus a bounded reservoir for quantiles/histograms."""
+
+    def __init__(self, reservoir_size: int, rng: np.random.Generator) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.seen = 0
+        self.reservoir = np.empty(0, dtype=float)
+        self.reservoir_size = reservoir_size
+        self.rng = rng
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        n = values.size
+        if n == 0:
+            return
+        # Chan et al. parallel merge of (count, mean, M2).
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self._sample(values)
+
+    def _sample(self, values: np.ndarray) -> None:
+        free = self.reservoir_size - self.reservoir.size
+        if free > 0:
+            head = values[:free]
+            self.reservoir = np.concatenate([self.reservoir, head])
+            self.seen += head.size
+            values = values[free:]
+        if values.size == 0:
+            return
+        # Vectorised Algorithm R: item i (1-based stream index) replaces slot j < size w.p. size/i.
+        positions = self.seen + np.arange(1, values.size + 1)
+        slots = (self.rng.random(values.size) * positions).astype(np.int64)
+        keep = slots < self.reservoir_size
+        self.reservoir[slots[keep]] = values[keep]
+        self.seen += values.size
+
+    def to_dict(self, bins: int) -> Dict[str, Any]:
+        std = float(np.sqrt(self.m2 / self.count)) if self.count else float("nan")
+        sample = self.reservoir
+        quantiles = np.quantile(sample, QUANTILES) if sample.size else [float("nan")] * len(QUANTILES)
+        return {
+            "count": int(self.count),
+            "mean": float(self.mean) if self.count else float("nan"),
+            "std": std,
+            "min": float(self.minimum) if self.count else float("nan"),
+            "max": float(self.maximum) if self.count else float("nan"),
+            "quantiles": {str(q): float(v) for q, v in zip(QUANTILES, quantiles)},
+            "histogram": _histogram(sample, bins),
+            "approximate": bool(self.seen > sample.size),
+        }
+
+
+def profile_chunks(
+    chunks: Iterable[pd.DataFrame],
+    bins: int = 20,
+    reservoir_size: int = 100_000,
+    max_distinct: int = 10_000,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """Streaming profile with bounded memory; quantiles/histograms come from a reservoir sample."""
+    rng = np.random.default_rng(seed)
+    rows = 0
+    numeric_state: Dict[str, _StreamingColumn] = {}
+    dtypes: Dict[str, str] = {}
+    nulls: Dict[str, int] = {}
+    distinct: Dict[str, set] = {}
+    top: Dict[str, pd.Series] = {}
+    for chunk in chunks:
+        rows += len(chunk)
+        chunk_nulls = chunk.isna().sum()
+        numeric_cols = set(chunk.select_dtypes(include="number").columns)
+        for col in chunk.columns:
+            dtypes.setdefault(col, str(chunk[col].dtype))
+            nulls[col] = nulls.get(col, 0) + int(chunk_nulls[col])
+            values = distinct.setdefault(col, set())
+            if len(values) <= max_distinct:
+                values.update(chunk[col].dropna().unique().tolist())
+            if col in numeric_cols:
+                state = numeric_state.setdefault(col, _StreamingColumn(reservoir_size, rng))
+                state.update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+            else:
+                counts = chunk[col].value_counts(dropna=True)
+                top[col] = counts if col not in top else top[col].add(counts, fill_value=0)
+                # Keep the running frequency table bounded.
+                top[col] = top[col].nlargest(max_distinct)
+
+    columns: Dict[str, Dict[str, Any]] = {}
+    for col, dtype in dtypes.items():
+        cardinality = len(distinct.get(col, ()))
+        entry: Dict[str, Any] = {
+            "dtype": dtype,
+            "null_count": nulls[col],
+            "cardinality": cardinality,
+        }
+        if cardinality > max_distinct:
+            entry["cardinality_capped"] = True
+        if col in numeric_state:
+            entry.update(numeric_state[col].to_dict(bins))
+        else:
+            counts = top.get(col, pd.Series(dtype=float)).nlargest(TOP_K)
+            entry["top_values"] = {str(k): int(v) for k, v in counts.items()}
+        columns[col] = entry
+    return {"rows": rows, "numeric_columns": list(numeric_state), "columns": columns}
+
+
+def profile_csv(path: str | Path, chunksize: int = 100_000, bins: int = 20) -> Dict[str, Any]:
+    """Stream a CSV through ``profile_chunks`` without loading it whole."""
+    return profile_chunks(pd.read_csv(path, chunksize=chunksize), bins=bins)
+
+
+def write_profile(profile: Dict[str, Any], processed_path: str | Path) -> Path:
+    """Persist ``profile`` next to ``processed_path``, stamped with the source size and content hash."""
+    from src.utils.fingerprint import file_sha256
+
+    payload = {
+        **profile,
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "source": {
+            "path": str(processed_path),
+            "size": os.stat(processed_path).st_size,
+            "sha256": file_sha256(processed_path),
+        },
+    }
+    path = profile_path_for(processed_path)
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    logger.info("Column profile saved to %s", path)
+    return path
+
+
+def load_profile(processed_path: str | Path) -> Dict[str, Any] | None:
+    """Return the stored profile if it still matches ``processed_path``; None when missing or stale.
+
+    Freshness is decided by content hash, so a ``dvc checkout`` or ``touch``
+    that only changes the mtime keeps the profile; the size is compared first
+    to skip hashing a file that has obviously changed.
+    """
+    from src.utils.fingerprint import file_sha256
+
+    path = profile_path_for(processed_path)
+    if not path.exists() or not os.path.exists(processed_path):
+        return None
+    profile = json.loads(path.read_text(encoding="utf-8"))
+    source = profile.get("source", {})
+    if source.get("size") != os.stat(processed_path).st_size or source.get("sha256") != file_sha256(processed_path):
+        logger.warning("Column profile %s is stale for %s; ignoring it.", path, processed_path)
+        return None
+    return profile
@@ -0,0 +1,62 @@
+"""ZenML materializer storing DataFrames as memory-mappable Arrow IPC files."""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Type
+
+import pandas as pd
+from zenml.enums import ArtifactType
+from zenml.io import fileio
+from zenml.materializers.base_materializer import BaseMaterializer
+
+from src.data.arrow_io import read_arrow, write_arrow
+
+DATA_FILENAME = "data.arrow"
+
+
+def _is_local(uri: str) -> bool:
+    return "://" not in uri or uri.startswith("file://")
+
+
+class ArrowDataFrameMaterializer(BaseMaterializer):
+    """Persist ``pd.DataFrame`` artifacts as Arrow IPC and load them via mmap.
+
+    Local artifact stores are read in place; remote stores are copied to a
+    temporary file first.
+    """
+
+    ASSOCIATED_TYPES = (pd.DataFrame,)
+    ASSOCIATED_ARTIFACT_TYPE = ArtifactType.DATA
+
+    def load(self, data_type: Type[Any]) -> pd.DataFrame:
+        path = os.path.join(self.uri, DATA_FILENAME)
+        if _is_local(self.uri):
+            return read_arrow(path.replace("file://", "", 1))
+        tmp_dir = tempfile.mkdtemp(prefix="zenml_arrow_")
+        try:
+            local_path = os.path.join(tmp_dir, DATA_FILENAME)
+            fileio.copy(path, local_path)
+            # Read fully before the temp file disappears.
+            return read_arrow(local_path).copy()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def save(self, data: pd.DataFrame) -> None:
+        path = os.path.join(self.uri, DATA_FILENAME)
+        if _is_local(self.uri):
+            write_arrow(data, path.replace("file://", "", 1))
+            return
+        tmp_dir = tempfile.mkdtemp(prefix="zenml_arrow_")
+        try:
+            local_path = write_arrow(data, os.path.join(tmp_dir, DATA_FILENAME))
+            fileio.copy(str(local_path), path, overwrite=True)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def extract_metadata(self, data: pd.DataFrame) -> Dict[str, Any]:
+        return {
+            "shape": f"{data.shape[0]}x{data.shape[1]}",
+            "memory_bytes": int(data.memory_usage(deep=False).sum()),
+        }
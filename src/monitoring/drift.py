@@ -0,0 +1,228 @@
+"""Data-drift monitoring between the training partition and scoring batches.
+
+The reference is a compact sketch of the training data (binned histograms, a
+quantile grid for KS and categorical frequency tables). Scoring batches are
+folded into fixed-size count arrays, so memory does not grow with the number
+of rows monitored and every batch can be checked.
+"""
+from __future__ import annotations
+
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OTHER = "__other__"
+EPS = 1e-6
+
+
+def _quantile_edges(values: np.ndarray, bins: int) -> np.ndarray:
+    """Interior bin edges at equal-frequency quantiles; duplicates collapse for discrete columns."""
+    if values.size == 0:
+        return np.empty(0)
+    return np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+
+
+def _bin_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Counts per bin for ``len(edges) + 1`` half-open bins spanning (-inf, inf)."""
+    idx = np.searchsorted(edges, values, side="right")
+    return np.bincount(idx, minlength=edges.size + 1)
+
+
+def build_reference(
+    df: pd.DataFrame,
+    label_column: str | None = None,
+    bins: int = 10,
+    ks_points: int = 100,
+    top_k: int = 50,
+) -> Dict[str, Any]:
+    """Sketch the training partition of ``df`` (rows with ``split == "train"`` when present)."""
+    if "split" in df.columns:
+        df = df[df["split"] == "train"]
+    drop = [c for c in ("split", label_column) if c and c in df.columns]
+    features = df.drop(columns=drop)
+
+    numeric: Dict[str, Any] = {}
+    categorical: Dict[str, Any] = {}
+    for col in features.columns:
+        series = features[col]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            edges = _quantile_edges(values, bins)
+            ks_edges = _quantile_edges(values, ks_points)
+            numeric[col] = {
+                "edges": edges.tolist(),
+                "counts": _bin_counts(values, edges).tolist(),
+                "ks_edges": ks_edges.tolist(),
+                "ks_counts": _bin_counts(values, ks_edges).tolist(),
+                "nulls": int(series.isna().sum()),
+            }
+        else:
+            counts = series.dropna().astype(str).value_counts()
+            top = counts.head(top_k)
+            table = {str(k): int(v) for k, v in top.items()}
+            other = int(counts.iloc[top_k:].sum())
+            if other:
+                table[OTHER] = other
+            categorical[col] = {"counts": table, "nulls": int(series.isna().sum())}
+
+    return {
+        "rows": int(len(features)),
+        "numeric": numeric,
+        "categorical": categorical,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def save_reference(reference: Dict[str, Any], path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(reference, indent=2), encoding="utf-8")
+    logger.info("Drift reference saved to %s", path)
+    return path
+
+
+def load_reference(path: str | Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two count vectors over the same bins."""
+    p = expected / max(expected.sum(), 1) + EPS
+    q = actual / max(actual.sum(), 1) + EPS
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def js_divergence(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Jensen-Shannon divergence (base 2, so bounded by 1) between two count vectors."""
+    p = expected / max(expected.sum(), 1)
+    q = actual / max(actual.sum(), 1)
+    m = 0.5 * (p + q)
+
+    def _kl(a: np.ndarray) -> float:
+        mask = a > 0
+        return float(np.sum(a[mask] * np.log2(a[mask] / m[mask])))
+
+    return 0.5 * _kl(p) + 0.5 * _kl(q)
+
+
+def ks_statistic(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Two-sample KS statistic evaluated on the reference quantile grid."""
+    if expected.sum() == 0 or actual.sum() == 0:
+        return 0.0
+    cdf_expected = np.cumsum(expected) / expected.sum()
+    cdf_actual = np.cumsum(actual) / actual.sum()
+    return float(np.max(np.abs(cdf_expected - cdf_actual)))
+
+
+class DriftMonitor:
+    """Accumulates scoring batches against a reference with fixed-size state."""
+
+    def __init__(self, reference: Dict[str, Any]) -> None:
+        self.reference = reference
+        self.rows = 0
+        self.batches = 0
+        self._edges = {c: np.asarray(s["edges"], dtype=float) for c, s in reference["numeric"].items()}
+        self._ks_edges = {
+            c: np.asarray(s["ks_edges"], dtype=float) for c, s in reference["numeric"].items()
+        }
+        self._counts = {c: np.zeros(e.size + 1, dtype=np.int64) for c, e in self._edges.items()}
+        self._ks_counts = {c: np.zeros(e.size + 1, dtype=np.int64) for c, e in self._ks_edges.items()}
+        self._categories = {
+            c: {key: i for i, key in enumerate(s["counts"])}
+            for c, s in reference["categorical"].items()
+        }
+        self._cat_counts = {
+            c: np.zeros(len(keys) + (OTHER not in keys), dtype=np.int64)
+            for c, keys in self._categories.items()
+        }
+        self.missing_columns: List[str] = []
+
+    def update(self, batch: pd.DataFrame) -> None:
+        self.rows += len(batch)
+        self.batches += 1
+        for col, edges in self._edges.items():
+            if col not in batch.columns:
+                self._note_missing(col)
+                continue
+            values = pd.to_numeric(batch[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self._counts[col] += _bin_counts(values, edges)
+            self._ks_counts[col] += _bin_counts(values, self._ks_edges[col])
+        for col, index in self._categories.items():
+            if col not in batch.columns:
+                self._note_missing(col)
+                continue
+            counts = batch[col].dropna().astype(str).value_counts()
+            # Unseen categories fold into the trailing "other" bucket.
+            other_slot = index.get(OTHER, len(index))
+            slots = counts.index.map(lambda key: index.get(key, other_slot)).to_numpy(dtype=np.int64)
+            np.add.at(self._cat_counts[col], slots, counts.to_numpy(dtype=np.int64))
+
+    def _note_missing(self, col: str) -> None:
+        if col not in self.missing_columns:
+            self.missing_columns.append(col)
+            logger.warning("Column %s from the drift reference is missing in the batch.", col)
+
+    def result(self, psi_threshold: float = 0.2) -> Dict[str, Any]:
+        columns: Dict[str, Dict[str, float]] = {}
+        for col, sketch in self.reference["numeric"].items():
+            expected = np.asarray(sketch["counts"], dtype=float)
+            actual = self._counts[col].astype(float)
+            columns[col] = {
+                "psi": psi(expected, actual),
+                "js": js_divergence(expected, actual),
+                "ks": ks_statistic(
+                    np.asarray(sketch["ks_counts"], dtype=float), self._ks_counts[col].astype(float)
+                ),
+            }
+        for col, sketch in self.reference["categorical"].items():
+            expected = np.zeros(self._cat_counts[col].size)
+            expected[: len(sketch["counts"])] = list(sketch["counts"].values())
+            actual = self._cat_counts[col].astype(float)
+            columns[col] = {"psi": psi(expected, actual), "js": js_divergence(expected, actual)}
+
+        drifted = sorted(c for c, m in columns.items() if m["psi"] >= psi_threshold)
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "psi_threshold": psi_threshold,
+            "drifted_columns": drifted,
+            "max_psi": max((m["psi"] for m in columns.values()), default=0.0),
+            "missing_columns": list(self.missing_columns),
+            "columns": columns,
+        }
+
+
+def monitor_batches(
+    reference: Dict[str, Any], batches: Iterable[pd.DataFrame], psi_threshold: float = 0.2
+) -> Dict[str, Any]:
+    """Fold every batch into one monitor and return the cumulative drift result."""
+    monitor = DriftMonitor(reference)
+    for batch in batches:
+        monitor.update(batch)
+    return monitor.result(psi_threshold)
+
+
+def drift_metrics(result: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten a drift result into MLflow metric names."""
+    metrics: Dict[str, float] = {
+        "drift_rows": float(result["rows"]),
+        "drift_max_psi": float(result["max_psi"]),
+        "drift_columns_drifted": float(len(result["drifted_columns"])),
+    }
+    for col, values in result["columns"].items():
+        for name, value in values.items():
+            # MLflow only accepts alphanumerics, "_-./" and spaces in metric names.
+            safe_col = re.sub(r"[^\w\-./ ]", "_", str(col))
+            metrics[f"drift_{name}.{safe_col}"] = float(value)
+    return metrics
@@ -0,0 +1,223 @@
+"""Run many dataset/label training jobs on one bounded process pool.
+
+``jobs.yaml`` lists job specs; each is merged over the base pipeline config,
+given its own data/artifact directories and written out as a standalone config
+file, so every job runs the regular single-job stages unchanged. Jobs are
+admitted while the sum of their ``num_cpus`` fits the pool's CPU budget, which
+never exceeds the container's cgroup CPU quota (see ``resources``).
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping
+
+import yaml
+
+from src.orchestration.resources import available_cpus
+from src.utils.config_loader import load_config, load_yaml, thaw, validate_config
+from src.utils.logger import get_logger, log_context
+
+logger = get_logger(__name__)
+
+DEFAULT_JOBS_PATH = "src/config/jobs.yaml"
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+@dataclass
+class JobSpec:
+    name: str
+    config_path: str
+    num_cpus: int
+
+
+@dataclass
+class JobResult:
+    name: str
+    status: str
+    duration_s: float
+    config_path: str
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+def _deep_merge(base: Dict[str, Any], override: Mapping[str, Any]) -> Dict[str, Any]:
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = thaw(value)
+    return merged
+
+
+def _job_config(
+    base: Dict[str, Any], job: Mapping[str, Any], output_root: Path, max_cpus: int
+) -> Dict[str, Any]:
+    """Base config + job overrides, with every output path moved under the job's directory.
+
+    ``raw_data`` and ``label_column`` are accepted as shorthands for
+    ``paths.raw_data`` and ``training.label_column``.
+    """
+    name = job["name"]
+    job_dir = output_root / name
+    shorthands = ("name", "num_cpus", "raw_data", "label_column")
+    overrides = {key: value for key, value in job.items() if key not in shorthands}
+    # Deep copy: the job-specific paths below must never leak into the shared base.
+    cfg = _deep_merge(copy.deepcopy(base), overrides)
+
+    paths = cfg.setdefault("paths", {})
+    if "raw_data" in job:
+        paths["raw_data"] = job["raw_data"]
+    if "label_column" in job:
+        cfg.setdefault("training", {})["label_column"] = job["label_column"]
+    paths["processed_data"] = str(job_dir / "data" / "processed.csv")
+    paths["models_dir"] = str(job_dir / "models")
+    paths["registry_dir"] = str(job_dir / "registry")
+    training = cfg.setdefault("training", {})
+    training["model_name"] = f"{training.get('model_name', 'autogluon_best')}_{name}"
+    num_cpus = int(job.get("num_cpus", training.get("num_cpus", 1)))
+    if num_cpus > max_cpus:
+        logger.warning("Job %s asks for %d CPUs; capping at pool budget %d.", name, num_cpus, max_cpus)
+    training["num_cpus"] = min(num_cpus, max_cpus)
+    # Concurrent jobs split the memory budget in proportion to their CPUs.
+    cfg.setdefault("resources", {})["memory_share"] = round(training["num_cpus"] / max_cpus, 4)
+    cfg.setdefault("gating", {})["index_path"] = str(job_dir / "metrics_index.json")
+    cfg.setdefault("monitoring", {})["reference_path"] = str(job_dir / "monitoring" / "drift_reference.json")
+    cfg["monitoring"]["report_path"] = str(job_dir / "monitoring" / "drift_report.json")
+    cfg.setdefault("profiling", {})["report_path"] = str(job_dir / "timings" / "timing_report.json")
+    return cfg
+
+
+def load_jobs(
+    jobs_path: str = DEFAULT_JOBS_PATH, base_config_path: str = "src/config/config.yaml"
+) -> tuple[List[JobSpec], Dict[str, Any]]:
+    """Expand ``jobs.yaml`` into per-job config files; returns the specs and pool settings."""
+    spec = load_yaml(jobs_path) or {}
+    pool = dict(spec.get("pool") or {})
+    output_root = Path(pool.get("output_root", "artifacts/jobs"))
+    base = thaw(load_config(base_config_path))
+    available = available_cpus(base.get("resources"))
+    max_cpus = int(pool.get("max_cpus") or available)
+    if max_cpus > available:
+        logger.warning("Pool max_cpus %d exceeds the %d CPUs this container may use; capping.", max_cpus, available)
+        max_cpus = available
+    pool["max_cpus"] = max_cpus
+
+    jobs: List[JobSpec] = []
+    seen = set()
+    for job in spec.get("jobs") or []:
+        name = job.get("name")
+        if not name or name in seen:
+            raise ValueError(f"Every job needs a unique name (got {name!r}).")
+        seen.add(name)
+        cfg = _job_config(base, job, output_root, max_cpus)
+        validate_config(cfg)
+        config_path = output_root / name / "config.yaml"
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        config_path.write_text(yaml.safe_dump(cfg, sort_keys=False), encoding="utf-8")
+        jobs.append(JobSpec(name, str(config_path), cfg["training"]["num_cpus"]))
+    return jobs, pool
+
+
+def limit_threads(num_cpus: int) -> None:
+    """Cap BLAS/OpenMP pools for this process and the libraries it loads later."""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(num_cpus)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(num_cpus)
+
+
+def _run_job(spec: JobSpec, runner: Callable[[str], Dict[str, Any]]) -> JobResult:
+    """Executed in a pool worker; never raises so one failing job cannot stop the others."""
+    limit_threads(spec.num_cpus)
+    start = time.perf_counter()
+    with log_context(job=spec.name):
+        try:
+            artifacts = runner(spec.config_path)
+            status, error = "succeeded", None
+        except Exception:  # pylint: disable=broad-except
+            artifacts, status, error = {}, "failed", traceback.format_exc()
+            logger.error("Job %s failed:\n%s", spec.name, error)
+    return JobResult(spec.name, status, time.perf_counter() - start, spec.config_path, artifacts, error)
+
+
+def _warm_imports(modules: List[str]) -> None:
+    """Pool initializer: import heavy modules once per worker, reused by every job it runs."""
+    for module in modules:
+        try:
+            __import__(module)
+        except ImportError as exc:
+            logger.debug("Warm import of %s skipped: %s", module, exc)
+
+
+def run_jobs(
+    jobs: List[JobSpec],
+    runner: Callable[[str], Dict[str, Any]],
+    max_cpus: int | None = None,
+    max_workers: int | None = None,
+    start_method: str = "spawn",
+    warm_imports: List[str] | None = None,
+) -> List[JobResult]:
+    """Run ``runner(config_path)`` for each job; at most ``max_cpus`` job CPUs are in flight."""
+    if not jobs:
+        return []
+    budget = max_cpus or available_cpus()
+    workers = max_workers or min(len(jobs), budget)
+    pending = sorted(jobs, key=lambda job: job.num_cpus, reverse=True)
+    for job in pending:
+        job.num_cpus = min(job.num_cpus, budget)
+
+    results: List[JobResult] = []
+    running: Dict[Future, JobSpec] = {}
+    in_use = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context(start_method),
+        initializer=_warm_imports,
+        initargs=(list(warm_imports or []),),
+    ) as pool:
+        while pending or running:
+            # Admit the largest jobs that still fit the remaining CPU budget.
+            for job in list(pending):
+                if len(running) < workers and in_use + job.num_cpus <= budget:
+                    pending.remove(job)
+                    running[pool.submit(_run_job, job, runner)] = job
+                    in_use += job.num_cpus
+                    logger.info("Started job %s (%d CPUs, %d/%d in use)", job.name, job.num_cpus, in_use, budget)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                in_use -= job.num_cpus
+                try:
+                    result = future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Worker crashed (e.g. OOM kill); record it instead of aborting the pool.
+                    result = JobResult(job.name, "failed", 0.0, job.config_path, error=repr(exc))
+                results.append(result)
+                logger.info("Job %s %s in %.1fs", result.name, result.status, result.duration_s)
+    return sorted(results, key=lambda result: result.name)
+
+
+def write_summary(results: List[JobResult], path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    summary = {
+        "jobs": len(results),
+        "succeeded": sum(result.status == "succeeded" for result in results),
+        "failed": sum(result.status == "failed" for result in results),
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(summary, indent=2, default=str), encoding="utf-8")
+    logger.info("Job summary written to %s", path)
+    return path
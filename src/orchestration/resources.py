@@ -0,0 +1,266 @@
+"""cgroup-aware CPU, memory and GPU budgets for the pipeline stages.
+
+Inside a container ``os.cpu_count()`` and the host's RAM describe the node, not
+the slice this job may use: a two-CPU quota on a 64-core host still reports 64
+cores, and AutoGluon sizes its workers and memory checks accordingly until the
+kernel OOM-kills it. ``detect_limits`` reads the cgroup v2 (``cpu.max``,
+``memory.max``/``memory.high``) or v1 (``cpu.cfs_quota_us``,
+``memory.limit_in_bytes``) limits of this process's cgroup and its ancestors,
+together with the CPU affinity mask and the visible GPUs. ``stage_budget`` turns
+them into the ``num_cpus``/``num_gpus``/``memory_limit`` handed to AutoGluon,
+the security worker pool and the BLAS/OpenMP thread caps.
+"""
+from __future__ import annotations
+
+import functools
+import math
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULTS: Dict[str, Any] = {
+    "enabled": True,
+    "cgroup_root": "/sys/fs/cgroup",
+    "memory_fraction": 0.85,  # of the effective limit; the rest is headroom for the interpreter and page cache
+    "memory_share": 1.0,  # set per job by the multi-job pool
+    "train": {"cpu_fraction": 1.0},
+    "security": {"cpu_fraction": 1.0, "max_workers": 4},
+}
+
+# cgroup v1 reports "no limit" as a page-aligned LONG_MAX.
+_V1_UNLIMITED = 1 << 62
+
+
+@dataclass
+class ResourceLimits:
+    cpus: float
+    memory_bytes: int
+    gpus: int
+    host_cpus: int
+    host_memory_bytes: int
+    cgroup_version: int | None = None
+    sources: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class StageBudget:
+    stage: str
+    num_cpus: int
+    num_gpus: int
+    memory_limit_gb: float
+    workers: int = 1
+
+    @property
+    def threads_per_worker(self) -> int:
+        return max(1, self.num_cpus // max(self.workers, 1))
+
+    def autogluon_kwargs(self) -> Dict[str, Any]:
+        """``TabularPredictor.fit`` resource arguments."""
+        return {"num_cpus": self.num_cpus, "num_gpus": self.num_gpus, "memory_limit": self.memory_limit_gb}
+
+
+def merge_config(config: Mapping[str, Any] | None) -> Dict[str, Any]:
+    merged = {**DEFAULTS, **dict(config or {})}
+    for stage in ("train", "security"):
+        merged[stage] = {**DEFAULTS[stage], **dict((config or {}).get(stage) or {})}
+    return merged
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="ascii").strip()
+    except OSError:
+        return None
+
+
+def _cgroup_paths(proc_cgroup: str = "/proc/self/cgroup") -> Dict[str, str]:
+    """Controller -> cgroup path of this process; the v2 unified hierarchy is keyed ``""``."""
+    paths: Dict[str, str] = {}
+    for line in (_read(Path(proc_cgroup)) or "").splitlines():
+        parts = line.split(":", 2)
+        if len(parts) != 3:
+            continue
+        _, controllers, path = parts
+        for controller in controllers.split(",") if controllers else [""]:
+            paths[controller.replace("name=", "")] = path
+    return paths
+
+
+def _ancestors(mount: Path, cgroup_path: str) -> List[Path]:
+    """The process's cgroup directory and its parents up to ``mount``.
+
+    With a private cgroup namespace (the Docker default on v2) the path is ``/``
+    and the mount itself is the container's cgroup.
+    """
+    leaf = mount / cgroup_path.lstrip("/")
+    if not leaf.is_dir():
+        return [mount]
+    dirs = [leaf]
+    while dirs[-1] != mount and mount in dirs[-1].parents:
+        dirs.append(dirs[-1].parent)
+    return dirs
+
+
+def _v2_limits(mount: Path, cgroup_path: str) -> Tuple[float | None, int | None]:
+    cpus: float | None = None
+    memory: int | None = None
+    for directory in _ancestors(mount, cgroup_path):
+        cpu_max = _read(directory / "cpu.max")
+        if cpu_max:
+            quota, _, period = cpu_max.partition(" ")
+            if quota != "max" and period:
+                value = int(quota) / int(period)
+                cpus = value if cpus is None else min(cpus, value)
+        for name in ("memory.max", "memory.high"):
+            raw = _read(directory / name)
+            if raw and raw != "max":
+                memory = int(raw) if memory is None else min(memory, int(raw))
+    return cpus, memory
+
+
+def _v1_limits(mount: Path, paths: Mapping[str, str]) -> Tuple[float | None, int | None]:
+    cpus: float | None = None
+    memory: int | None = None
+    for controller in ("cpu,cpuacct", "cpu"):
+        base = mount / controller
+        if not base.is_dir():
+            continue
+        for directory in _ancestors(base, paths.get("cpu", "/")):
+            quota = _read(directory / "cpu.cfs_quota_us")
+            period = _read(directory / "cpu.cfs_period_us")
+            if quota and period and int(quota) > 0:
+                value = int(quota) / int(period)
+                cpus = value if cpus is None else min(cpus, value)
+        break
+    base = mount / "memory"
+    if base.is_dir():
+        for directory in _ancestors(base, paths.get("memory", "/")):
+            raw = _read(directory / "memory.limit_in_bytes")
+            if raw and int(raw) < _V1_UNLIMITED:
+                memory = int(raw) if memory is None else min(memory, int(raw))
+    return cpus, memory
+
+
+def _visible_gpus() -> int:
+    visible = os.getenv("CUDA_VISIBLE_DEVICES")
+    if visible is not None:
+        devices = [device for device in visible.split(",") if device.strip()]
+        return 0 if not devices or devices[0].strip() == "-1" else len(devices)
+    return sum(1 for path in Path("/dev").glob("nvidia[0-9]*"))
+
+
+def _host_memory() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+@functools.lru_cache(maxsize=None)
+def detect_limits(cgroup_root: str = DEFAULTS["cgroup_root"]) -> ResourceLimits:
+    """Effective CPU/memory/GPU limits of this process (cached; limits do not change at runtime)."""
+    host_cpus = os.cpu_count() or 1
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:
+        affinity = host_cpus
+    host_memory = _host_memory()
+    sources = {"cpus": "affinity" if affinity < host_cpus else "host", "memory": "host"}
+
+    mount = Path(cgroup_root)
+    paths = _cgroup_paths()
+    version: int | None = None
+    quota: float | None = None
+    memory: int | None = None
+    if (mount / "cgroup.controllers").exists():
+        version = 2
+        quota, memory = _v2_limits(mount, paths.get("", "/"))
+    elif mount.is_dir() and any((mount / name).is_dir() for name in ("cpu", "cpu,cpuacct", "memory")):
+        version = 1
+        quota, memory = _v1_limits(mount, paths)
+
+    cpus = float(affinity)
+    if quota is not None and quota < cpus:
+        cpus, sources["cpus"] = quota, f"cgroup v{version} quota"
+    effective_memory = host_memory
+    if memory is not None and (not host_memory or memory < host_memory):
+        effective_memory, sources["memory"] = memory, f"cgroup v{version} limit"
+    return ResourceLimits(
+        cpus=cpus,
+        memory_bytes=effective_memory,
+        gpus=_visible_gpus(),
+        host_cpus=host_cpus,
+        host_memory_bytes=host_memory,
+        cgroup_version=version,
+        sources=sources,
+    )
+
+
+def available_cpus(config: Mapping[str, Any] | None = None) -> int:
+    """Whole CPUs this process may use (at least one)."""
+    settings = merge_config(config)
+    if not settings["enabled"]:
+        return os.cpu_count() or 1
+    return max(1, math.floor(detect_limits(settings["cgroup_root"]).cpus))
+
+
+def stage_budget(
+    stage: str, config: Mapping[str, Any] | None = None, num_cpus: int | str = "auto"
+) -> StageBudget | None:
+    """Budget for ``stage`` (``train`` or ``security``); ``None`` when the governor is disabled.
+
+    An explicit ``num_cpus`` is honoured but capped at the detected limit. The
+    memory budget is ``memory_fraction`` of the effective limit, scaled by
+    ``memory_share`` when several jobs run side by side.
+    """
+    settings = merge_config(config)
+    if not settings["enabled"]:
+        return None
+    limits = detect_limits(settings["cgroup_root"])
+    stage_cfg = settings.get(stage) or {}
+    cpus = max(1, math.floor(limits.cpus * float(stage_cfg.get("cpu_fraction", 1.0))))
+    if num_cpus != "auto":
+        if int(num_cpus) > cpus:
+            logger.warning("Stage %s asks for %s CPUs but only %d are available; capping.", stage, num_cpus, cpus)
+        cpus = max(1, min(int(num_cpus), cpus))
+    memory = limits.memory_bytes * float(settings["memory_fraction"]) * float(settings["memory_share"])
+    workers = max(1, min(int(stage_cfg.get("max_workers", 1)), cpus))
+    return StageBudget(stage, cpus, limits.gpus, round(memory / 2**30, 2), workers)
+
+
+def apply_budget(budget: StageBudget | None) -> None:
+    """Cap BLAS/OpenMP thread pools to the budget's threads per worker."""
+    if budget is None:
+        return
+    from src.orchestration.jobs import limit_threads
+
+    limit_threads(budget.threads_per_worker)
+
+
+def log_limits(config: Mapping[str, Any] | None = None) -> ResourceLimits | None:
+    """Log the effective limits once at startup."""
+    settings = merge_config(config)
+    if not settings["enabled"]:
+        logger.info("Resource governor disabled; libraries size themselves to the host.")
+        return None
+    limits = detect_limits(settings["cgroup_root"])
+    logger.info(
+        "Effective resources: %.2f CPUs (%s, host %d), %.2f GiB memory (%s, host %.2f GiB), %d GPUs, cgroup %s",
+        limits.cpus,
+        limits.sources["cpus"],
+        limits.host_cpus,
+        limits.memory_bytes / 2**30,
+        limits.sources["memory"],
+        limits.host_memory_bytes / 2**30,
+        limits.gpus,
+        f"v{limits.cgroup_version}" if limits.cgroup_version else "not found",
+    )
+    return limits
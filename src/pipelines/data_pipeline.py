@@ -2,29 +2,42 @@ from src import zenml_patches  # noqa: F401
 from zenml import pipeline
 
 from src.steps.data_loader_step import load_data_step
-from src.steps.preprocess_step import preprocess_step
+from src.steps.preprocess_step import export_processed_step, preprocess_step, profile_step
 from src.utils.config_loader import load_config
+from src.utils.fingerprint import path_fingerprint
 from src.utils.logger import get_logger
+from src.utils.zenml_cache import write_cache_report
 
 logger = get_logger(__name__)
 
 
-@pipeline
+@pipeline(enable_cache=True)
 def data_pipeline(
     raw_path: str,
+    raw_fingerprint: str,
     label_column: str,
     test_size: float,
     random_state: int,
     processed_path: str,
+    profile_bins: int = 20,
+    optimize_dtypes: bool = True,
+    max_category_ratio: float = 0.5,
+    float_rtol: float | None = None,
 ):
-    df = load_data_step(raw_path=raw_path)
-    return preprocess_step(
+    df = load_data_step(raw_path=raw_path, raw_fingerprint=raw_fingerprint)
+    processed = preprocess_step(
         df=df,
         label_column=label_column,
         test_size=test_size,
         random_state=random_state,
-        processed_path=processed_path,
+        optimize=optimize_dtypes,
+        max_category_ratio=max_category_ratio,
+        float_rtol=float_rtol,
     )
+    exported_path = export_processed_step(processed=processed, processed_path=processed_path)
+    # Profile after the export so the stats file is stamped with the final CSV.
+    profile_step(processed=processed, processed_path=exported_path, bins=profile_bins)
+    return exported_path
 
 
 def run_data_pipeline(config_path: str = "src/config/config.yaml") -> str:
@@ -32,13 +45,19 @@ def run_data_pipeline(config_path: str = "src/config/config.yaml") -> str:
     paths = cfg["paths"]
     preprocess_cfg = cfg["preprocess"]
 
-    data_flow = data_pipeline(
+    data_pipeline(
         raw_path=paths["raw_data"],
+        raw_fingerprint=path_fingerprint(paths["raw_data"]),
         label_column=cfg["training"]["label_column"],
         test_size=preprocess_cfg["test_size"],
         random_state=preprocess_cfg["random_state"],
         processed_path=paths["processed_data"],
+        profile_bins=cfg.get("data_profile", {}).get("bins", 20),
+        optimize_dtypes=preprocess_cfg.get("optimize_dtypes", True),
+        max_category_ratio=preprocess_cfg.get("max_category_ratio", 0.5),
+        float_rtol=preprocess_cfg.get("float_rtol"),
     )
+    write_cache_report(data_pipeline.name)
     processed_path = paths["processed_data"]
     logger.info("Data pipeline completed: %s", processed_path)
     return processed_path
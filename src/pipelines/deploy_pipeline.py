@@ -1,47 +1,129 @@
 import os
+from typing import Any, Dict
 from autogluon.tabular import TabularPredictor
 from src import zenml_patches  # noqa: F401
 from zenml import pipeline, step
 
-from src.utils.config_loader import load_config
+from src.training.gating import read_decision
+from src.steps.train_step import models_fingerprint as compute_models_fingerprint
+from src.utils.config_loader import load_config, thaw
 from src.utils.logger import get_logger
+from src.utils.zenml_cache import write_cache_report
 
 logger = get_logger(__name__)
 
 
 @step
-def load_predictor_step(models_dir: str) -> TabularPredictor:
+def load_predictor_step(models_dir: str, models_fingerprint: str) -> TabularPredictor:
     predictor = TabularPredictor.load(models_dir)
     logger.info("Loaded predictor from %s", models_dir)
     return predictor
 
 
-@step
-def save_best_model_step(predictor: TabularPredictor, registry_dir: str) -> str:
-    if hasattr(predictor, "get_model_best"):
-        best_model = predictor.get_model_best()
-    else:
-        best_model = getattr(predictor, "model_best", "best")
-    os.makedirs(registry_dir, exist_ok=True)
-    predictor.save(registry_dir)
-    logger.info("Best model %s saved to registry: %s", best_model, registry_dir)
-    return os.path.join(registry_dir, best_model)
-
-
-@pipeline
-def deploy_pipeline(models_dir: str, registry_dir: str):
-    predictor = load_predictor_step(models_dir=models_dir)
-    best_path = save_best_model_step(predictor=predictor, registry_dir=registry_dir)
+@step(enable_cache=False)
+def save_best_model_step(
+    predictor: TabularPredictor, registry_dir: str, processed_path: str, label_column: str, warmup_rows: int
+) -> str:
+    from src.data.load_data import load_processed_partition
+    from src.serving.registry import WARMUP_FILE, discard_staging, new_staging_dir
+
+    staging_dir = new_staging_dir(registry_dir)
+    try:
+        predictor.clone_for_deployment(path=str(staging_dir))
+        test_df = load_processed_partition(processed_path, "test")
+        test_df.drop(columns=[label_column]).head(warmup_rows).to_csv(staging_dir / WARMUP_FILE, index=False)
+    except BaseException:
+        discard_staging(staging_dir)
+        raise
+    logger.info("Best model %s staged for the registry: %s", predictor.model_best, staging_dir)
+    return str(staging_dir)
+
+
+@step(enable_cache=False)
+def export_onnx_step(
+    version_dir: str, processed_path: str, label_column: str, onnx_config: Dict[str, Any]
+) -> Dict[str, Any]:
+    from src.data.load_data import load_processed_partition
+    from src.serving.onnx_export import export_onnx
+    from src.serving.registry import discard_staging
+
+    try:
+        predictor = TabularPredictor.load(version_dir)
+        test_df = load_processed_partition(processed_path, "test")
+        return export_onnx(predictor, test_df, label_column, version_dir, onnx_config)
+    except BaseException:
+        # publish_version_step will not run; drop the unpublished version.
+        discard_staging(version_dir)
+        raise
+
+
+@step(enable_cache=False)
+def publish_version_step(version_dir: str, registry_dir: str, keep_versions: int) -> str:
+    from src.serving.registry import discard_staging, prune_versions, publish_version, versions_root
+
+    try:
+        best_model = TabularPredictor.load(version_dir).model_best
+        version = publish_version(registry_dir, version_dir)
+    except BaseException:
+        discard_staging(version_dir)
+        raise
+    prune_versions(registry_dir, keep_versions)
+    return os.path.join(versions_root(registry_dir), version, best_model)
+
+
+@pipeline(enable_cache=True)
+def deploy_pipeline(
+    models_dir: str,
+    models_fingerprint: str,
+    registry_dir: str,
+    processed_path: str,
+    label_column: str,
+    onnx_config: Dict[str, Any],
+    hot_swap_config: Dict[str, Any],
+):
+    predictor = load_predictor_step(models_dir=models_dir, models_fingerprint=models_fingerprint)
+    version_dir = save_best_model_step(
+        predictor=predictor,
+        registry_dir=registry_dir,
+        processed_path=processed_path,
+        label_column=label_column,
+        warmup_rows=int(hot_swap_config.get("warmup_rows", 64)),
+    )
+    after = None
+    if onnx_config.get("enabled", True):
+        export_onnx_step(
+            version_dir=version_dir,
+            processed_path=processed_path,
+            label_column=label_column,
+            onnx_config=onnx_config,
+        )
+        after = "export_onnx_step"
+    best_path = publish_version_step(
+        version_dir=version_dir,
+        registry_dir=registry_dir,
+        keep_versions=int(hot_swap_config.get("keep_versions", 5)),
+        after=after,
+    )
     return best_path
 
 
 def run_deploy_pipeline(config_path: str = "src/config/config.yaml") -> str:
     cfg = load_config(config_path)
     paths = cfg["paths"]
+    decision = read_decision(paths["models_dir"])
+    if decision is not None and not decision.get("promote", True):
+        logger.info("Skipping deploy pipeline: challenger lost the gate (%s).", decision.get("reason"))
+        return paths["registry_dir"]
     flow = deploy_pipeline(
         models_dir=paths["models_dir"],
+        models_fingerprint=compute_models_fingerprint(paths["models_dir"]),
         registry_dir=paths["registry_dir"],
+        processed_path=paths["processed_data"],
+        label_column=cfg["training"]["label_column"],
+        onnx_config=thaw(cfg.get("deploy", {}).get("onnx", {})),
+        hot_swap_config=thaw(cfg.get("serving", {}).get("hot_swap", {})),
     )
+    write_cache_report(deploy_pipeline.name)
     best_path = flow
     logger.info("Deploy pipeline exported best model to %s", best_path)
     return best_path
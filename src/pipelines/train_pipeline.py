@@ -2,18 +2,23 @@ import os
 from src import zenml_patches  # noqa: F401
 from zenml import pipeline
 
-from src.steps.train_step import train_step
+from src.steps.data_loader_step import load_processed_step
+from src.steps.train_step import models_fingerprint, train_step
 from src.steps.evaluate_step import evaluate_step
 from src.steps.register_step import register_step
-from src.utils.config_loader import load_config
+from src.training.gating import DECISION_FILE, staging_dir
+from src.utils.config_loader import load_config, thaw
+from src.utils.fingerprint import path_fingerprint
 from src.utils.logger import get_logger
+from src.utils.zenml_cache import write_cache_report
 
 logger = get_logger(__name__)
 
 
-@pipeline
+@pipeline(enable_cache=True)
 def train_pipeline(
     processed_path: str,
+    processed_fingerprint: str,
     label_column: str,
     presets: str,
     time_limit: int,
@@ -22,9 +27,16 @@ def train_pipeline(
     experiment_name: str,
     model_name: str,
     hyperparameters: dict | None = None,
+    gating: dict | None = None,
+    resources: dict | None = None,
+    champion_fingerprint: str = "",
+    num_cpus: int | str = "auto",
 ):
+    processed = load_processed_step(
+        processed_path=processed_path, processed_fingerprint=processed_fingerprint
+    )
     train_outputs = train_step(
-        processed_path=processed_path,
+        processed=processed,
         label_column=label_column,
         presets=presets,
         time_limit=time_limit,
@@ -32,19 +44,25 @@ def train_pipeline(
         models_dir=models_dir,
         experiment_name=experiment_name,
         hyperparameters=hyperparameters,
+        resources=resources,
+        champion_fingerprint=champion_fingerprint,
+        num_cpus=num_cpus,
     )
-    evaluate_step(
+    challenger_dir = staging_dir(models_dir)
+    evaluate_outputs = evaluate_step(
         train_outputs=train_outputs,
-        models_dir=models_dir,
-        processed_path=processed_path,
+        models_dir=challenger_dir,
+        processed=processed,
         label_column=label_column,
         experiment_name=experiment_name,
-        output_dir=models_dir,
+        output_dir=challenger_dir,
     )
     register_step(
         train_outputs=train_outputs,
+        evaluate_outputs=evaluate_outputs,
         models_dir=models_dir,
         model_name=model_name,
+        gating=gating,
     )
 
 
@@ -58,6 +76,7 @@ def run_train_pipeline(config_path: str = "src/config/config.yaml") -> dict:
 
     train_pipeline(
         processed_path=paths["processed_data"],
+        processed_fingerprint=path_fingerprint(paths["processed_data"]),
         label_column=training_cfg["label_column"],
         presets=training_cfg["presets"],
         time_limit=training_cfg["time_limit"],
@@ -65,14 +84,21 @@ def run_train_pipeline(config_path: str = "src/config/config.yaml") -> dict:
         models_dir=models_dir,
         experiment_name=experiment_name,
         model_name=training_cfg.get("model_name", "autogluon_best"),
-        hyperparameters=training_cfg.get("hyperparameters"),
+        hyperparameters=thaw(training_cfg.get("hyperparameters")),
+        gating=thaw(cfg.get("gating")),
+        resources=thaw(cfg.get("resources")),
+        champion_fingerprint=models_fingerprint(models_dir),
+        num_cpus=training_cfg.get("num_cpus", "auto"),
     )
+    cache_stats = write_cache_report(train_pipeline.name)
     artifacts = {
         "processed_path": paths["processed_data"],
         "leaderboard": os.path.join(models_dir, "leaderboard.csv"),
         "feature_importance": os.path.join(models_dir, "feature_importance.csv"),
         "metrics": os.path.join(models_dir, "evaluation_metrics.json"),
+        "gating_decision": os.path.join(models_dir, DECISION_FILE),
         "model_name": training_cfg.get("model_name", "autogluon_best"),
+        "cache_hit_rate": cache_stats.get("cache_hit_rate"),
     }
     logger.info("Train pipeline completed with artifacts: %s", artifacts)
     return artifacts
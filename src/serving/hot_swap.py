@@ -0,0 +1,122 @@
+"""Serve the live registry version and swap in new deploys without a restart.
+
+A background thread polls the registry's ``CURRENT`` pointer. A new version is
+loaded and warmed with its sample batch off the request path, then replaces the
+active ``(version, predictor)`` pair in a single reference assignment; requests
+already running keep the predictor they started with.
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+import pandas as pd
+
+from src.serving.registry import WARMUP_FILE, read_current, versions_root
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULTS: Dict[str, Any] = {
+    "poll_interval_s": 5.0,
+    "keep_versions": 5,
+    "warmup_rows": 64,
+}
+
+
+class HotSwapPredictor:
+    def __init__(
+        self,
+        registry_dir: str | Path,
+        loader: Callable[[Path], Any],
+        poll_interval_s: float = DEFAULTS["poll_interval_s"],
+    ) -> None:
+        self.registry_dir = Path(registry_dir)
+        self.loader = loader
+        self.poll_interval_s = float(poll_interval_s)
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        version = read_current(self.registry_dir)
+        if version is None:
+            raise FileNotFoundError(f"No published version in {self.registry_dir}")
+        self._active: Tuple[str, Any] = (version, self._load(version))
+        self._rejected: str | None = None
+        self.swaps = 0
+        self.failed_swaps = 0
+
+    @property
+    def version(self) -> str:
+        return self._active[0]
+
+    @property
+    def predictor(self) -> Any:
+        return self._active[1]
+
+    def predict(self, df: pd.DataFrame) -> Any:
+        return self._active[1].predict(df)
+
+    def predict_proba(self, df: pd.DataFrame) -> Any:
+        return self._active[1].predict_proba(df)
+
+    def _load(self, version: str) -> Any:
+        version_dir = versions_root(self.registry_dir) / version
+        predictor = self.loader(version_dir)
+        if hasattr(predictor, "persist"):
+            # Keep models in memory so pruning an old version directory cannot break live requests.
+            predictor.persist()
+        warmup_path = version_dir / WARMUP_FILE
+        if warmup_path.exists():
+            # Pays lazy model loading and first-call allocations before any request does.
+            predictor.predict(pd.read_csv(warmup_path))
+        return predictor
+
+    def check_for_update(self) -> bool:
+        """Swap to the version ``CURRENT`` points at; a version that fails to load is not retried."""
+        with self._swap_lock:
+            version = read_current(self.registry_dir)
+            if version is None or version in (self._active[0], self._rejected):
+                return False
+            try:
+                predictor = self._load(version)
+            except Exception:  # pylint: disable=broad-except
+                self._rejected = version
+                self.failed_swaps += 1
+                logger.exception("Could not load registry version %s; still serving %s", version, self._active[0])
+                return False
+            previous = self._active[0]
+            self._active = (version, predictor)
+            self.swaps += 1
+        logger.info("Swapped serving model %s -> %s", previous, version)
+        return True
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval_s):
+            self.check_for_update()
+
+    def start(self) -> "HotSwapPredictor":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="registry-watch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def hot_swap_predictor(registry_dir: str | Path, serving_cfg: Mapping[str, Any] | None = None) -> HotSwapPredictor:
+    """Watching predictor built from the ``serving`` config section (ONNX + cache per version)."""
+    from src.serving.onnx_runtime import load_serving_predictor
+
+    serving_cfg = serving_cfg or {}
+    hot_swap_cfg = {**DEFAULTS, **(serving_cfg.get("hot_swap") or {})}
+    cache_cfg = serving_cfg.get("cache")
+
+    def _loader(version_dir: Path) -> Any:
+        return load_serving_predictor(version_dir, cache_config=dict(cache_cfg) if cache_cfg else None)
+
+    return HotSwapPredictor(registry_dir, _loader, hot_swap_cfg["poll_interval_s"]).start()
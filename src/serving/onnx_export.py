@@ -0,0 +1,241 @@
+"""Compile the deployed best model to ONNX and compare it with the native predictor.
+
+Only single tree models (LightGBM, XGBoost, CatBoost, RandomForest/ExtraTrees)
+whose AutoGluon feature generation is a numeric pass-through are compiled; the
+pass-through is verified on the test partition rather than assumed. Anything
+else (weighted ensembles of several models, bagged models, categorical or text
+features, missing converters) is reported as unsupported and serving keeps
+using the native TabularPredictor.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from src.serving.onnx_runtime import MANIFEST_FILE, OnnxPredictor
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULTS: Dict[str, Any] = {
+    "enabled": True,
+    "output_subdir": "onnx",
+    "parity_threshold": 0.999,
+    "regression_rtol": 1e-4,
+    "latency_repeats": 200,
+    "batch_size": 1024,
+    "intra_op_threads": 1,
+    "log_to_mlflow": True,
+}
+REPORT_FILE = "export_report.json"
+# AutoGluon's RF/XT models fill missing values with 0 before calling sklearn.
+_FILL_NAN = {"sklearn": 0.0}
+
+
+class UnsupportedModel(Exception):
+    """The best model cannot be compiled; the native predictor stays in use."""
+
+
+def _resolve_single_model(predictor: Any) -> tuple[str, Any]:
+    """Name and AutoGluon model object of the single model behind ``model_best``."""
+    trainer = predictor._trainer  # pylint: disable=protected-access
+    name = predictor.model_best
+    model = trainer.load_model(name)
+    if type(model).__name__ == "WeightedEnsembleModel":
+        weights = {k: v for k, v in model._get_model_weights().items() if v > 0}  # pylint: disable=protected-access
+        if len(weights) != 1:
+            raise UnsupportedModel(f"{name} is an ensemble of {len(weights)} models")
+        name = next(iter(weights))
+        model = trainer.load_model(name)
+    if hasattr(model, "models") and hasattr(model, "_child_type"):
+        raise UnsupportedModel(f"{name} is a bagged model")
+    return name, model
+
+
+def _estimator_family(estimator: Any) -> str:
+    family = type(estimator).__module__.split(".")[0]
+    if family not in ("lightgbm", "xgboost", "catboost", "sklearn"):
+        raise UnsupportedModel(f"no ONNX converter for {type(estimator).__name__}")
+    return family
+
+
+def _check_passthrough(predictor: Any, features: List[str], sample: pd.DataFrame) -> None:
+    """Fail unless the feature generator hands the model its raw numeric columns unchanged."""
+    missing = [f for f in features if f not in sample.columns]
+    if missing:
+        raise UnsupportedModel(f"model features are generated, not raw columns: {missing[:5]}")
+    non_numeric = [
+        f for f in features
+        if not pd.api.types.is_numeric_dtype(sample[f]) or pd.api.types.is_bool_dtype(sample[f])
+    ]
+    if non_numeric:
+        raise UnsupportedModel(f"non-numeric features need AutoGluon's feature generator: {non_numeric[:5]}")
+    transformed = predictor.transform_features(sample)
+    raw = sample[features].to_numpy(dtype=np.float64, na_value=np.nan)
+    generated = transformed[features].to_numpy(dtype=np.float64, na_value=np.nan)
+    if not np.allclose(raw, generated, equal_nan=True):
+        raise UnsupportedModel("feature generator rewrites numeric values")
+
+
+def _convert(estimator: Any, family: str, n_features: int, output_path: Path) -> None:
+    if family == "catboost":
+        estimator.save_model(str(output_path), format="onnx")
+        return
+    if family == "sklearn":
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+
+        options = {id(estimator): {"zipmap": False}} if hasattr(estimator, "classes_") else None
+        onx = convert_sklearn(
+            estimator, initial_types=[("input", FloatTensorType([None, n_features]))], options=options
+        )
+    else:
+        from onnxmltools import convert_lightgbm, convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+
+        initial_types = [("input", FloatTensorType([None, n_features]))]
+        if family == "lightgbm":
+            onx = convert_lightgbm(estimator, initial_types=initial_types, zipmap=False)
+        else:
+            # The converter expects f0..fN feature names; rename on a copy, not the served model.
+            estimator = copy.deepcopy(estimator)
+            estimator.get_booster().feature_names = None
+            onx = convert_xgboost(estimator, initial_types=initial_types)
+    output_path.write_bytes(onx.SerializeToString())
+
+
+def _parity(native: pd.Series, compiled: pd.Series, problem_type: str, rtol: float) -> float:
+    if problem_type == "regression":
+        matches = np.isclose(
+            compiled.to_numpy(dtype=np.float64), native.to_numpy(dtype=np.float64), rtol=rtol, atol=rtol
+        )
+    else:
+        matches = compiled.astype(str).to_numpy() == native.astype(str).to_numpy()
+    return float(matches.mean()) if len(matches) else 1.0
+
+
+def measure_latency(
+    predict: Callable[[pd.DataFrame], Any], data: pd.DataFrame, repeats: int, batch_size: int
+) -> Dict[str, float]:
+    """Single-row p50/p95/p99 over ``repeats`` calls and per-row cost of one batch, in milliseconds."""
+    rows = [data.iloc[[i % len(data)]] for i in range(repeats)]
+    predict(rows[0])  # warm-up: lazy model loading and first-call allocations
+    samples = []
+    for row in rows:
+        start = time.perf_counter()
+        predict(row)
+        samples.append((time.perf_counter() - start) * 1000)
+    batch = data.iloc[: min(batch_size, len(data))]
+    start = time.perf_counter()
+    predict(batch)
+    batch_ms = (time.perf_counter() - start) * 1000
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "single_p50_ms": float(p50),
+        "single_p95_ms": float(p95),
+        "single_p99_ms": float(p99),
+        "batch_rows": int(len(batch)),
+        "batch_ms": float(batch_ms),
+        "batch_per_row_ms": float(batch_ms / max(len(batch), 1)),
+    }
+
+
+def export_onnx(
+    predictor: Any,
+    test_df: pd.DataFrame,
+    label_column: str,
+    registry_dir: str | Path,
+    config: Mapping[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """Compile, check parity on ``test_df`` and benchmark; returns the report written to the registry."""
+    cfg = {**DEFAULTS, **(config or {})}
+    output_dir = Path(registry_dir) / cfg["output_subdir"]
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+    features_df = test_df.drop(columns=[label_column], errors="ignore")
+    report: Dict[str, Any] = {"status": "unsupported", "best_model": predictor.model_best}
+
+    try:
+        name, ag_model = _resolve_single_model(predictor)
+        family = _estimator_family(ag_model.model)
+        features = list(ag_model.features)
+        _check_passthrough(predictor, features, features_df.head(1000))
+        report.update({"model": name, "family": family, "features": len(features)})
+        _convert(ag_model.model, family, len(features), output_dir / "model.onnx")
+    except UnsupportedModel as exc:
+        report["reason"] = str(exc)
+    except ImportError as exc:
+        report["reason"] = f"converter not installed: {exc.name}"
+    except Exception as exc:  # pylint: disable=broad-except
+        report.update({"status": "error", "reason": f"{type(exc).__name__}: {exc}"})
+
+    if "reason" not in report:
+        manifest = {
+            "onnx_file": "model.onnx",
+            "model": name,
+            "family": family,
+            "features": features,
+            "fill_nan": _FILL_NAN.get(family),
+            "problem_type": predictor.problem_type,
+            "class_labels": None if predictor.problem_type == "regression" else list(predictor.class_labels),
+            "decision_threshold": getattr(predictor, "decision_threshold", None),
+        }
+        (output_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2, default=str), encoding="utf-8")
+        try:
+            compiled = OnnxPredictor(output_dir, intra_op_threads=int(cfg["intra_op_threads"]))
+            agreement = _parity(
+                predictor.predict(features_df),
+                compiled.predict(features_df),
+                predictor.problem_type,
+                float(cfg["regression_rtol"]),
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            report.update({"status": "error", "reason": f"onnxruntime: {type(exc).__name__}: {exc}"})
+        else:
+            report["parity"] = {"rows": int(len(features_df)), "agreement": agreement}
+            if agreement < float(cfg["parity_threshold"]):
+                report.update(
+                    {"status": "parity_failed", "reason": f"agreement {agreement:.4f} < {cfg['parity_threshold']}"}
+                )
+            else:
+                report["status"] = "exported"
+
+    if report["status"] != "exported":
+        for path in output_dir.iterdir():
+            path.unlink()
+        logger.info("ONNX export skipped (%s); serving uses the native predictor.", report["reason"])
+
+    if len(features_df):
+        repeats, batch_size = int(cfg["latency_repeats"]), int(cfg["batch_size"])
+        latency = {"native": measure_latency(predictor.predict, features_df, repeats, batch_size)}
+        if report["status"] == "exported":
+            latency["onnx"] = measure_latency(compiled.predict, features_df, repeats, batch_size)
+            latency["single_speedup"] = latency["native"]["single_p50_ms"] / max(latency["onnx"]["single_p50_ms"], 1e-9)
+            latency["batch_speedup"] = latency["native"]["batch_ms"] / max(latency["onnx"]["batch_ms"], 1e-9)
+        report["latency"] = latency
+
+    (output_dir / REPORT_FILE).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    logger.info("ONNX export report written to %s (status=%s)", output_dir / REPORT_FILE, report["status"])
+    return report
+
+
+def export_metrics(report: Mapping[str, Any]) -> Dict[str, float]:
+    """Flat MLflow metrics from an export report."""
+    metrics = {"onnx_exported": float(report["status"] == "exported")}
+    if "parity" in report:
+        metrics["onnx_parity_agreement"] = report["parity"]["agreement"]
+    for runtime, values in (report.get("latency") or {}).items():
+        if isinstance(values, Mapping):
+            for key, value in values.items():
+                metrics[f"latency_{runtime}_{key}"] = float(value)
+        else:
+            metrics[f"latency_{runtime}"] = float(values)
+    return metrics
@@ -0,0 +1,106 @@
+"""Serve an exported ONNX model with the same ``predict`` contract as TabularPredictor."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = "onnx_manifest.json"
+
+
+class OnnxPredictor:
+    """Column selection + ONNX Runtime session + AutoGluon label decoding."""
+
+    def __init__(self, export_dir: str | Path, intra_op_threads: int = 1) -> None:
+        import onnxruntime as ort
+
+        self.export_dir = Path(export_dir)
+        self.manifest: Dict[str, Any] = json.loads(
+            (self.export_dir / MANIFEST_FILE).read_text(encoding="utf-8")
+        )
+        options = ort.SessionOptions()
+        # Single-row requests do not benefit from intra-op parallelism; replicas scale out instead.
+        options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            str(self.export_dir / self.manifest["onnx_file"]),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_names = [output.name for output in self.session.get_outputs()]
+        self.features = list(self.manifest["features"])
+        self.class_labels = self.manifest.get("class_labels")
+
+    @classmethod
+    def available(cls, export_dir: str | Path) -> bool:
+        return (Path(export_dir) / MANIFEST_FILE).exists()
+
+    def _matrix(self, df: pd.DataFrame) -> np.ndarray:
+        matrix = df[self.features].to_numpy(dtype=np.float32, na_value=np.nan)
+        if self.manifest.get("fill_nan") is not None:
+            matrix = np.nan_to_num(matrix, nan=float(self.manifest["fill_nan"]))
+        return matrix
+
+    def _probabilities(self, outputs: list) -> np.ndarray:
+        by_name = dict(zip(self.output_names, outputs))
+        name = next((n for n in self.output_names if "prob" in n.lower()), self.output_names[-1])
+        proba = by_name[name]
+        if isinstance(proba, list):  # ZipMap output: one {class: probability} dict per row
+            keys = sorted(proba[0])
+            proba = np.asarray([[row[k] for k in keys] for row in proba], dtype=np.float64)
+        return np.asarray(proba, dtype=np.float64)
+
+    def predict_proba(self, df: pd.DataFrame) -> pd.DataFrame:
+        outputs = self.session.run(None, {self.input_name: self._matrix(df)})
+        proba = self._probabilities(outputs)
+        if proba.ndim == 1 or proba.shape[1] == 1:
+            proba = np.column_stack([1.0 - proba.ravel(), proba.ravel()])
+        return pd.DataFrame(proba, index=df.index, columns=self.class_labels)
+
+    def predict(self, df: pd.DataFrame) -> pd.Series:
+        if self.manifest["problem_type"] == "regression":
+            outputs = self.session.run(None, {self.input_name: self._matrix(df)})
+            return pd.Series(np.asarray(outputs[0]).ravel(), index=df.index)
+        proba = self.predict_proba(df).to_numpy()
+        threshold = self.manifest.get("decision_threshold")
+        if self.manifest["problem_type"] == "binary" and threshold is not None:
+            idx = (proba[:, 1] >= threshold).astype(int)
+        else:
+            idx = proba.argmax(axis=1)
+        return pd.Series(np.asarray(self.class_labels, dtype=object)[idx], index=df.index)
+
+
+def load_serving_predictor(
+    registry_dir: str | Path,
+    prefer_onnx: bool = True,
+    subdir: str = "onnx",
+    cache_config: Dict[str, Any] | None = None,
+) -> Any:
+    """The compiled predictor when an export passed parity, else the native TabularPredictor.
+
+    ``registry_dir`` may be a registry root (its ``CURRENT`` version is loaded) or a version directory.
+
+    With ``cache_config`` the predictor is wrapped in a per-row prediction cache.
+    """
+    from src.serving.registry import current_path
+
+    registry_dir = current_path(registry_dir)
+    export_dir = registry_dir / subdir
+    predictor = None
+    if prefer_onnx and OnnxPredictor.available(export_dir):
+        try:
+            predictor = OnnxPredictor(export_dir)
+        except ImportError:
+            pass
+    if predictor is None:
+        from autogluon.tabular import TabularPredictor
+
+        predictor = TabularPredictor.load(str(registry_dir))
+    if cache_config is not None:
+        from src.serving.prediction_cache import cached_predictor
+
+        predictor = cached_predictor(predictor, str(registry_dir), cache_config)
+    return predictor
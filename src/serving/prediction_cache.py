@@ -0,0 +1,182 @@
+"""Bounded LRU/TTL cache of per-row predictions in front of a predictor.
+
+Rows are hashed in one vectorized ``pd.util.hash_pandas_object`` call and
+looked up under the model version (the registry version name) and the request
+schema (column names and dtypes), so a new registry deploy never serves a stale
+prediction and requests with different columns never share entries. Only the
+distinct missing rows are sent to the predictor, as one batch.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULTS: Dict[str, Any] = {
+    "enabled": True,
+    "max_entries": 100_000,
+    "ttl_seconds": 3600,
+}
+
+
+class PredictionCache:
+    """Thread-safe mapping ``(model_version, method, row_hash) -> (value, stored_at)``."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULTS["max_entries"],
+        ttl_seconds: float | None = DEFAULTS["ttl_seconds"],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = float(ttl_seconds) if ttl_seconds else None
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_many(self, version: str, method: str, hashes: np.ndarray) -> List[Any]:
+        """Cached value per hash, ``None`` for misses (expired entries count as misses)."""
+        now = self._clock()
+        found: List[Any] = []
+        with self._lock:
+            for row_hash in hashes.tolist():
+                key = (version, method, row_hash)
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl_seconds is not None and now - entry[1] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found.append(entry[0])
+        return found
+
+    def put_many(self, version: str, method: str, hashes: np.ndarray, values: List[Any]) -> None:
+        now = self._clock()
+        with self._lock:
+            for row_hash, value in zip(hashes.tolist(), values):
+                key = (version, method, row_hash)
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def metrics(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "prediction_cache_hits": float(self.hits),
+            "prediction_cache_misses": float(self.misses),
+            "prediction_cache_hit_rate": self.hits / lookups if lookups else 0.0,
+            "prediction_cache_entries": float(len(self._entries)),
+            "prediction_cache_evictions": float(self.evictions),
+            "prediction_cache_expirations": float(self.expirations),
+        }
+
+
+def row_hashes(df: pd.DataFrame, columns: List[Hashable]) -> np.ndarray:
+    """One uint64 per row over ``columns`` in a fixed order, independent of the index."""
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy(dtype=np.uint64)
+
+
+def schema_key(df: pd.DataFrame, columns: List[Hashable]) -> str:
+    """Short digest of the column names and dtypes; row hashes are only comparable within one schema."""
+    schema = repr([(str(col), str(df[col].dtype)) for col in columns])
+    return hashlib.blake2b(schema.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class CachedPredictor:
+    """``predict``/``predict_proba`` with per-row caching; other attributes go to the wrapped predictor."""
+
+    def __init__(self, predictor: Any, model_version: str, cache: PredictionCache | None = None) -> None:
+        self.predictor = predictor
+        self.model_version = model_version
+        self.cache = cache if cache is not None else PredictionCache()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.predictor, name)
+
+    def _cached_call(self, method: str, df: pd.DataFrame) -> Any:
+        features = sorted(df.columns, key=str)
+        hashes = row_hashes(df, features)
+        version = f"{self.model_version}:{schema_key(df, features)}"
+        found = self.cache.get_many(version, method, hashes)
+        missing = [i for i, value in enumerate(found) if value is None]
+        columns = None
+        if missing:
+            # Duplicate rows inside one request are predicted once.
+            _, first, inverse = np.unique(hashes[missing], return_index=True, return_inverse=True)
+            unique_rows = [missing[i] for i in first]
+            result = getattr(self.predictor, method)(df.iloc[unique_rows])
+            if isinstance(result, pd.DataFrame):
+                columns = result.columns
+                values = list(result.to_numpy())
+            else:
+                values = list(np.asarray(result))
+            self.cache.put_many(version, method, hashes[unique_rows], values)
+            for position, row in enumerate(missing):
+                found[row] = values[inverse[position]]
+        if method == "predict_proba":
+            if columns is None:
+                columns = getattr(self.predictor, "class_labels", None)
+            return pd.DataFrame(np.vstack(found), index=df.index, columns=columns)
+        return pd.Series(found, index=df.index)
+
+    def predict(self, df: pd.DataFrame) -> pd.Series:
+        return self._cached_call("predict", df)
+
+    def predict_proba(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._cached_call("predict_proba", df)
+
+
+def cached_predictor(
+    predictor: Any, registry_dir: str, config: Mapping[str, Any] | None = None, cache: PredictionCache | None = None
+) -> Any:
+    """Wrap ``predictor`` in a cache keyed by the model version (or return it unchanged).
+
+    Published registry versions are immutable and uniquely named, so the
+    version name is the key; only the unversioned flat layout is content-hashed.
+    """
+    from src.serving.registry import current_path, version_name
+
+    cfg = {**DEFAULTS, **(config or {})}
+    if not cfg["enabled"]:
+        return predictor
+    name = version_name(registry_dir)
+    if name is not None:
+        # The resolved version dir: unique per version and per registry.
+        version = str(current_path(registry_dir).resolve())
+        label = name
+    else:
+        from src.utils.fingerprint import dir_fingerprint
+
+        version = dir_fingerprint(registry_dir)
+        label = version[:12]
+    if cache is None:
+        cache = PredictionCache(cfg["max_entries"], cfg["ttl_seconds"])
+    logger.info("Prediction cache enabled for model version %s (max %d rows)", label, cache.max_entries)
+    return CachedPredictor(predictor, version, cache)
@@ -0,0 +1,101 @@
+"""Versioned registry layout with an atomic ``CURRENT`` pointer.
+
+::
+
+    registry_dir/
+      CURRENT                      # name of the live version
+      versions/<version>/          # predictor, onnx/, warmup.csv
+      versions/.staging-<id>/      # being built; never read by serving
+
+A version is built in a staging directory, renamed into place and only then
+published by replacing ``CURRENT``, so readers see either the old or the new
+model, never a half-written one.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+POINTER_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+WARMUP_FILE = "warmup.csv"
+_STAGING_PREFIX = ".staging-"
+
+
+def versions_root(registry_dir: str | Path) -> Path:
+    return Path(registry_dir) / VERSIONS_DIR
+
+
+def new_staging_dir(registry_dir: str | Path) -> Path:
+    """Path for a new version; the caller writes into it, then calls :func:`publish_version`."""
+    root = versions_root(registry_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    return root / f"{_STAGING_PREFIX}{uuid.uuid4().hex[:12]}"
+
+
+def read_current(registry_dir: str | Path) -> str | None:
+    pointer = Path(registry_dir) / POINTER_FILE
+    try:
+        return pointer.read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_path(registry_dir: str | Path) -> Path:
+    """Directory of the live version; the registry itself for the legacy flat layout."""
+    version = read_current(registry_dir)
+    if version is None:
+        return Path(registry_dir)
+    return versions_root(registry_dir) / version
+
+
+def version_name(path: str | Path) -> str | None:
+    """Version held by a ``versions/<version>`` dir or pointed to by a root; None for the flat layout."""
+    path = Path(path)
+    if path.parent.name == VERSIONS_DIR and not path.name.startswith(_STAGING_PREFIX):
+        return path.name
+    return read_current(path)
+
+
+def list_versions(registry_dir: str | Path) -> List[str]:
+    root = versions_root(registry_dir)
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith(_STAGING_PREFIX))
+
+
+def publish_version(registry_dir: str | Path, staging_dir: str | Path) -> str:
+    """Move a finished staging directory into place and point ``CURRENT`` at it."""
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+    final_dir = versions_root(registry_dir) / version
+    os.replace(staging_dir, final_dir)
+    pointer = Path(registry_dir) / POINTER_FILE
+    tmp = pointer.with_name(f".{POINTER_FILE}.{uuid.uuid4().hex[:8]}")
+    tmp.write_text(version + "\n", encoding="utf-8")
+    os.replace(tmp, pointer)
+    logger.info("Published registry version %s", version)
+    return version
+
+
+def discard_staging(staging_dir: str | Path) -> None:
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def prune_versions(registry_dir: str | Path, keep: int) -> List[str]:
+    """Delete all but the ``keep`` newest versions; the live version is always kept."""
+    current = read_current(registry_dir)
+    versions = list_versions(registry_dir)
+    stale = [v for v in versions[: max(len(versions) - keep, 0)] if v != current]
+    for version in stale:
+        shutil.rmtree(versions_root(registry_dir) / version, ignore_errors=True)
+    if stale:
+        logger.info("Pruned %d old registry versions", len(stale))
+    return stale
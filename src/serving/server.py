@@ -0,0 +1,287 @@
+"""Pre-fork HTTP serving: load the registry predictor once, fork workers that share it.
+
+The parent binds the socket, loads, persists and warms the live registry
+version, freezes the GC heap and forks ``workers`` children. Model memory is
+then shared copy-on-write: ``gc.freeze`` keeps the collector from writing to
+every inherited object, and large numpy buffers can optionally be moved into
+a shared anonymous mapping so not even a stray write copies them. When
+``CURRENT`` moves, the parent loads the new version and replaces the workers
+one generation at a time; the socket stays open throughout, so no connection
+is refused.
+
+Endpoints: ``POST /predict`` with ``{"rows": [{...}, ...], "proba": false}``
+(or a bare list of rows), ``GET /health`` and ``GET /metrics``.
+"""
+from __future__ import annotations
+
+import gc
+import json
+import mmap
+import os
+import signal
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping
+
+import numpy as np
+
+from src.serving.hot_swap import HotSwapPredictor
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULTS: Dict[str, Any] = {
+    "host": "0.0.0.0",
+    "port": 8080,
+    "workers": 0,  # 0 = one per CPU
+    "threads_per_worker": 1,
+    "gc_freeze": True,
+    "share_numpy": False,
+    "share_min_bytes": 1 << 20,
+}
+
+
+def share_numpy_buffers(obj: Any, min_bytes: int = DEFAULTS["share_min_bytes"], max_depth: int = 6) -> int:
+    """Move large ndarrays reachable from ``obj`` into a MAP_SHARED anonymous mapping.
+
+    Forked children then map the same physical pages instead of copy-on-write
+    ones. The arrays are made read-only. Returns the number of bytes moved.
+    """
+    seen: set[int] = set()
+
+    def _shared_copy(array: np.ndarray) -> np.ndarray:
+        buffer = mmap.mmap(-1, array.nbytes, flags=mmap.MAP_SHARED)
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=buffer)
+        shared[...] = array
+        shared.flags.writeable = False
+        return shared
+
+    def _visit(container: Any, depth: int) -> int:
+        if depth > max_depth or id(container) in seen:
+            return 0
+        seen.add(id(container))
+        if isinstance(container, dict):
+            items = list(container.items())
+            setter: Callable[[Any, Any], None] = container.__setitem__
+        elif isinstance(container, list):
+            items = list(enumerate(container))
+            setter = container.__setitem__
+        elif hasattr(container, "__dict__") and not isinstance(container, type):
+            items = list(vars(container).items())
+            setter = lambda key, value: setattr(container, key, value)  # noqa: E731
+        else:
+            return 0
+        moved = 0
+        for key, value in items:
+            if isinstance(value, np.ndarray):
+                if value.dtype != object and value.nbytes >= min_bytes and value.base is None:
+                    setter(key, _shared_copy(value))
+                    moved += value.nbytes
+            else:
+                moved += _visit(value, depth + 1)
+        return moved
+
+    return _visit(obj, 0)
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "to_dict"):
+        return value.to_dict(orient="records") if hasattr(value, "columns") else value.tolist()
+    return np.asarray(value).tolist()
+
+
+def make_handler(predictor: HotSwapPredictor) -> type:
+    import pandas as pd
+
+    class PredictHandler(BaseHTTPRequestHandler):
+        # One request per connection: a sync worker holding an idle keep-alive
+        # connection would starve every other client of that worker.
+        protocol_version = "HTTP/1.0"
+        timeout = 30
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, payload: Mapping[str, Any]) -> None:
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "version": predictor.version, "pid": os.getpid()})
+            elif self.path == "/metrics":
+                cache = getattr(predictor.predictor, "cache", None)
+                self._send(200, cache.metrics() if cache is not None else {})
+            else:
+                self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self) -> None:  # noqa: N802
+            if self.path != "/predict":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+                rows = payload.get("rows") if isinstance(payload, dict) else payload
+                if not isinstance(rows, list) or not rows:
+                    raise ValueError("expected a non-empty list of rows")
+                df = pd.DataFrame.from_records(rows)
+                version, model = predictor.version, predictor.predictor
+                proba = isinstance(payload, dict) and payload.get("proba")
+                result = model.predict_proba(df) if proba else model.predict(df)
+            except (ValueError, KeyError, TypeError) as exc:
+                self._send(400, {"error": str(exc)})
+                return
+            self._send(200, {"version": version, "predictions": _to_json(result)})
+
+        def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return PredictHandler
+
+
+class PreforkServer:
+    def __init__(
+        self,
+        registry_dir: str | Path,
+        loader: Callable[[Path], Any],
+        config: Mapping[str, Any] | None = None,
+        poll_interval_s: float = 5.0,
+    ) -> None:
+        self.cfg = {**DEFAULTS, **(config or {})}
+        self.workers = int(self.cfg["workers"]) or os.cpu_count() or 1
+        self.poll_interval_s = float(poll_interval_s)
+        self.registry_dir = registry_dir
+        self.loader = loader
+        self._children: Dict[int, str] = {}
+        self._retiring: set[int] = set()
+        self._stopping = False
+        self.predictor: HotSwapPredictor | None = None
+        self.httpd: HTTPServer | None = None
+
+    def _prepare_for_fork(self) -> None:
+        if self.cfg["share_numpy"]:
+            moved = share_numpy_buffers(self.predictor.predictor, int(self.cfg["share_min_bytes"]))
+            logger.info("Moved %.1f MB of numpy buffers into shared memory", moved / 2**20)
+        if self.cfg["gc_freeze"]:
+            # Drop garbage from the previous version, then park the survivors in the permanent generation.
+            gc.unfreeze()
+            gc.collect()
+            gc.freeze()
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker_loop()
+            except BaseException:  # pylint: disable=broad-except
+                logger.exception("Serving worker crashed")
+                code = 1
+            finally:
+                os._exit(code)  # never run the parent's cleanup in a child
+        self._children[pid] = self.predictor.version
+
+    def _worker_loop(self) -> None:
+        stop = False
+
+        def _stop(*_: Any) -> None:
+            nonlocal stop
+            stop = True
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # A request that was already accepted is always answered before the worker exits.
+        while not stop:
+            self.httpd.handle_request()
+        self.httpd.server_close()
+
+    def _reap(self) -> List[int]:
+        exited = []
+        while self._children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if self._children.pop(pid, None) is not None:
+                exited.append(pid)
+        return exited
+
+    def _roll_workers(self) -> None:
+        """Fork a full generation on the new version, then retire the old one."""
+        old = [pid for pid, version in self._children.items() if version != self.predictor.version]
+        self._prepare_for_fork()
+        for _ in range(self.workers):
+            self._spawn()
+        for pid in old:
+            self._retiring.add(pid)
+            os.kill(pid, signal.SIGTERM)
+
+    def _shutdown(self, *_: Any) -> None:
+        self._stopping = True
+
+    def serve(self) -> None:
+        from src.orchestration.jobs import limit_threads
+
+        # Before any model library starts its thread pools, so children inherit the cap.
+        limit_threads(int(self.cfg["threads_per_worker"]))
+        self.predictor = HotSwapPredictor(self.registry_dir, self.loader, self.poll_interval_s)
+        self.httpd = HTTPServer((self.cfg["host"], int(self.cfg["port"])), make_handler(self.predictor))
+        self.httpd.timeout = 0.5
+        # Non-blocking accept: workers that lose the race for a connection go back to select.
+        self.httpd.socket.setblocking(False)
+        signal.signal(signal.SIGTERM, self._shutdown)
+        signal.signal(signal.SIGINT, self._shutdown)
+
+        self._prepare_for_fork()
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info(
+            "Serving version %s on %s:%s with %d workers",
+            self.predictor.version,
+            self.cfg["host"],
+            self.cfg["port"],
+            self.workers,
+        )
+        last_poll = time.monotonic()
+        while not self._stopping:
+            time.sleep(0.2)
+            for pid in self._reap():
+                if pid in self._retiring:
+                    self._retiring.discard(pid)
+                else:
+                    logger.warning("Worker %d exited unexpectedly; replacing it", pid)
+            if time.monotonic() - last_poll >= self.poll_interval_s:
+                last_poll = time.monotonic()
+                if self.predictor.check_for_update():
+                    self._roll_workers()
+            current = sum(version == self.predictor.version for version in self._children.values())
+            for _ in range(self.workers - current):
+                if not self._stopping:
+                    self._spawn()
+
+        for pid in list(self._children):
+            os.kill(pid, signal.SIGTERM)
+        while self._children:
+            time.sleep(0.1)
+            self._reap()
+        self.httpd.server_close()
+        logger.info("Server stopped")
+
+
+def serve_registry(registry_dir: str | Path, serving_cfg: Mapping[str, Any] | None = None) -> None:
+    """Pre-fork server over the registry, configured by the ``serving`` config section."""
+    from src.serving.onnx_runtime import load_serving_predictor
+
+    serving_cfg = serving_cfg or {}
+    cache_cfg = serving_cfg.get("cache")
+    poll_interval_s = float((serving_cfg.get("hot_swap") or {}).get("poll_interval_s", 5.0))
+
+    def _loader(version_dir: Path) -> Any:
+        return load_serving_predictor(version_dir, cache_config=dict(cache_cfg) if cache_cfg else None)
+
+    PreforkServer(registry_dir, _loader, serving_cfg.get("server"), poll_interval_s).serve()
@@ -2,15 +2,28 @@ from src import zenml_patches  # noqa: F401
 import pandas as pd
 from zenml import step
 
-from src.data.load_data import load_raw_data
+from src.data.load_data import load_processed_partition, load_raw_data
+from src.materializers.arrow_dataframe_materializer import ArrowDataFrameMaterializer
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-@step
-def load_data_step(raw_path: str) -> pd.DataFrame:
-    """ZenML step to load raw data."""
+@step(output_materializers=ArrowDataFrameMaterializer)
+def load_data_step(raw_path: str, raw_fingerprint: str) -> pd.DataFrame:
+    """ZenML step to load raw data; ``raw_fingerprint`` keys the cache on file content."""
     df = load_raw_data(raw_path)
     logger.info("Data loaded in step with shape %s", df.shape)
     return df
+
+
+@step(output_materializers=ArrowDataFrameMaterializer)
+def load_processed_step(processed_path: str, processed_fingerprint: str) -> pd.DataFrame:
+    """Read the processed dataset once and hand it to downstream steps as an artifact.
+
+    The memory-mapped Arrow copy is used whenever its recorded hash matches
+    ``processed_fingerprint``; the CSV is parsed only when the copy is missing or stale.
+    """
+    df = load_processed_partition(processed_path, fingerprint=processed_fingerprint)
+    logger.info("Processed data loaded in step with shape %s", df.shape)
+    return df
@@ -1,6 +1,7 @@
 from typing import Dict, NamedTuple
 
 from src import zenml_patches  # noqa: F401
+import pandas as pd
 from zenml import step
 
 from src.steps.train_step import TrainOutputs
@@ -19,7 +20,7 @@ class EvaluateOutputs(NamedTuple):
 def evaluate_step(
     train_outputs: TrainOutputs,
     models_dir: str,
-    processed_path: str,
+    processed: pd.DataFrame,
     label_column: str,
     experiment_name: str,
     output_dir: str,
@@ -30,11 +31,12 @@ def evaluate_step(
     predictor = TabularPredictor.load(models_dir)
     metrics, metrics_path = evaluate_model(
         predictor=predictor,
-        processed_path=processed_path,
+        processed_path=None,
         label_column=label_column,
         experiment_name=experiment_name,
         output_dir=output_dir,
         run_id=train_outputs.run_id,
+        processed_df=processed,
     )
     logger.info("Evaluation step metrics: %s", metrics)
     return EvaluateOutputs(metrics, metrics_path)
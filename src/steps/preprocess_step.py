@@ -3,23 +3,52 @@ import os
 import pandas as pd
 from zenml import step
 
+from src.data.arrow_io import arrow_path_for, write_arrow
+from src.data.dtypes import optimize_dtypes
 from src.data.preprocess import preprocess_data
+from src.data.profile import profile_dataframe, write_profile
+from src.utils.fingerprint import file_sha256
+from src.materializers.arrow_dataframe_materializer import ArrowDataFrameMaterializer
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-@step
+@step(output_materializers=ArrowDataFrameMaterializer)
 def preprocess_step(
     df: pd.DataFrame,
     label_column: str,
     test_size: float,
     random_state: int,
-    processed_path: str,
-) -> str:
-    """ZenML step to preprocess data and persist processed CSV."""
+    optimize: bool = True,
+    max_category_ratio: float = 0.5,
+    float_rtol: float | None = None,
+) -> pd.DataFrame:
+    """ZenML step to preprocess data; the result is stored as an Arrow artifact."""
     processed = preprocess_data(df, label_column, test_size, random_state)
+    if optimize:
+        processed = optimize_dtypes(
+            processed,
+            exclude=[label_column],
+            max_category_ratio=max_category_ratio,
+            float_rtol=float_rtol,
+        )
+    logger.info("Processed data artifact shape: %s", processed.shape)
+    return processed
+
+
+@step(enable_cache=False)
+def export_processed_step(processed: pd.DataFrame, processed_path: str) -> str:
+    """Persist the processed CSV (and its memory-mappable Arrow copy) for DVC and the local runner."""
     os.makedirs(os.path.dirname(processed_path), exist_ok=True)
     processed.to_csv(processed_path, index=False)
+    write_arrow(processed, arrow_path_for(processed_path), source_fingerprint=file_sha256(processed_path))
     logger.info("Processed data saved to %s", processed_path)
     return processed_path
+
+
+@step(enable_cache=False)
+def profile_step(processed: pd.DataFrame, processed_path: str, bins: int = 20) -> str:
+    """Write the column profile next to the exported CSV for downstream checks."""
+    profile = profile_dataframe(processed, bins=bins)
+    return str(write_profile(profile, processed_path))
@@ -1,11 +1,21 @@
-from typing import NamedTuple
+from typing import Any, Dict, NamedTuple
 
 from src import zenml_patches  # noqa: F401
 from zenml import step
 
+from src.training.gating import (
+    GateDecision,
+    gate_challenger,
+    install_challenger,
+    promote_challenger,
+    replayed_decision,
+    staging_dir,
+    write_decision,
+)
 from src.utils import mlflow_utils
 from src.utils.logger import get_logger
-from src.steps.train_step import TrainOutputs
+from src.steps.evaluate_step import EvaluateOutputs
+from src.steps.train_step import TrainOutputs, models_fingerprint
 
 logger = get_logger(__name__)
 
@@ -13,21 +23,62 @@ logger = get_logger(__name__)
 class RegisterOutputs(NamedTuple):
     model_name: str
     model_version: str
+    promoted: bool
 
 
-@step
+@step(enable_cache=False)
 def register_step(
-    train_outputs: TrainOutputs, models_dir: str, model_name: str
+    train_outputs: TrainOutputs,
+    evaluate_outputs: EvaluateOutputs,
+    models_dir: str,
+    model_name: str,
+    gating: Dict[str, Any] | None = None,
 ) -> RegisterOutputs:
-    """Log trained artifacts to MLflow and register a model version."""
-    mlflow_utils.log_artifacts_to_run(
-        run_id=train_outputs.run_id,
-        artifact_path="autogluon_model_artifacts",
-        path=models_dir,
-    )
-    version = mlflow_utils.register_model(
-        model_uri=train_outputs.model_uri, name=model_name, run_id=train_outputs.run_id
+    """Gate the challenger against the champion; register and install it only if it wins.
+
+    When ``train_step`` was served from the cache its run has been gated (and
+    ended) before, so the recorded decision is returned unchanged.
+    """
+    replayed = replayed_decision(gating, model_name, train_outputs.run_id, models_dir)
+    if replayed is not None:
+        logger.info(
+            "Run %s was already gated (promote=%s: %s); keeping that decision.",
+            train_outputs.run_id,
+            replayed["promote"],
+            replayed["reason"],
+        )
+        return RegisterOutputs(model_name, str(replayed["model_version"] or ""), bool(replayed["promote"]))
+
+    staging = staging_dir(models_dir)
+    if models_fingerprint(staging) != train_outputs.models_fingerprint:
+        # Only a cached train output can point at a staging dir that has since
+        # been replaced; that run was ended when it was first gated.
+        decision = GateDecision(
+            False,
+            f"staged model of run {train_outputs.run_id} is gone from {staging}",
+            dict(evaluate_outputs.metrics),
+            run_id=train_outputs.run_id,
+        )
+        write_decision(models_dir, decision)
+        logger.warning("Challenger not registered: %s", decision.reason)
+        return RegisterOutputs(model_name, "", False)
+
+    decision = gate_challenger(
+        gating, model_name, train_outputs.run_id, evaluate_outputs.metrics, staging
     )
+    version = ""
+    if decision.promote:
+        version = promote_challenger(
+            gating,
+            model_name,
+            train_outputs.model_uri,
+            train_outputs.run_id,
+            evaluate_outputs.metrics,
+        )
+        install_challenger(staging, models_dir)
+        logger.info("Model registered: %s version %s", model_name, version)
+    else:
+        write_decision(models_dir, decision)
+        logger.info("Challenger not registered (kept in %s): %s", staging, decision.reason)
     mlflow_utils.end_run(train_outputs.run_id)
-    logger.info("Model registered: %s version %s", model_name, version)
-    return RegisterOutputs(model_name, version)
+    return RegisterOutputs(model_name, version, decision.promote)
@@ -0,0 +1,187 @@
+"""Chunked outlier detection for the OWASP data checks.
+
+Univariate scores (z-score from precomputed mean/std, optional robust MAD
+score) are evaluated block by block: each ``chunk_rows x n_cols`` slice is
+converted to float on its own, so neither a float copy of the whole frame nor
+a full score matrix exists at any time. The optional isolation forest is
+fitted on a subsample and then scores every row, again in blocks. Only the z-score runs by default,
+so the flagged-row count keeps its meaning unless a method is opted into;
+every method's own count is reported in ``method_counts``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULTS: Dict[str, Any] = {
+    "zscore_threshold": 4.0,
+    "mad_threshold": None,  # e.g. 3.5 to also flag robust (median/MAD) outliers
+    "chunk_rows": 50_000,
+    "max_flagged_indices": 1000,
+    "isolation_forest": {
+        "enabled": False,
+        "sample_size": 10_000,
+        "n_estimators": 100,
+        "contamination": 0.01,
+        "random_state": 42,
+    },
+}
+
+# Scales MAD to the standard deviation of a normal distribution (Iglewicz & Hoaglin).
+_MAD_SCALE = 0.6745
+
+
+@dataclass
+class AnomalyResult:
+    rows: int
+    flagged_indices: List[int]
+    method_counts: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self, max_indices: int | None = None) -> Dict[str, Any]:
+        indices = self.flagged_indices if max_indices is None else self.flagged_indices[:max_indices]
+        return {
+            "rows": int(self.rows),
+            "flagged_rows": len(self.flagged_indices),
+            "method_counts": {k: int(v) for k, v in self.method_counts.items()},
+            "flagged_indices": [int(i) for i in indices],
+            "indices_truncated": len(indices) < len(self.flagged_indices),
+        }
+
+
+def _merge_config(config: Mapping[str, Any] | None) -> Dict[str, Any]:
+    merged = {**DEFAULTS, **dict(config or {})}
+    merged["isolation_forest"] = {
+        **DEFAULTS["isolation_forest"],
+        **dict((config or {}).get("isolation_forest") or {}),
+    }
+    return merged
+
+
+def _chunks(n_rows: int, chunk_rows: int):
+    for start in range(0, n_rows, max(chunk_rows, 1)):
+        yield start, min(start + chunk_rows, n_rows)
+
+
+def _block(numeric_df: pd.DataFrame, start: int, stop: int) -> np.ndarray:
+    return numeric_df.iloc[start:stop].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _deviation_flags(
+    numeric_df: pd.DataFrame, center: np.ndarray, limit: np.ndarray, chunk_rows: int
+) -> np.ndarray:
+    """Rows where any column satisfies ``|x - center| > limit``; NaNs never flag."""
+    flags = np.zeros(len(numeric_df), dtype=bool)
+    for start, stop in _chunks(len(numeric_df), chunk_rows):
+        block = _block(numeric_df, start, stop)
+        flags[start:stop] = (np.abs(block - center) > limit).any(axis=1)
+    return flags
+
+
+def zscore_flags(
+    numeric_df: pd.DataFrame, mean: np.ndarray, std: np.ndarray, threshold: float, chunk_rows: int
+) -> np.ndarray:
+    # Compare against threshold * std instead of dividing, so no float score matrix is built.
+    return _deviation_flags(numeric_df, mean, threshold * (std + 1e-9), chunk_rows)
+
+
+def robust_stats(numeric_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Column-wise median and median absolute deviation, ignoring NaNs, one column at a time."""
+    median = np.empty(numeric_df.shape[1])
+    mad = np.empty(numeric_df.shape[1])
+    for j in range(numeric_df.shape[1]):
+        column = numeric_df.iloc[:, j].to_numpy(dtype=float, na_value=np.nan)
+        median[j] = np.nanmedian(column)
+        mad[j] = np.nanmedian(np.abs(column - median[j]))
+    return median, mad
+
+
+def _column_medians(numeric_df: pd.DataFrame) -> np.ndarray:
+    return np.array(
+        [
+            np.nanmedian(numeric_df.iloc[:, j].to_numpy(dtype=float, na_value=np.nan))
+            for j in range(numeric_df.shape[1])
+        ]
+    )
+
+
+def mad_flags(
+    numeric_df: pd.DataFrame, median: np.ndarray, mad: np.ndarray, threshold: float, chunk_rows: int
+) -> np.ndarray:
+    # Constant columns (MAD == 0) carry no robust spread; leave them to the z-score check.
+    limit = np.where(mad > 0, threshold * mad / _MAD_SCALE, np.inf)
+    return _deviation_flags(numeric_df, median, limit, chunk_rows)
+
+
+def isolation_forest_flags(
+    numeric_df: pd.DataFrame, median: np.ndarray, settings: Mapping[str, Any], chunk_rows: int
+) -> np.ndarray:
+    """Fit on a random subsample, then predict every row block by block."""
+    from sklearn.ensemble import IsolationForest
+
+    rng = np.random.default_rng(settings["random_state"])
+    n_rows = len(numeric_df)
+    sample_size = min(int(settings["sample_size"]), n_rows)
+    sample_idx = rng.choice(n_rows, size=sample_size, replace=False)
+
+    def _impute(block: np.ndarray) -> np.ndarray:
+        return np.where(np.isnan(block), median, block)
+
+    sample = numeric_df.iloc[np.sort(sample_idx)].to_numpy(dtype=float, na_value=np.nan)
+    forest = IsolationForest(
+        n_estimators=settings["n_estimators"],
+        contamination=settings["contamination"],
+        random_state=settings["random_state"],
+    ).fit(_impute(sample))
+    flags = np.zeros(n_rows, dtype=bool)
+    for start, stop in _chunks(n_rows, chunk_rows):
+        flags[start:stop] = forest.predict(_impute(_block(numeric_df, start, stop))) == -1
+    return flags
+
+
+def detect_anomalies(
+    numeric_df: pd.DataFrame,
+    config: Mapping[str, Any] | None = None,
+    mean: pd.Series | None = None,
+    std: pd.Series | None = None,
+) -> AnomalyResult:
+    """Flag outlier rows with z-score and, when enabled, MAD and isolation forest scoring.
+
+    ``mean``/``std`` can come from the stored column profile; they are computed
+    from ``numeric_df`` otherwise.
+    """
+    settings = _merge_config(config)
+    chunk_rows = int(settings["chunk_rows"])
+    if numeric_df.empty:
+        return AnomalyResult(rows=len(numeric_df), flagged_indices=[])
+
+    if mean is None or std is None:
+        mean, std = numeric_df.mean(), numeric_df.std(ddof=0)
+    mean_arr = mean.reindex(numeric_df.columns).to_numpy(dtype=float)
+    std_arr = std.reindex(numeric_df.columns).to_numpy(dtype=float)
+
+    masks: Dict[str, np.ndarray] = {
+        "zscore": zscore_flags(numeric_df, mean_arr, std_arr, settings["zscore_threshold"], chunk_rows)
+    }
+    median = None
+    if settings["mad_threshold"]:
+        median, mad = robust_stats(numeric_df)
+        masks["mad"] = mad_flags(numeric_df, median, mad, settings["mad_threshold"], chunk_rows)
+    if settings["isolation_forest"]["enabled"]:
+        if median is None:
+            median = _column_medians(numeric_df)
+        masks["isolation_forest"] = isolation_forest_flags(
+            numeric_df, median, settings["isolation_forest"], chunk_rows
+        )
+
+    combined = np.logical_or.reduce(list(masks.values()))
+    flagged = numeric_df.index[combined].tolist()
+    counts = {name: int(mask.sum()) for name, mask in masks.items()}
+    logger.info("Anomaly scan over %d rows flagged %d (%s)", len(numeric_df), len(flagged), counts)
+    return AnomalyResult(rows=len(numeric_df), flagged_indices=flagged, method_counts=counts)
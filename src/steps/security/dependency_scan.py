@@ -1,46 +1,143 @@
-"""Simple dependency scanning + supply-chain safeguards."""
+"""Dependency scanning + supply-chain safeguards.
+
+Requirement specifiers and the installed environment are checked against an
+offline OSV advisory index (see ``vuln_db``). Results are cached by the hash of
+the requirements file, the advisory index and the installed package set.
+"""
 from __future__ import annotations
 
 import hashlib
+import importlib.metadata
+import json
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Mapping
+
+from packaging.markers import default_environment
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import SpecifierSet
+from packaging.utils import canonicalize_name
+
+from src.steps.security.vuln_db import VulnDB
+from src.utils.logger import get_logger
 
+logger = get_logger(__name__)
+
+# Built-in advisories used when no OSV dump is available.
 KNOWN_VULNS = {
     "requests": {"2.19.0": "CVE-2018-18074"},
     "pyyaml": {"5.1": "CVE-2017-18342"},
 }
 
+DEFAULTS: Dict[str, Any] = {
+    "osv_path": "data/osv",
+    "index_path": "artifacts/security/osv_index.sqlite",
+    "cache_path": "artifacts/security/dependency_scan_cache.json",
+    "check_installed": True,
+}
+
 
 def parse_requirement(line: str) -> tuple[str, str | None]:
-    line = line.strip()
-    if not line or line.startswith("#"):
+    """Return ``(normalized name, specifier string)``; name is empty for non-requirements."""
+    line = line.split(" #", 1)[0].strip()
+    if not line or line.startswith(("#", "-")):
+        return "", None
+    try:
+        req = Requirement(line)
+    except InvalidRequirement:
+        logger.warning("Skipping unparseable requirement line: %s", line)
+        return "", None
+    if req.marker is not None and not req.marker.evaluate(default_environment()):
         return "", None
-    if "==" in line:
-        pkg, version = line.split("==", 1)
-        return pkg.lower().strip(), version.strip()
-    return line.lower().strip(), None
+    return canonicalize_name(req.name), str(req.specifier) or None
+
+
+def _installed_distributions() -> Dict[str, str]:
+    installed: Dict[str, str] = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            installed[canonicalize_name(name)] = dist.version
+    return installed
 
 
-def scan_dependencies(requirements_path: str) -> Dict[str, List[str] | str | int]:
+def _builtin_matches(package: str, specifier: SpecifierSet) -> List[str]:
+    versions = KNOWN_VULNS.get(package, {})
+    return sorted(cve for version, cve in versions.items() if specifier.contains(version, prereleases=True))
+
+
+def _cache_key(requirements_hash: str, db: VulnDB | None, installed: Mapping[str, str] | None) -> str:
+    digest = hashlib.sha256(requirements_hash.encode())
+    digest.update((db.fingerprint if db else "builtin").encode())
+    if installed is not None:
+        digest.update(json.dumps(sorted(installed.items())).encode())
+    return digest.hexdigest()
+
+
+def _read_cache(path: Path, key: str) -> Dict[str, Any] | None:
+    if not path.exists():
+        return None
+    try:
+        cached = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+    return cached.get("result") if cached.get("key") == key else None
+
+
+def scan_dependencies(
+    requirements_path: str, config: Mapping[str, Any] | None = None
+) -> Dict[str, Any]:
+    """Check requirement ranges (and optionally installed versions) against known advisories."""
+    settings = {**DEFAULTS, **dict(config or {})}
     path = Path(requirements_path)
     if not path.exists():
         return {"file_hash": "", "checked": 0, "vulnerabilities": []}
 
     file_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+    db = VulnDB.open(settings["osv_path"], settings["index_path"])
+    installed = _installed_distributions() if settings["check_installed"] else None
+    cache_path = Path(settings["cache_path"])
+    key = _cache_key(file_hash, db, installed)
+    cached = _read_cache(cache_path, key)
+    if cached is not None:
+        if db:
+            db.close()
+        logger.info("Dependency scan cache hit for %s", requirements_path)
+        return {**cached, "cached": True}
+
     vulns: List[str] = []
     checked = 0
     for line in path.read_text(encoding="utf-8").splitlines():
-        pkg, version = parse_requirement(line)
+        pkg, spec = parse_requirement(line)
         if not pkg:
             continue
         checked += 1
-        version_map = KNOWN_VULNS.get(pkg)
-        if version_map and version in version_map:
-            vulns.append(f"{pkg}=={version} -> {version_map[version]}")
+        specifier = SpecifierSet(spec or "")
+        advisories = _builtin_matches(pkg, specifier) if spec else []
+        if db and spec:
+            advisories = sorted(set(advisories) | set(db.affected_specifier(pkg, specifier)))
+        if advisories:
+            vulns.append(f"{pkg}{spec or ''} -> {', '.join(advisories)}")
 
-    return {
+    installed_vulns: List[str] = []
+    if installed is not None:
+        for pkg, version in sorted(installed.items()):
+            advisories = [KNOWN_VULNS[pkg][version]] if version in KNOWN_VULNS.get(pkg, {}) else []
+            if db:
+                advisories = sorted(set(advisories) | set(db.affected_version(pkg, version)))
+            if advisories:
+                installed_vulns.append(f"{pkg}=={version} -> {', '.join(advisories)}")
+
+    result: Dict[str, Any] = {
         "file_hash": file_hash,
         "checked": checked,
         "vulnerabilities": vulns,
+        "installed_checked": len(installed or {}),
+        "installed_vulnerabilities": installed_vulns,
+        "advisory_source": str(settings["osv_path"]) if db else "builtin",
+        "advisory_count": db.advisory_count if db else sum(map(len, KNOWN_VULNS.values())),
     }
-
+    if db:
+        db.close()
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps({"key": key, "result": result}, indent=2), encoding="utf-8")
+    return {**result, "cached": False}
@@ -3,13 +3,18 @@ from __future__ import annotations
 
 import json
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping
 
 import numpy as np
 import pandas as pd
-from autogluon.tabular import TabularPredictor
+
+from src.steps.security.anomaly import DEFAULTS as ANOMALY_DEFAULTS, AnomalyResult, detect_anomalies
+from src.steps.security.sampling import RowSample, merge_config as merge_sampling_config, sample_rows
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 PII_PATTERNS = {
     "email": re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"),
@@ -23,34 +28,158 @@ class DataSecurityResult:
     pii_matches: Dict[str, int]
     missing_values: int
     anomaly_rows: int
+    anomaly_indices: List[int] = field(default_factory=list)
+    anomaly_methods: Dict[str, int] = field(default_factory=dict)
+    max_reported_indices: int = ANOMALY_DEFAULTS["max_flagged_indices"]
+    # Set when the counts were estimated from a sample (see ``src.steps.security.sampling``).
+    sampling: Dict[str, Any] | None = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        payload = {
             "pii_matches": {k: int(v) for k, v in self.pii_matches.items()},
             "missing_values": int(self.missing_values),
             "anomaly_rows": int(self.anomaly_rows),
+            "anomaly_methods": {k: int(v) for k, v in self.anomaly_methods.items()},
+            "anomaly_indices": [int(i) for i in self.anomaly_indices[: self.max_reported_indices]],
+            "anomaly_indices_truncated": len(self.anomaly_indices) > self.max_reported_indices,
         }
+        if self.sampling is not None:
+            payload["sampling"] = self.sampling
+        return payload
+
 
+def _pii_matches(series: pd.Series, pattern: re.Pattern[str]) -> np.ndarray:
+    """Per-row ``pattern`` hits; categoricals (``optimize_dtypes`` output) match each category once."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = pd.Series(series.cat.categories.astype(str))
+        hits = categories.str.contains(pattern, na=False).to_numpy()
+        # Code -1 (missing) picks the trailing False.
+        return np.append(hits, False)[series.cat.codes.to_numpy()]
+    return series.astype(str).str.contains(pattern, na=False).to_numpy()
 
-def run_data_security_checks(processed_path: str) -> DataSecurityResult:
-    """Run simple OWASP-aligned checks on processed data."""
-    df = pd.read_csv(processed_path)
+
+def _scan(
+    df: pd.DataFrame, profile: Dict[str, Any] | None, anomaly_config: Mapping[str, Any] | None
+) -> tuple[Dict[str, int], np.ndarray, int, AnomalyResult]:
+    """PII cell counts, per-row PII flags, missing values and anomalies of ``df``."""
     pii_counts = {name: 0 for name in PII_PATTERNS}
+    pii_rows = np.zeros(len(df), dtype=bool)
     for col in df.columns:
-        if df[col].dtype == object:
-            series = df[col].astype(str)
-            for name, pattern in PII_PATTERNS.items():
-                pii_counts[name] += series.str.contains(pattern, na=False).sum()
-
-    missing = int(df.isna().sum().sum())
-    numeric_df = df.select_dtypes(include=[np.number])
-    if not numeric_df.empty:
-        zscores = np.abs((numeric_df - numeric_df.mean()) / (numeric_df.std(ddof=0) + 1e-9))
-        anomaly_rows = int((zscores > 4).any(axis=1).sum())
+        series = df[col]
+        if not (
+            isinstance(series.dtype, pd.CategoricalDtype)
+            or pd.api.types.is_object_dtype(series.dtype)
+            or pd.api.types.is_string_dtype(series.dtype)
+        ):
+            continue
+        for name, pattern in PII_PATTERNS.items():
+            matches = _pii_matches(series, pattern)
+            pii_counts[name] += int(matches.sum())
+            pii_rows |= matches
+
+    if profile:
+        columns = profile["columns"]
+        missing = sum(int(stats["null_count"]) for stats in columns.values())
+        numeric_cols = [c for c in profile["numeric_columns"] if c in df.columns]
+        numeric_df = df[numeric_cols]
+        mean = pd.Series({c: columns[c]["mean"] for c in numeric_cols}, dtype=float)
+        std = pd.Series({c: columns[c]["std"] for c in numeric_cols}, dtype=float)
     else:
-        anomaly_rows = 0
-
-    return DataSecurityResult(pii_matches=pii_counts, missing_values=missing, anomaly_rows=anomaly_rows)
+        missing = int(df.isna().sum().sum())
+        numeric_df = df.select_dtypes(include=[np.number])
+        mean, std = numeric_df.mean(), numeric_df.std(ddof=0)
+    anomalies = detect_anomalies(numeric_df, anomaly_config, mean=mean, std=std)
+    return pii_counts, pii_rows, missing, anomalies
+
+
+def _sampled_result(
+    sample: RowSample,
+    profile: Dict[str, Any] | None,
+    anomaly_config: Mapping[str, Any] | None,
+    settings: Mapping[str, Any],
+) -> tuple[DataSecurityResult, bool]:
+    """Scale the sample's findings to the table; also says whether a full scan is needed."""
+    pii_counts, pii_rows, missing, anomalies = _scan(sample.frame, profile, anomaly_config)
+    confidence = float(settings["confidence"])
+    flagged = sample.frame.index.isin(anomalies.flagged_indices)
+    pii_rate = sample.estimate(pii_rows, confidence)
+    anomaly_rate = sample.estimate(flagged, confidence)
+    factor = sample.population / max(len(sample.frame), 1)
+    full_scan = pii_rate.exceeds(float(settings["pii_full_scan_threshold"])) or anomaly_rate.exceeds(
+        float(settings["anomaly_full_scan_threshold"])
+    )
+    result = DataSecurityResult(
+        pii_matches={name: int(round(count * factor)) for name, count in pii_counts.items()},
+        # The profile's null counts already cover the whole table.
+        missing_values=missing if profile else int(round(missing * factor)),
+        anomaly_rows=sample.scale(anomaly_rate.estimate),
+        anomaly_indices=anomalies.flagged_indices,
+        anomaly_methods={name: int(round(count * factor)) for name, count in anomalies.method_counts.items()},
+        max_reported_indices=int(
+            (anomaly_config or {}).get("max_flagged_indices", ANOMALY_DEFAULTS["max_flagged_indices"])
+        ),
+        sampling={
+            **sample.to_dict(),
+            "pii_row_rate": pii_rate.to_dict(),
+            "anomaly_row_rate": anomaly_rate.to_dict(),
+            "full_scan": full_scan,
+        },
+    )
+    return result, full_scan
+
+
+def run_data_security_checks(
+    processed_path: str,
+    profile: Dict[str, Any] | None = None,
+    anomaly_config: Mapping[str, Any] | None = None,
+    sampling_config: Mapping[str, Any] | None = None,
+) -> DataSecurityResult:
+    """Run simple OWASP-aligned checks on processed data.
+
+    When a column ``profile`` (see ``src.data.profile``) is given, null counts
+    and the per-column mean/std come from it instead of being recomputed.
+    ``anomaly_config`` tunes ``src.steps.security.anomaly.detect_anomalies``.
+
+    Large tables are checked on a sample sized by ``sampling_config`` (see
+    ``src.steps.security.sampling``) and the counts are scaled to the table; the
+    full scan runs only when the PII or anomaly rate's upper confidence bound
+    crosses its threshold.
+    """
+    from src.data.load_data import load_processed_partition
+
+    settings = merge_sampling_config(sampling_config)
+    sampling_summary = None
+    sample = sample_rows(processed_path, settings, population=profile["rows"] if profile else None)
+    if sample is not None and sample.complete:
+        # The single CSV pass already held every row.
+        df = sample.frame
+    elif sample is not None:
+        result, full_scan = _sampled_result(sample, profile, anomaly_config, settings)
+        if not full_scan:
+            return result
+        sampling_summary = result.sampling
+        logger.warning(
+            "Sampled PII/anomaly rates may exceed their thresholds (%s, %s); scanning all %d rows",
+            sampling_summary["pii_row_rate"],
+            sampling_summary["anomaly_row_rate"],
+            sample.population,
+        )
+        df = load_processed_partition(processed_path)
+    else:
+        df = load_processed_partition(processed_path)
+
+    pii_counts, _, missing, anomalies = _scan(df, profile, anomaly_config)
+    return DataSecurityResult(
+        pii_matches=pii_counts,
+        missing_values=missing,
+        anomaly_rows=len(anomalies.flagged_indices),
+        anomaly_indices=anomalies.flagged_indices,
+        anomaly_methods=anomalies.method_counts,
+        max_reported_indices=int(
+            (anomaly_config or {}).get("max_flagged_indices", ANOMALY_DEFAULTS["max_flagged_indices"])
+        ),
+        sampling=sampling_summary,
+    )
 
 
 def run_adversarial_noise_test(
@@ -59,14 +188,22 @@ def run_adversarial_noise_test(
     label_column: str,
     sample_size: int = 32,
     noise_scale: float = 0.02,
+    profile: Dict[str, Any] | None = None,
 ) -> Dict[str, Any]:
     """Apply tiny Gaussian noise to numeric features and observe prediction drift."""
+    from autogluon.tabular import TabularPredictor
+
+    from src.data.load_data import load_processed_partition
+
     predictor = TabularPredictor.load(models_dir)
-    df = pd.read_csv(processed_path)
+    df = load_processed_partition(processed_path)
     if label_column in df:
         df = df.drop(columns=[label_column])
 
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    if profile:
+        numeric_cols = [c for c in profile["numeric_columns"] if c in df.columns]
+    else:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     sample_df = df.sample(min(sample_size, len(df)), random_state=42).copy()
     clean_preds = predictor.predict(sample_df)
 
@@ -3,14 +3,22 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from collections import Counter
 from pathlib import Path
 from typing import Dict, List, Any
 
+import numpy as np
 import pandas as pd
 from presidio_analyzer import AnalyzerEngine
 from presidio_analyzer.nlp_engine import NlpEngineProvider
 
+ROOT_DIR = Path(__file__).resolve().parents[3]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.steps.security.sampling import RowSample, sample_rows  # noqa: E402
+
 DEFAULT_CONFIG = {
     "nlp_engine_name": "spacy",
     "models": [{"lang_code": "en", "model_name": "en_core_web_sm"}],
@@ -23,14 +31,27 @@ def build_analyzer() -> AnalyzerEngine:
     return AnalyzerEngine(nlp_engine=engine, supported_languages=["en"])
 
 
-def analyze_dataframe(df: pd.DataFrame, analyzer: AnalyzerEngine, sample_size: int) -> Dict[str, Any]:
+def analyze_dataframe(
+    df: pd.DataFrame,
+    analyzer: AnalyzerEngine,
+    sample_size: int,
+    sample: RowSample | None = None,
+    confidence: float = 0.95,
+) -> Dict[str, Any]:
+    """Scan ``df`` (or the first ``sample_size`` rows); with ``sample`` the rows are a random sample.
+
+    For a sample, the share of rows holding any entity is reported with Wilson
+    bounds for the whole table.
+    """
     counter: Counter[str] = Counter()
     detailed: List[Dict[str, Any]] = []
-    subset = df.head(sample_size)
+    subset = sample.frame if sample is not None else df.head(sample_size)
+    hit_rows = np.zeros(len(subset), dtype=bool)
 
     for idx, (_, row) in enumerate(subset.iterrows(), start=1):
         text = " | ".join(row.astype(str).tolist())
         results = analyzer.analyze(text=text, language="en")
+        hit_rows[idx - 1] = bool(results)
         for res in results:
             counter[res.entity_type] += 1
             detailed.append(
@@ -43,11 +64,17 @@ def analyze_dataframe(df: pd.DataFrame, analyzer: AnalyzerEngine, sample_size: i
                 }
             )
 
-    return {
+    report: Dict[str, Any] = {
         "total_rows_scanned": int(len(subset)),
         "entity_counts": dict(counter),
         "detections": detailed,
     }
+    if sample is not None:
+        report["sampling"] = {
+            **sample.to_dict(),
+            "pii_row_rate": sample.estimate(hit_rows, confidence).to_dict(),
+        }
+    return report
 
 
 def parse_args() -> argparse.Namespace:
@@ -67,8 +94,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--sample-size",
         type=int,
-        default=200,
-        help="Number of rows to sample for scanning.",
+        default=None,
+        help="Number of rows to sample for scanning (default: derived from --confidence/--margin and --full-scan-threshold).",
+    )
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the PII rate bounds.")
+    parser.add_argument("--margin", type=float, default=0.05, help="Target margin of the PII rate estimate.")
+    parser.add_argument(
+        "--full-scan-threshold",
+        type=float,
+        default=None,
+        help="Rescan every row when the sampled PII row rate's upper bound exceeds this.",
     )
     return parser.parse_args()
 
@@ -79,9 +114,25 @@ def main() -> None:
         print(f"[WARN] Presidio input {args.input} not found; writing empty report.")
         report = {"error": "input_not_found", "path": str(args.input)}
     else:
-        df = pd.read_csv(args.input)
         analyzer = build_analyzer()
-        report = analyze_dataframe(df, analyzer, args.sample_size)
+        sampling = {
+            "confidence": args.confidence,
+            "margin": args.margin,
+            "min_rows": 0,
+            "pii_full_scan_threshold": args.full_scan_threshold,
+            "anomaly_full_scan_threshold": None,
+        }
+        sample = sample_rows(args.input, sampling, sample_size=args.sample_size)
+        if sample is None or sample.complete:
+            df = sample.frame if sample is not None else pd.read_csv(args.input)
+            report = analyze_dataframe(df, analyzer, len(df))
+        else:
+            report = analyze_dataframe(sample.frame, analyzer, len(sample.frame), sample, args.confidence)
+            upper = report["sampling"]["pii_row_rate"]["upper"]
+            if args.full_scan_threshold is not None and upper > args.full_scan_threshold:
+                print(f"[INFO] Sampled PII rate bound {upper:.4f} exceeds threshold; scanning all rows.")
+                full = pd.read_csv(args.input)
+                report = {**analyze_dataframe(full, analyzer, len(full)), "sampling": report["sampling"]}
 
     args.output.parent.mkdir(parents=True, exist_ok=True)
     with args.output.open("w", encoding="utf-8") as f:
@@ -0,0 +1,326 @@
+"""Statistically bounded row sampling for the data security checks.
+
+The sample size comes from the requested confidence and margin for a rate
+estimate (Cochran's formula with a finite population correction), raised where
+needed so that a rate well under each full-scan threshold can actually be shown
+to be under it (see ``threshold_sample_size``). Check time therefore stays
+roughly constant as the table grows. Rows are drawn uniformly, or
+proportionally per stratum, either straight from the memory-mapped Arrow copy
+or in one chunked pass over the CSV (a random-key reservoir). Rates measured on
+the sample are reported with Wilson score bounds; callers fall back to a full
+scan when an upper bound crosses their threshold.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULTS: Dict[str, Any] = {
+    "enabled": True,
+    "confidence": 0.95,
+    "margin": 0.01,
+    "min_rows": 200_000,  # smaller tables are always scanned in full
+    "strata_column": None,
+    "max_strata": 100,
+    "chunksize": 100_000,
+    "random_state": 42,
+    "pii_full_scan_threshold": 0.001,
+    "anomaly_full_scan_threshold": 0.05,
+    "threshold_headroom": 0.5,
+}
+
+_OTHER_STRATUM = "__other__"
+
+
+def merge_config(config: Mapping[str, Any] | None) -> Dict[str, Any]:
+    return {**DEFAULTS, **dict(config or {})}
+
+
+def z_value(confidence: float) -> float:
+    """Two-sided standard normal quantile, e.g. 1.96 for 0.95."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def required_sample_size(
+    confidence: float, margin: float, population: int | None = None, expected_rate: float = 0.5
+) -> int:
+    """Rows needed to estimate a rate within ``margin`` at ``confidence``.
+
+    ``expected_rate=0.5`` is the worst case. With a known ``population`` the
+    finite population correction shrinks the size for small tables.
+    """
+    z = z_value(confidence)
+    n0 = z * z * expected_rate * (1.0 - expected_rate) / (margin * margin)
+    if population:
+        n0 = n0 / (1.0 + (n0 - 1.0) / population)
+        return int(min(math.ceil(n0), population))
+    return int(math.ceil(n0))
+
+
+def threshold_sample_size(
+    threshold: float, confidence: float, headroom: float = DEFAULTS["threshold_headroom"]
+) -> int:
+    """Rows needed before an observed rate of ``headroom * threshold`` has a Wilson upper bound of ``threshold``.
+
+    The Wilson bound ``u`` of an observed rate ``p`` solves
+    ``n (u - p)^2 = z^2 u (1 - u)``; with ``u = threshold`` this gives ``n``.
+    A margin-sized sample is too small for rare-event thresholds: with
+    ``margin=0.01`` (~9.6k rows) the bound only clears a 0.001 threshold when
+    no row at all is flagged, so every table with a handful of hits was
+    rescanned in full.
+    """
+    if not 0.0 < headroom < 1.0:
+        raise ValueError(f"threshold_headroom must be in (0, 1), got {headroom}")
+    z = z_value(confidence)
+    gap = threshold * (1.0 - headroom)
+    return int(math.ceil(z * z * threshold * (1.0 - threshold) / (gap * gap)))
+
+
+def planned_sample_size(settings: Mapping[str, Any], population: int | None = None) -> int:
+    """Margin-based size, raised so every configured full-scan threshold can be cleared."""
+    confidence = float(settings["confidence"])
+    n = required_sample_size(confidence, float(settings["margin"]), population)
+    for key in ("pii_full_scan_threshold", "anomaly_full_scan_threshold"):
+        threshold = settings.get(key)
+        if threshold:
+            headroom = float(settings["threshold_headroom"])
+            n = max(n, threshold_sample_size(float(threshold), confidence, headroom))
+    return n
+
+
+def wilson_interval(successes: float, n: int, confidence: float) -> tuple[float, float]:
+    """Wilson score interval; stays inside [0, 1] and is usable at zero successes."""
+    if n <= 0:
+        return 0.0, 1.0
+    z = z_value(confidence)
+    p = successes / n
+    denom = 1.0 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1.0 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+@dataclass
+class RateEstimate:
+    estimate: float
+    lower: float
+    upper: float
+    sample_rows: int
+    confidence: float
+    exact: bool = False
+
+    def exceeds(self, threshold: float) -> bool:
+        """True when the rate cannot be ruled out above ``threshold``."""
+        return self.upper > threshold
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "estimate": float(self.estimate),
+            "lower": float(self.lower),
+            "upper": float(self.upper),
+            "sample_rows": int(self.sample_rows),
+            "confidence": float(self.confidence),
+            "exact": bool(self.exact),
+        }
+
+
+@dataclass
+class RowSample:
+    """Sampled rows (index = row position in the source) and what they represent."""
+
+    frame: pd.DataFrame
+    population: int
+    source: str
+    strata_column: str | None = None
+    strata: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        return len(self.frame) >= self.population
+
+    def _weights(self) -> np.ndarray:
+        if not self.strata:
+            return np.ones(len(self.frame))
+        labels = _stratum_labels(self.frame[self.strata_column], self.strata)
+        scale = {
+            name: counts["population"] / counts["sampled"] for name, counts in self.strata.items() if counts["sampled"]
+        }
+        return labels.map(scale).to_numpy(dtype=float)
+
+    def estimate(self, flags: np.ndarray | pd.Series, confidence: float) -> RateEstimate:
+        """Population rate of ``flags`` (one bool per sampled row), weighted per stratum."""
+        flags = np.asarray(flags, dtype=bool)
+        n = int(flags.size)
+        if n == 0:
+            return RateEstimate(0.0, 0.0, 1.0, 0, confidence, exact=self.complete)
+        weights = self._weights()
+        rate = float((weights * flags).sum() / weights.sum())
+        if self.complete:
+            return RateEstimate(rate, rate, rate, n, confidence, exact=True)
+        lower, upper = wilson_interval(rate * n, n, confidence)
+        return RateEstimate(rate, lower, upper, n, confidence)
+
+    def scale(self, rate: float) -> int:
+        return int(round(rate * self.population))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "population_rows": int(self.population),
+            "sample_rows": int(len(self.frame)),
+            "source": self.source,
+            "strata_column": self.strata_column,
+            "strata": self.strata,
+        }
+
+
+def _stratum_labels(values: pd.Series, strata: Mapping[str, Any] | None = None) -> pd.Series:
+    labels = values.astype(str).where(values.notna(), "<NA>")
+    if strata is not None and _OTHER_STRATUM in strata:
+        labels = labels.where(labels.isin(list(strata)), _OTHER_STRATUM)
+    return labels
+
+
+def allocate(stratum_sizes: Mapping[str, int], n: int) -> Dict[str, int]:
+    """Proportional allocation of ``n`` rows; every non-empty stratum gets at least one."""
+    total = sum(stratum_sizes.values())
+    if total == 0:
+        return {name: 0 for name in stratum_sizes}
+    return {
+        name: min(size, max(1, int(round(n * size / total)))) if size else 0 for name, size in stratum_sizes.items()
+    }
+
+
+def _cap_strata(labels: pd.Series, known: set[str], max_strata: int) -> pd.Series:
+    """Fold labels beyond the first ``max_strata`` into one catch-all stratum."""
+    for label in labels.unique():
+        if label not in known and len(known) < max_strata:
+            known.add(label)
+    return labels.where(labels.isin(known), _OTHER_STRATUM)
+
+
+def sample_table(
+    table: Any, n: int, strata_column: str | None = None, seed: int = 42, max_strata: int = DEFAULTS["max_strata"]
+) -> RowSample:
+    """Random-access sample from an Arrow table; only the chosen rows are materialized."""
+    import pyarrow as pa
+
+    rng = np.random.default_rng(seed)
+    population = table.num_rows
+    strata: Dict[str, Dict[str, int]] = {}
+    if strata_column and strata_column in table.column_names:
+        labels = _cap_strata(_stratum_labels(table.column(strata_column).to_pandas()), set(), max_strata)
+        groups = pd.Series(np.arange(population)).groupby(labels.to_numpy()).indices
+        allocation = allocate({name: len(rows) for name, rows in groups.items()}, n)
+        picks = [rng.choice(groups[name], size=size, replace=False) for name, size in allocation.items()]
+        positions = np.sort(np.concatenate(picks)) if picks else np.empty(0, dtype=np.int64)
+        strata = {
+            str(name): {"population": int(len(groups[name])), "sampled": int(allocation[name])} for name in groups
+        }
+    else:
+        strata_column = None
+        positions = np.sort(rng.choice(population, size=min(n, population), replace=False))
+    frame = table.take(pa.array(positions)).to_pandas(split_blocks=True)
+    frame.index = pd.Index(positions)
+    return RowSample(frame, population, "arrow", strata_column, strata)
+
+
+def reservoir_sample(
+    chunks: Iterable[pd.DataFrame],
+    n: int,
+    strata_column: str | None = None,
+    seed: int = 42,
+    max_strata: int = DEFAULTS["max_strata"],
+) -> RowSample:
+    """One pass over ``chunks`` keeping a uniform sample of ``n`` rows in bounded memory.
+
+    Every row gets a uniform random key and the ``n`` smallest keys survive, which
+    is a uniform sample without replacement (a vectorised reservoir). With
+    ``strata_column`` the ``n`` smallest keys are kept per stratum and trimmed to
+    a proportional allocation once the stratum sizes are known.
+    """
+    rng = np.random.default_rng(seed)
+    kept: Dict[str, pd.DataFrame] = {}
+    sizes: Dict[str, int] = {}
+    known: set[str] = set()
+    population = 0
+    stratified = False
+    for chunk in chunks:
+        chunk = chunk.assign(_sample_key=rng.random(len(chunk)))
+        population += len(chunk)
+        if strata_column and strata_column in chunk.columns:
+            stratified = True
+            labels = _cap_strata(_stratum_labels(chunk[strata_column]), known, max_strata)
+            groups = chunk.groupby(labels.to_numpy(), sort=False)
+        else:
+            groups = [("", chunk)]
+        for name, group in groups:
+            sizes[name] = sizes.get(name, 0) + len(group)
+            merged = group if name not in kept else pd.concat([kept[name], group])
+            kept[name] = merged.nsmallest(n, "_sample_key") if len(merged) > n else merged
+
+    if stratified:
+        allocation = allocate(sizes, n)
+        parts = [kept[name].nsmallest(size, "_sample_key") for name, size in allocation.items()]
+        strata = {name: {"population": sizes[name], "sampled": allocation[name]} for name in sizes}
+    else:
+        parts, strata, strata_column = list(kept.values()), {}, None
+    frame = pd.concat(parts).drop(columns="_sample_key").sort_index() if parts else pd.DataFrame()
+    return RowSample(frame, population, "csv", strata_column, strata)
+
+
+def sample_rows(
+    path: str | Path,
+    config: Mapping[str, Any] | None = None,
+    population: int | None = None,
+    sample_size: int | None = None,
+) -> RowSample | None:
+    """Sample the processed data at ``path``, or ``None`` when a full scan is as cheap.
+
+    Reads the memory-mapped Arrow copy when it mirrors the CSV;
+    otherwise streams the CSV once. ``sample_size`` overrides the size derived
+    from the configured confidence, margin and thresholds (``planned_sample_size``).
+    """
+    from src.data.arrow_io import arrow_is_current, arrow_path_for, read_arrow_table
+
+    settings = merge_config(config)
+    if not settings["enabled"]:
+        return None
+    if population is not None and population <= int(settings["min_rows"]):
+        return None
+    n = sample_size or planned_sample_size(settings, population)
+    if population is not None and n >= population:
+        return None
+
+    seed = int(settings["random_state"])
+    strata_column = settings["strata_column"]
+    max_strata = int(settings["max_strata"])
+    arrow_path = arrow_path_for(path)
+    if arrow_is_current(arrow_path, path):
+        table = read_arrow_table(arrow_path)
+        if table.num_rows <= max(n, int(settings["min_rows"])):
+            return None
+        sample = sample_table(table, n, strata_column, seed, max_strata)
+    else:
+        chunks = pd.read_csv(path, chunksize=int(settings["chunksize"]))
+        sample = reservoir_sample(chunks, n, strata_column, seed, max_strata)
+        if not sample.complete and sample.population <= int(settings["min_rows"]):
+            return None
+    logger.info(
+        "Sampled %d of %d rows from %s (confidence %.3f, margin %.3f)",
+        len(sample.frame),
+        sample.population,
+        sample.source,
+        settings["confidence"],
+        settings["margin"],
+    )
+    return sample
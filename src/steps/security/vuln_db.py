@@ -0,0 +1,317 @@
+"""Offline OSV advisory index stored in SQLite.
+
+OSV dumps (a directory of ``*.json`` advisories or the ``all.zip`` archive from
+osv.dev) are loaded once into an indexed SQLite file. Lookups are per
+normalized package name, so a scan touches only the rows of the packages it
+checks.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from packaging.specifiers import SpecifierSet
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA_VERSION = "1"
+
+
+@dataclass(frozen=True)
+class AffectedRange:
+    advisory_id: str
+    introduced: str | None
+    fixed: str | None
+    last_affected: str | None
+
+    def contains(self, version: Version) -> bool:
+        introduced = _parse(self.introduced)
+        if introduced is not None and version < introduced:
+            return False
+        fixed = _parse(self.fixed)
+        if fixed is not None and version >= fixed:
+            return False
+        last_affected = _parse(self.last_affected)
+        if last_affected is not None and version > last_affected:
+            return False
+        return True
+
+
+def _parse(version: str | None) -> Version | None:
+    """Parsed range event; ``None`` (an open end) when missing, ``"0"`` or unparseable."""
+    if not version or version == "0":
+        return None
+    try:
+        return Version(version)
+    except InvalidVersion:
+        # Unparseable bounds leave that side of the range open rather than failing the scan.
+        return None
+
+
+def _source_files(source: Path) -> Iterator[Tuple[str, bytes]]:
+    if source.is_file() and source.suffix == ".zip":
+        with zipfile.ZipFile(source) as archive:
+            for name in archive.namelist():
+                if name.endswith(".json"):
+                    yield name, archive.read(name)
+    elif source.is_dir():
+        for path in sorted(source.rglob("*.json")):
+            yield str(path), path.read_bytes()
+
+
+def source_fingerprint(source: str | Path) -> str:
+    """Cheap change detector for the OSV dump: names, sizes and mtimes."""
+    source = Path(source)
+    digest = hashlib.sha256(SCHEMA_VERSION.encode())
+    paths = [source] if source.is_file() else sorted(source.rglob("*.json")) if source.is_dir() else []
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _advisory_rows(advisory: Dict) -> Iterator[Tuple]:
+    advisory_id = advisory.get("id", "")
+    for affected in advisory.get("affected", []):
+        package = affected.get("package", {})
+        if package.get("ecosystem") != "PyPI" or not package.get("name"):
+            continue
+        name = canonicalize_name(package["name"])
+        for version in affected.get("versions", []):
+            yield ("version", advisory_id, name, version, None, None)
+        for rng in affected.get("ranges", []):
+            if rng.get("type") != "ECOSYSTEM":
+                continue
+            introduced = fixed = last_affected = None
+            for event in rng.get("events", []):
+                if "introduced" in event:
+                    if introduced is not None:
+                        yield ("range", advisory_id, name, introduced, fixed, last_affected)
+                        fixed = last_affected = None
+                    introduced = event["introduced"]
+                fixed = event.get("fixed", fixed)
+                last_affected = event.get("last_affected", last_affected)
+            if introduced is not None:
+                yield ("range", advisory_id, name, introduced, fixed, last_affected)
+
+
+def build_index(source: str | Path, db_path: str | Path) -> int:
+    """(Re)build the SQLite index from an OSV dump; returns the number of advisories loaded."""
+    source, db_path = Path(source), Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_suffix(".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE ranges (advisory_id TEXT, package TEXT, introduced TEXT,
+                                 fixed TEXT, last_affected TEXT);
+            CREATE TABLE versions (advisory_id TEXT, package TEXT, version TEXT);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        advisories = 0
+        for name, payload in _source_files(source):
+            try:
+                advisory = json.loads(payload)
+            except ValueError:
+                logger.warning("Skipping unreadable OSV advisory %s", name)
+                continue
+            advisories += 1
+            for kind, advisory_id, package, first, fixed, last_affected in _advisory_rows(advisory):
+                if kind == "version":
+                    conn.execute("INSERT INTO versions VALUES (?, ?, ?)", (advisory_id, package, first))
+                else:
+                    conn.execute(
+                        "INSERT INTO ranges VALUES (?, ?, ?, ?, ?)",
+                        (advisory_id, package, first, fixed, last_affected),
+                    )
+        conn.executescript(
+            """
+            CREATE INDEX idx_ranges_package ON ranges (package);
+            CREATE INDEX idx_versions_package ON versions (package, version);
+            """
+        )
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("source_fingerprint", source_fingerprint(source)), ("advisories", str(advisories))],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    logger.info("Indexed %d OSV advisories into %s", advisories, db_path)
+    return advisories
+
+
+class VulnDB:
+    """Read-only view over the SQLite index with per-package memoisation."""
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = Path(db_path)
+        self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        self._ranges: Dict[str, List[AffectedRange]] = {}
+        self._versions: Dict[str, Dict[str, List[str]]] = {}
+
+    @classmethod
+    def open(cls, source: str | Path, db_path: str | Path) -> "VulnDB | None":
+        """Open the index, rebuilding it when the OSV dump changed; None without a dump."""
+        source, db_path = Path(source), Path(db_path)
+        if not source.exists():
+            return None
+        if not db_path.exists() or _stored_fingerprint(db_path) != source_fingerprint(source):
+            build_index(source, db_path)
+        return cls(db_path)
+
+    @property
+    def fingerprint(self) -> str:
+        return _stored_fingerprint(self.db_path) or ""
+
+    @property
+    def advisory_count(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'advisories'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _load(self, package: str) -> None:
+        if package in self._ranges:
+            return
+        self._ranges[package] = [
+            AffectedRange(*row)
+            for row in self._conn.execute(
+                "SELECT advisory_id, introduced, fixed, last_affected FROM ranges WHERE package = ?",
+                (package,),
+            )
+        ]
+        versions: Dict[str, List[str]] = {}
+        for advisory_id, version in self._conn.execute(
+            "SELECT advisory_id, version FROM versions WHERE package = ?", (package,)
+        ):
+            versions.setdefault(version, []).append(advisory_id)
+        self._versions[package] = versions
+
+    def affected_version(self, package: str, version: str) -> List[str]:
+        """Advisory ids affecting one concrete version."""
+        package = canonicalize_name(package)
+        self._load(package)
+        ids = set(self._versions[package].get(version, []))
+        try:
+            parsed = Version(version)
+        except InvalidVersion:
+            return sorted(ids)
+        ids.update(r.advisory_id for r in self._ranges[package] if r.contains(parsed))
+        return sorted(ids)
+
+    def affected_specifier(self, package: str, specifier: SpecifierSet) -> List[str]:
+        """Advisory ids whose affected versions intersect what ``specifier`` allows."""
+        package = canonicalize_name(package)
+        self._load(package)
+        ids = {
+            advisory_id
+            for version, advisory_ids in self._versions[package].items()
+            if specifier.contains(version, prereleases=True)
+            for advisory_id in advisory_ids
+        }
+        lower, upper = _specifier_bounds(specifier)
+        for rng in self._ranges[package]:
+            if _overlaps(rng, lower, upper, specifier):
+                ids.add(rng.advisory_id)
+        return sorted(ids)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _stored_fingerprint(db_path: Path) -> str | None:
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source_fingerprint'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+Bound = Optional[Tuple[Version, bool]]
+
+
+def _specifier_bounds(specifier: SpecifierSet) -> Tuple[Bound, Bound]:
+    """Tightest (version, inclusive) lower/upper bounds implied by ``specifier``."""
+    lower: Bound = None
+    upper: Bound = None
+
+    def _raise_lower(bound: Tuple[Version, bool]) -> None:
+        nonlocal lower
+        if lower is None or bound[0] > lower[0] or (bound[0] == lower[0] and not bound[1]):
+            lower = bound
+
+    def _drop_upper(bound: Tuple[Version, bool]) -> None:
+        nonlocal upper
+        if upper is None or bound[0] < upper[0] or (bound[0] == upper[0] and not bound[1]):
+            upper = bound
+
+    for spec in specifier:
+        try:
+            version = Version(spec.version.replace(".*", ""))
+        except InvalidVersion:
+            continue
+        if spec.operator in (">=", "~="):
+            _raise_lower((version, True))
+        elif spec.operator == ">":
+            _raise_lower((version, False))
+        elif spec.operator == "<=":
+            _drop_upper((version, True))
+        elif spec.operator == "<":
+            _drop_upper((version, False))
+        elif spec.operator == "==" and spec.version.endswith(".*"):
+            # ==1.2.* is the half-open range [1.2, 1.3).
+            release = list(version.release)
+            release[-1] += 1
+            _raise_lower((version, True))
+            _drop_upper((Version(".".join(map(str, release))), False))
+        elif spec.operator in ("==", "==="):
+            _raise_lower((version, True))
+            _drop_upper((version, True))
+        if spec.operator == "~=":
+            # ~=X.Y.Z allows < X.(Y+1); ~=X.Y allows < (X+1).
+            release = list(version.release[:-1]) or [version.release[0]]
+            release[-1] += 1
+            _drop_upper((Version(".".join(map(str, release))), False))
+    return lower, upper
+
+
+def _overlaps(rng: AffectedRange, lower: Bound, upper: Bound, specifier: SpecifierSet) -> bool:
+    """Does the half-open affected interval intersect the specifier's interval?"""
+    start = _parse(rng.introduced)
+    fixed, last_affected = _parse(rng.fixed), _parse(rng.last_affected)
+    if fixed is not None:
+        end: Bound = (fixed, False)
+    elif last_affected is not None:
+        end = (last_affected, True)
+    else:
+        end = None
+
+    if start is not None and upper is not None:
+        if start > upper[0] or (start == upper[0] and not upper[1]):
+            return False
+    if end is not None and lower is not None:
+        if lower[0] > end[0] or (lower[0] == end[0] and not (lower[1] and end[1])):
+            return False
+    # Exact pins and bounded ranges are decided above; check the endpoints against
+    # the full specifier (including != exclusions) for the common single-point case.
+    if lower is not None and upper is not None and lower[0] == upper[0]:
+        return specifier.contains(lower[0], prereleases=True) and rng.contains(lower[0])
+    return True
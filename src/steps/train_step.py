@@ -1,22 +1,34 @@
 from typing import Any, Dict, NamedTuple
 
 from src import zenml_patches  # noqa: F401
+import pandas as pd
 from zenml import step
 
+from src.training.gating import prepare_staging
 from src.training.train_autogluon import train_autogluon
+from src.utils.fingerprint import dir_fingerprint
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Files written into models_dir after training; excluded from the model fingerprint.
+POST_TRAIN_FILES = ("evaluation_metrics.json", "gating_decision.json")
+
 
 class TrainOutputs(NamedTuple):
     run_id: str
     model_uri: str
+    models_fingerprint: str
+
+
+def models_fingerprint(models_dir: str) -> str:
+    """Manifest hash of the trained predictor directory."""
+    return dir_fingerprint(models_dir, exclude=POST_TRAIN_FILES)
 
 
 @step
 def train_step(
-    processed_path: str,
+    processed: pd.DataFrame,
     label_column: str,
     presets: str,
     time_limit: int,
@@ -24,17 +36,37 @@ def train_step(
     models_dir: str,
     experiment_name: str,
     hyperparameters: Dict[str, Any] | None = None,
+    resources: Dict[str, Any] | None = None,
+    champion_fingerprint: str = "",
+    num_cpus: int | str = "auto",
 ) -> TrainOutputs:
-    """Train step returning predictor handle and artifact paths."""
+    """Train a challenger into the staging sibling of ``models_dir`` (see ``gating.staging_dir``).
+
+    ``champion_fingerprint`` (``models_fingerprint`` of ``models_dir``) keys the
+    cache on the installed champion: a cached challenger is reused only while
+    the champion it was gated against is still in place.
+
+    ``resources`` is the ``resources`` config section; limits are read where the
+    step runs, so a containerized orchestrator gets the container's budget.
+    ``num_cpus`` (``training.num_cpus``) is honoured up to that budget.
+    """
+    from src.orchestration.resources import apply_budget, stage_budget
+
+    budget = stage_budget("train", resources, num_cpus)
+    apply_budget(budget)
+    staging = prepare_staging(models_dir)
     predictor, leaderboard_path, fi_path, run_id, model_uri = train_autogluon(
-        processed_path,
+        None,
         label_column,
         presets,
         time_limit,
         eval_metric,
-        models_dir,
+        staging,
         experiment_name,
         hyperparameters=hyperparameters,
+        processed_df=processed,
+        **(budget.autogluon_kwargs() if budget else {"num_cpus": num_cpus}),
     )
-    logger.info("Training step completed.")
-    return TrainOutputs(run_id, model_uri)
+    fingerprint = models_fingerprint(staging)
+    logger.info("Training step completed (models fingerprint %s).", fingerprint[:12])
+    return TrainOutputs(run_id, model_uri, fingerprint)
@@ -2,29 +2,36 @@ import json
 import os
 
 import pandas as pd
-from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 
+from src.data.load_data import load_processed_partition
 from src.utils import mlflow_utils
 from src.utils.logger import get_logger
+from src.utils.profiling import substep
 
 logger = get_logger(__name__)
 
 
 def evaluate_model(
     predictor,
-    processed_path: str,
+    processed_path: str | None,
     label_column: str,
     experiment_name: str,
     output_dir: str,
     run_id: str | None = None,
+    processed_df: pd.DataFrame | None = None,
 ):
     """Evaluate AutoGluon predictor on test split and log metrics."""
-    df = pd.read_csv(processed_path)
-    test_df = df[df["split"] == "test"].drop(columns=["split"])
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+    if processed_df is not None:
+        test_df = processed_df[processed_df["split"] == "test"].drop(columns=["split"])
+    else:
+        test_df = load_processed_partition(processed_path, "test")
 
     y_true = test_df[label_column]
     X_test = test_df.drop(columns=[label_column])
-    y_pred = predictor.predict(X_test)
+    with substep("predict"):
+        y_pred = predictor.predict(X_test)
 
     metrics = {
         "accuracy": accuracy_score(y_true, y_pred),
@@ -43,8 +50,10 @@ def evaluate_model(
     with open(metrics_path, "w", encoding="utf-8") as fp:
         json.dump(metrics, fp, indent=2)
 
+    # output_dir is usually the predictor's directory, which the run already holds
+    # under "model"; only the evaluation's own output is uploaded.
     if run_id:
-        mlflow_utils.log_artifacts_to_run(run_id, artifact_path="evaluation", path=output_dir)
+        mlflow_utils.log_artifact_to_run(run_id, metrics_path, artifact_path="evaluation")
     else:
         mlflow_utils.log_artifact(metrics_path)
 
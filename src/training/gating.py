@@ -0,0 +1,322 @@
+"""Champion/challenger gating for model registration and deploys."""
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+from src.utils import mlflow_utils
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DECISION_FILE = "gating_decision.json"
+DEFAULT_INDEX_PATH = "artifacts/metrics_index.json"
+STAGING_SUFFIX = ".staging"
+# Metrics whose name contains one of these are lower-is-better unless ``metric_modes`` says otherwise.
+_LOWER_IS_BETTER = ("loss", "error", "rmse", "mse", "mae", "mape")
+
+
+@dataclass
+class GatingPolicy:
+    enabled: bool = True
+    metric: str = "accuracy"
+    mode: str = "max"
+    min_delta: float = 0.0
+    max_regression: Dict[str, float] = field(default_factory=dict)
+    metric_modes: Dict[str, str] = field(default_factory=dict)
+
+    def mode_for(self, name: str) -> str:
+        """Optimization direction of ``name``: the policy mode for the gated metric, else per metric."""
+        if name == self.metric:
+            return self.mode
+        if name in self.metric_modes:
+            return self.metric_modes[name]
+        return "min" if any(token in name.lower() for token in _LOWER_IS_BETTER) else "max"
+
+    @classmethod
+    def from_config(cls, cfg: Mapping[str, Any] | None) -> "GatingPolicy":
+        cfg = cfg or {}
+        mode = str(cfg.get("mode", "max")).lower()
+        metric_modes = {k: str(v).lower() for k, v in (cfg.get("metric_modes") or {}).items()}
+        for value in (mode, *metric_modes.values()):
+            if value not in ("max", "min"):
+                raise ValueError(f"Gating mode must be 'max' or 'min', got {value!r}.")
+        return cls(
+            enabled=bool(cfg.get("enabled", True)),
+            metric=str(cfg.get("metric", "accuracy")),
+            mode=mode,
+            min_delta=float(cfg.get("min_delta", 0.0)),
+            max_regression={k: float(v) for k, v in (cfg.get("max_regression") or {}).items()},
+            metric_modes=metric_modes,
+        )
+
+
+@dataclass
+class GateDecision:
+    promote: bool
+    reason: str
+    challenger: Dict[str, float]
+    champion: Dict[str, float] | None = None
+    run_id: str | None = None
+    trained_rows: int | None = None  # processed rows the challenger saw (incremental runs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "promote": self.promote,
+            "reason": self.reason,
+            "challenger": self.challenger,
+            "champion": self.champion,
+            "run_id": self.run_id,
+            "trained_rows": self.trained_rows,
+        }
+
+
+def _improvement(challenger: float, champion: float, mode: str) -> float:
+    return challenger - champion if mode == "max" else champion - challenger
+
+
+def evaluate_challenger(
+    challenger: Mapping[str, float],
+    champion: Mapping[str, float] | None,
+    policy: GatingPolicy,
+) -> GateDecision:
+    """Compare challenger metrics against the champion under ``policy``."""
+    challenger = {k: float(v) for k, v in challenger.items()}
+    if not policy.enabled:
+        return GateDecision(True, "gating disabled", challenger)
+    if policy.metric not in challenger or math.isnan(challenger[policy.metric]):
+        return GateDecision(False, f"challenger has no '{policy.metric}' metric", challenger)
+    if not champion:
+        return GateDecision(True, "no champion recorded", challenger)
+
+    champion = {k: float(v) for k, v in champion.items()}
+    if policy.metric not in champion:
+        return GateDecision(True, f"champion has no '{policy.metric}' metric", challenger, champion)
+
+    gain = _improvement(challenger[policy.metric], champion[policy.metric], policy.mode)
+    if gain <= policy.min_delta:
+        reason = (
+            f"{policy.metric} {challenger[policy.metric]:.6f} does not beat champion "
+            f"{champion[policy.metric]:.6f} by more than {policy.min_delta}"
+        )
+        return GateDecision(False, reason, challenger, champion)
+
+    for name, tolerance in policy.max_regression.items():
+        if name in challenger and name in champion:
+            drop = -_improvement(challenger[name], champion[name], policy.mode_for(name))
+            if drop > tolerance:
+                reason = f"{name} regressed by {drop:.6f} (tolerance {tolerance})"
+                return GateDecision(False, reason, challenger, champion)
+
+    reason = f"{policy.metric} improved by {gain:.6f}"
+    return GateDecision(True, reason, challenger, champion)
+
+
+def _read_index(index_path: str) -> Dict[str, Any]:
+    path = Path(index_path)
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")) or {}
+    except json.JSONDecodeError:
+        logger.warning("Metrics index %s is corrupt; treating as empty.", index_path)
+        return {}
+
+
+def _record_in_index(
+    index_path: str,
+    model_name: str,
+    run_id: str,
+    model_version: str | None,
+    metrics: Mapping[str, float],
+) -> None:
+    """Persist the new champion in the JSON index atomically so readers never see a partial file."""
+    index = _read_index(index_path)
+    entry = index.setdefault(model_name, {})
+    previous = entry.get("champion")
+    entry["champion"] = {
+        "run_id": run_id,
+        "model_version": model_version,
+        "metrics": {k: float(v) for k, v in metrics.items()},
+        "promoted_at": datetime.utcnow().isoformat() + "Z",
+    }
+    if previous:
+        entry.setdefault("history", []).append(previous)
+    path = Path(index_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+    logger.info("Recorded champion %s v%s in %s", model_name, model_version, index_path)
+
+
+def load_champion(index_path: str, model_name: str) -> Dict[str, Any] | None:
+    """Return the champion entry for ``model_name`` from the metrics store.
+
+    Entries from the legacy JSON index at ``index_path`` are migrated into the
+    store the first time a model without store history is looked up. With
+    ``metrics_store.enabled: false`` the JSON index stays the source of truth.
+    """
+    from src.utils.metrics_store import MetricsStore, store_enabled
+
+    if not store_enabled():
+        return _read_index(index_path).get(model_name, {}).get("champion")
+    store = MetricsStore()
+    champion = store.champion(model_name)
+    if champion is None:
+        legacy = _read_index(index_path).get(model_name, {})
+        for entry in [*legacy.get("history", []), legacy.get("champion")]:
+            if entry:
+                store.record_champion(
+                    model_name,
+                    entry["run_id"],
+                    entry.get("model_version"),
+                    entry.get("metrics", {}),
+                    entry.get("promoted_at", ""),
+                )
+        champion = store.champion(model_name)
+        if champion is not None:
+            logger.info("Migrated champion history of %s from %s into the metrics store", model_name, index_path)
+    return champion
+
+
+def record_champion(
+    index_path: str,
+    model_name: str,
+    run_id: str,
+    model_version: str | None,
+    metrics: Mapping[str, float],
+) -> None:
+    """Append the new champion to the metrics store; earlier champions stay as history."""
+    from src.utils.metrics_store import MetricsStore, store_enabled
+
+    if not store_enabled():
+        _record_in_index(index_path, model_name, run_id, model_version, metrics)
+        return
+    # Migrate any legacy entries first so they stay older than the new champion.
+    load_champion(index_path, model_name)
+    MetricsStore().record_champion(
+        model_name, run_id, model_version, metrics, datetime.utcnow().isoformat() + "Z"
+    )
+    logger.info("Recorded champion %s v%s in the metrics store", model_name, model_version)
+
+
+def staging_dir(models_dir: str) -> str:
+    """Sibling directory a challenger is trained into; it replaces ``models_dir`` only on promotion."""
+    return str(Path(models_dir)) + STAGING_SUFFIX
+
+
+def prepare_staging(models_dir: str) -> str:
+    """Empty staging directory for the next challenger of ``models_dir``."""
+    staging = staging_dir(models_dir)
+    shutil.rmtree(staging, ignore_errors=True)
+    Path(staging).parent.mkdir(parents=True, exist_ok=True)
+    return staging
+
+
+def install_challenger(staging: str, models_dir: str) -> None:
+    """Move a promoted challenger from ``staging`` into ``models_dir``, replacing the old champion.
+
+    The old directory is renamed aside first, so ``models_dir`` is missing only
+    between two renames and never holds a mix of both models.
+    """
+    target = Path(models_dir)
+    retired = target.with_name(target.name + ".retired")
+    shutil.rmtree(retired, ignore_errors=True)
+    if target.exists():
+        os.replace(target, retired)
+    os.replace(staging, target)
+    shutil.rmtree(retired, ignore_errors=True)
+    logger.info("Installed promoted challenger into %s", models_dir)
+
+
+def write_decision(models_dir: str, decision: GateDecision) -> Path:
+    path = Path(models_dir) / DECISION_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(decision.to_dict(), indent=2), encoding="utf-8")
+    return path
+
+
+def read_decision(models_dir: str) -> Dict[str, Any] | None:
+    """Return the last gating decision for ``models_dir`` or None if never gated."""
+    path = Path(models_dir) / DECISION_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def replayed_decision(
+    gating_cfg: Mapping[str, Any] | None, model_name: str, run_id: str, models_dir: str
+) -> Dict[str, Any] | None:
+    """Decision already taken for ``run_id``, or None if the run was never gated.
+
+    A cached training step hands the same run to the register step again; it
+    must keep the original outcome instead of re-gating the champion against
+    itself. The returned dict is the recorded decision plus ``model_version``.
+    """
+    gating_cfg = gating_cfg or {}
+    previous = read_decision(models_dir)
+    champion = load_champion(gating_cfg.get("index_path", DEFAULT_INDEX_PATH), model_name)
+    if champion is not None and champion.get("run_id") == run_id:
+        if not previous or previous.get("run_id") != run_id:
+            metrics = dict(champion.get("metrics") or {})
+            decision = GateDecision(True, "run is already the champion", metrics, run_id=run_id)
+            write_decision(models_dir, decision)
+            previous = decision.to_dict()
+        return {**previous, "model_version": champion.get("model_version")}
+    if previous and previous.get("run_id") == run_id:
+        return {**previous, "model_version": None}
+    return None
+
+
+def gate_challenger(
+    gating_cfg: Mapping[str, Any] | None,
+    model_name: str,
+    run_id: str,
+    metrics: Mapping[str, float],
+    models_dir: str,
+    trained_rows: int | None = None,
+) -> GateDecision:
+    """Decide whether the freshly trained model should replace the champion.
+
+    ``trained_rows`` is recorded with the decision so incremental runs can tell
+    whether the data changed since the last gated training run.
+    """
+    gating_cfg = gating_cfg or {}
+    policy = GatingPolicy.from_config(gating_cfg)
+    champion = load_champion(gating_cfg.get("index_path", DEFAULT_INDEX_PATH), model_name)
+    decision = evaluate_challenger(metrics, champion["metrics"] if champion else None, policy)
+    decision.run_id = run_id
+    decision.trained_rows = trained_rows
+    write_decision(models_dir, decision)
+    logger.info(
+        "Gating decision for %s (run %s): promote=%s (%s)",
+        model_name,
+        run_id,
+        decision.promote,
+        decision.reason,
+    )
+    return decision
+
+
+def promote_challenger(
+    gating_cfg: Mapping[str, Any] | None,
+    model_name: str,
+    model_uri: str,
+    run_id: str,
+    metrics: Mapping[str, float],
+) -> str:
+    """Register the challenger, point the champion alias at it and update the index."""
+    gating_cfg = gating_cfg or {}
+    version = mlflow_utils.register_model(model_uri=model_uri, name=model_name, run_id=run_id)
+    mlflow_utils.set_model_alias(model_name, gating_cfg.get("alias", "champion"), version)
+    record_champion(
+        gating_cfg.get("index_path", DEFAULT_INDEX_PATH), model_name, run_id, version, metrics
+    )
+    return version
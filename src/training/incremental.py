@@ -0,0 +1,86 @@
+"""Reduced-budget refits after an incremental data update.
+
+AutoGluon cannot continue training its models on new rows, so an incremental
+run refits with a fraction of the time budget, restricted to the model
+families that ranked best in the previous leaderboard.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Mapping
+
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Leaderboard model-name prefix -> TabularPredictor hyperparameters key.
+MODEL_FAMILIES = {
+    "LightGBM": "GBM",
+    "CatBoost": "CAT",
+    "XGBoost": "XGB",
+    "NeuralNetFastAI": "FASTAI",
+    "NeuralNetTorch": "NN_TORCH",
+    "RandomForest": "RF",
+    "ExtraTrees": "XT",
+    "KNeighbors": "KNN",
+    "LinearModel": "LR",
+}
+
+
+def _family(model_name: str) -> str | None:
+    for prefix, key in MODEL_FAMILIES.items():
+        if model_name.startswith(prefix):
+            return key
+    return None
+
+
+def best_families(leaderboard_path: str, top_k: int) -> list[str]:
+    """Hyperparameter keys of the ``top_k`` best non-ensemble families in a saved leaderboard."""
+    leaderboard = pd.read_csv(leaderboard_path)
+    families: list[str] = []
+    for name in leaderboard.sort_values("score_val", ascending=False)["model"]:
+        family = _family(str(name))
+        if family and family not in families:
+            families.append(family)
+        if len(families) >= top_k:
+            break
+    return families
+
+
+def refit_plan(
+    training_cfg: Mapping[str, Any],
+    incremental_cfg: Mapping[str, Any],
+    models_dir: str,
+    delta_rows: int,
+    total_rows: int,
+) -> Dict[str, Any] | None:
+    """Time limit and hyperparameters for a reduced refit, or None for a full fit."""
+    leaderboard_path = os.path.join(models_dir, "leaderboard.csv")
+    if delta_rows <= 0 or not os.path.exists(leaderboard_path):
+        return None
+    max_fraction = float(incremental_cfg.get("max_delta_fraction", 0.2))
+    if total_rows and delta_rows / total_rows > max_fraction:
+        logger.info(
+            "Delta of %d rows exceeds %.0f%% of the data; running a full fit.", delta_rows, max_fraction * 100
+        )
+        return None
+
+    hyperparameters = dict(training_cfg.get("hyperparameters") or {})
+    families = best_families(leaderboard_path, int(incremental_cfg.get("top_k_families", 2)))
+    if hyperparameters and families:
+        restricted = {key: hyperparameters[key] for key in families if key in hyperparameters}
+        hyperparameters = restricted or hyperparameters
+    elif families:
+        hyperparameters = {key: {} for key in families}
+    time_limit = max(
+        int(training_cfg["time_limit"] * float(incremental_cfg.get("time_budget_fraction", 0.25))), 1
+    )
+    logger.info(
+        "Incremental refit on %d new rows: time_limit=%ss, families=%s",
+        delta_rows,
+        time_limit,
+        sorted(hyperparameters) if hyperparameters else "default",
+    )
+    return {"time_limit": time_limit, "hyperparameters": hyperparameters or None}
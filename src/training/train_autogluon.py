@@ -2,16 +2,17 @@ import os
 from pathlib import Path
 
 import pandas as pd
-from autogluon.tabular import TabularPredictor
 
+from src.data.load_data import load_processed_partition
 from src.utils import mlflow_utils
 from src.utils.logger import get_logger
+from src.utils.profiling import substep
 
 logger = get_logger(__name__)
 
 
 def train_autogluon(
-    processed_path: str,
+    processed_path: str | None,
     label_column: str,
     presets: str,
     time_limit: int,
@@ -19,10 +20,23 @@ def train_autogluon(
     models_dir: str,
     experiment_name: str,
     hyperparameters=None,
+    processed_df: pd.DataFrame | None = None,
+    num_cpus: int | str = "auto",
+    num_gpus: int | str = "auto",
+    memory_limit: float | str = "auto",
 ):
-    """Train AutoGluon TabularPredictor and log artifacts to MLflow."""
-    df = pd.read_csv(processed_path)
-    train_df = df[df["split"] == "train"].drop(columns=["split"])
+    """Train AutoGluon TabularPredictor and log artifacts to MLflow.
+
+    ``num_cpus``/``num_gpus``/``memory_limit`` (GB) usually come from
+    ``src.orchestration.resources.stage_budget`` so AutoGluon sizes itself to the
+    container rather than the host.
+    """
+    from autogluon.tabular import TabularPredictor
+
+    if processed_df is not None:
+        train_df = processed_df[processed_df["split"] == "train"].drop(columns=["split"])
+    else:
+        train_df = load_processed_partition(processed_path, "train")
     if label_column not in train_df.columns:
         raise ValueError(f"Label column {label_column} missing from processed data.")
 
@@ -35,24 +49,33 @@ def train_autogluon(
             "presets": presets,
             "time_limit": time_limit,
             "eval_metric": eval_metric,
+            "num_cpus": num_cpus,
+            "num_gpus": num_gpus,
+            "memory_limit_gb": memory_limit,
         }
     )
 
-    predictor = TabularPredictor(
-        label=label_column, eval_metric=eval_metric, path=models_dir
-    ).fit(
-        train_df,
-        presets=presets,
-        time_limit=time_limit,
-        hyperparameters=hyperparameters,
-    )
+    with substep("fit"):
+        predictor = TabularPredictor(
+            label=label_column, eval_metric=eval_metric, path=models_dir
+        ).fit(
+            train_df,
+            presets=presets,
+            time_limit=time_limit,
+            hyperparameters=hyperparameters,
+            num_cpus=num_cpus,
+            num_gpus=num_gpus,
+            memory_limit=memory_limit,
+        )
 
-    leaderboard = predictor.leaderboard(train_df, silent=True)
+    with substep("leaderboard"):
+        leaderboard = predictor.leaderboard(train_df, silent=True)
     leaderboard_path = os.path.join(models_dir, "leaderboard.csv")
     leaderboard.to_csv(leaderboard_path, index=False)
     mlflow_utils.log_artifact(leaderboard_path)
 
-    feature_importance = predictor.feature_importance(train_df)
+    with substep("feature_importance"):
+        feature_importance = predictor.feature_importance(train_df)
     fi_path = os.path.join(models_dir, "feature_importance.csv")
     feature_importance.to_csv(fi_path)
     mlflow_utils.log_artifact(fi_path)
@@ -61,6 +84,7 @@ def train_autogluon(
     best_score = float(best_row["score_val"])
     mlflow_utils.log_metrics_to_run(run_id, {"best_score": best_score})
 
-    model_uri = mlflow_utils.log_autogluon_model(run_id, predictor, artifact_path="model")
+    with substep("log_model"):
+        model_uri = mlflow_utils.log_autogluon_model(run_id, predictor, artifact_path="model")
     logger.info("Training completed. Best model: %s", best_row["model"])
     return predictor, leaderboard_path, fi_path, run_id, model_uri
@@ -0,0 +1,231 @@
+"""Content-addressed artifact logging on top of MLflow.
+
+Files are uploaded once per experiment, by SHA256, into a dedicated
+``artifact-blobs`` run (``blobs/<aa>/<sha256>``). Each logging run records
+only a ``manifest.json`` mapping relative paths to blob hashes. A local SQLite
+index remembers which blobs already exist, so unchanged files are neither
+hashed twice (see :mod:`src.utils.fingerprint`) nor uploaded again, and a
+local blob cache lets downloads skip files that are already present.
+
+    python -m src.utils.artifact_store download --run-id <id> --artifact-path model --dest out/
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from src.utils.fingerprint import dir_manifest, file_sha256
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+BLOB_RUN_NAME = "artifact-blobs"
+BLOB_RUN_TAG = "mlops.blob_store"
+DEFAULT_INDEX_PATH = "artifacts/blob_index.sqlite"
+DEFAULT_CACHE_DIR = "artifacts/blob_cache"
+
+_lock = threading.Lock()
+
+
+def _blob_rel_path(sha256: str) -> str:
+    return f"blobs/{sha256[:2]}/{sha256}"
+
+
+@contextmanager
+def _index(path: str | Path | None = None) -> Iterator[sqlite3.Connection]:
+    path = Path(path or os.getenv("MLOPS_BLOB_INDEX", DEFAULT_INDEX_PATH))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                blob_run_id TEXT, sha256 TEXT, size INTEGER, PRIMARY KEY (blob_run_id, sha256)
+            );
+            CREATE TABLE IF NOT EXISTS blob_runs (
+                tracking_uri TEXT, experiment_id TEXT, run_id TEXT,
+                PRIMARY KEY (tracking_uri, experiment_id)
+            );
+            """
+        )
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _blob_run_id(client: Any, experiment_id: str) -> str:
+    """The experiment's blob run, found by tag or created once."""
+    import mlflow
+
+    tracking_uri = mlflow.get_tracking_uri()
+    with _index() as conn:
+        row = conn.execute(
+            "SELECT run_id FROM blob_runs WHERE tracking_uri = ? AND experiment_id = ?",
+            (tracking_uri, experiment_id),
+        ).fetchone()
+    if row:
+        try:
+            if client.get_run(row[0]).info.lifecycle_stage == "active":
+                return row[0]
+        except Exception:  # pylint: disable=broad-except
+            pass
+        # The blob run vanished (deleted or a different server); forget what we knew about it.
+        with _index() as conn:
+            conn.execute("DELETE FROM blobs WHERE blob_run_id = ?", (row[0],))
+    runs = client.search_runs(
+        [experiment_id], filter_string=f"tags.`{BLOB_RUN_TAG}` = 'true'", max_results=1
+    )
+    if runs:
+        run_id = runs[0].info.run_id
+    else:
+        run = client.create_run(experiment_id, run_name=BLOB_RUN_NAME, tags={BLOB_RUN_TAG: "true"})
+        run_id = run.info.run_id
+        client.set_terminated(run_id)
+        logger.info("Created blob store run %s in experiment %s", run_id, experiment_id)
+    with _index() as conn:
+        conn.execute("INSERT OR REPLACE INTO blob_runs VALUES (?, ?, ?)", (tracking_uri, experiment_id, run_id))
+    return run_id
+
+
+def _remote_blobs(client: Any, blob_run_id: str, prefixes: set[str]) -> set[str]:
+    """Blob hashes present remotely under the given two-character prefixes."""
+    present: set[str] = set()
+    for prefix in prefixes:
+        for info in client.list_artifacts(blob_run_id, f"blobs/{prefix}"):
+            present.add(info.path.rsplit("/", 1)[-1])
+    return present
+
+
+def log_artifacts_dedup(run_id: str, artifact_path: str, local_dir: str | Path) -> Dict[str, Any]:
+    """Upload only unseen blobs of ``local_dir`` and log its manifest under ``artifact_path``."""
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient()
+    local_dir = Path(local_dir)
+    files = dir_manifest(local_dir)
+    experiment_id = client.get_run(run_id).info.experiment_id
+    with _lock:
+        blob_run_id = _blob_run_id(client, experiment_id)
+        with _index() as conn:
+            known = {
+                row[0]
+                for row in conn.execute("SELECT sha256 FROM blobs WHERE blob_run_id = ?", (blob_run_id,))
+            }
+        wanted = {sha: rel for rel, sha in files.items()}
+        missing = {sha: rel for sha, rel in wanted.items() if sha not in known}
+        if missing:
+            # The local index may lag behind other machines; check the remote before uploading.
+            remote = _remote_blobs(client, blob_run_id, {sha[:2] for sha in missing})
+            upload = {sha: rel for sha, rel in missing.items() if sha not in remote}
+        else:
+            remote, upload = set(), {}
+        uploaded_bytes = 0
+        if upload:
+            with tempfile.TemporaryDirectory(prefix="blobs_") as staging:
+                for sha, rel in upload.items():
+                    target = Path(staging) / _blob_rel_path(sha)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    try:
+                        os.link(local_dir / rel, target)
+                    except OSError:
+                        shutil.copy2(local_dir / rel, target)
+                    uploaded_bytes += target.stat().st_size
+                client.log_artifacts(blob_run_id, str(Path(staging) / "blobs"), "blobs")
+        with _index() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)",
+                [(blob_run_id, sha, (local_dir / rel).stat().st_size) for sha, rel in missing.items()],
+            )
+
+    manifest = {
+        "blob_run_id": blob_run_id,
+        "files": {rel: {"sha256": sha, "size": (local_dir / rel).stat().st_size} for rel, sha in files.items()},
+    }
+    with tempfile.TemporaryDirectory(prefix="manifest_") as tmp:
+        manifest_path = Path(tmp) / MANIFEST_FILE
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        client.log_artifact(run_id, str(manifest_path), artifact_path)
+    stats = {
+        "files": len(files),
+        "unique_blobs": len(wanted),
+        "uploaded_blobs": len(upload),
+        "uploaded_bytes": uploaded_bytes,
+        "total_bytes": sum(entry["size"] for entry in manifest["files"].values()),
+    }
+    logger.info(
+        "Logged %s from %s as a manifest: %d/%d blobs uploaded (%.1f MB)",
+        artifact_path,
+        local_dir,
+        stats["uploaded_blobs"],
+        stats["unique_blobs"],
+        uploaded_bytes / 2**20,
+    )
+    return stats
+
+
+def download_artifacts_dedup(
+    run_id: str, artifact_path: str, dest_dir: str | Path, cache_dir: str | Path | None = None
+) -> Path:
+    """Materialize a manifest into ``dest_dir``; files already there with the right hash are kept."""
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient()
+    dest_dir = Path(dest_dir)
+    cache_dir = Path(cache_dir or os.getenv("MLOPS_BLOB_CACHE", DEFAULT_CACHE_DIR))
+    with tempfile.TemporaryDirectory(prefix="manifest_") as tmp:
+        local = client.download_artifacts(run_id, f"{artifact_path}/{MANIFEST_FILE}", tmp)
+        manifest = json.loads(Path(local).read_text(encoding="utf-8"))
+    blob_run_id = manifest["blob_run_id"]
+    fetched = skipped = 0
+    for rel, entry in manifest["files"].items():
+        target = dest_dir / rel
+        sha = entry["sha256"]
+        if target.exists() and file_sha256(target) == sha:
+            skipped += 1
+            continue
+        cached = cache_dir / _blob_rel_path(sha)
+        if not cached.exists():
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.TemporaryDirectory(prefix="blob_", dir=cache_dir) as tmp:
+                downloaded = client.download_artifacts(blob_run_id, _blob_rel_path(sha), tmp)
+                os.replace(downloaded, cached)
+            fetched += 1
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(cached, target)
+    logger.info(
+        "Restored %s of run %s into %s (%d fetched, %d unchanged)", artifact_path, run_id, dest_dir, fetched, skipped
+    )
+    return dest_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Content-addressed MLflow artifacts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    download = sub.add_parser("download", help="Restore a manifest-logged artifact directory.")
+    download.add_argument("--run-id", required=True)
+    download.add_argument("--artifact-path", required=True)
+    download.add_argument("--dest", required=True)
+    download.add_argument("--cache-dir", default=None)
+    upload = sub.add_parser("upload", help="Log a directory to a run as a manifest.")
+    upload.add_argument("--run-id", required=True)
+    upload.add_argument("--artifact-path", required=True)
+    upload.add_argument("--path", required=True)
+    args = parser.parse_args()
+    if args.command == "download":
+        download_artifacts_dedup(args.run_id, args.artifact_path, args.dest, args.cache_dir)
+    else:
+        print(json.dumps(log_artifacts_dedup(args.run_id, args.artifact_path, args.path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,258 @@
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Mapping, Tuple
+
 import yaml
-from typing import Any, Dict
 
+ENV_PREFIX = "MLOPS__"
+
+_NUMBER = (int, float)
+
+# section -> key -> (expected type(s), required)
+SCHEMA: Dict[str, Dict[str, Tuple[Any, bool]]] = {
+    "paths": {
+        "raw_data": (str, True),
+        "processed_data": (str, True),
+        "models_dir": (str, True),
+        "registry_dir": (str, True),
+    },
+    "mlflow": {
+        "experiment_name": (str, True),
+    },
+    "training": {
+        "label_column": (str, True),
+        "time_limit": (_NUMBER, True),
+        "presets": (str, True),
+        "eval_metric": (str, True),
+        "model_name": (str, False),
+        "hyperparameters": (Mapping, False),
+        "num_cpus": ((int, str), False),
+    },
+    "preprocess": {
+        "test_size": (_NUMBER, True),
+        "random_state": (int, True),
+        "optimize_dtypes": (bool, False),
+        "max_category_ratio": (_NUMBER, False),
+        "float_rtol": (_NUMBER, False),
+    },
+    "gating": {
+        "enabled": (bool, False),
+        "metric": (str, False),
+        "mode": (str, False),
+        "min_delta": (_NUMBER, False),
+        "max_regression": (Mapping, False),
+        "metric_modes": (Mapping, False),
+        "alias": (str, False),
+        "index_path": (str, False),
+    },
+    "metrics_store": {
+        "enabled": (bool, False),
+        "path": (str, False),
+    },
+    "resources": {
+        "enabled": (bool, False),
+        "cgroup_root": (str, False),
+        "memory_fraction": (_NUMBER, False),
+        "memory_share": (_NUMBER, False),
+        "train": (Mapping, False),
+        "security": (Mapping, False),
+    },
+    "artifact_store": {
+        "dedup": (bool, False),
+        "index_path": (str, False),
+        "cache_dir": (str, False),
+    },
+    "data_profile": {
+        "bins": (int, False),
+        "streaming": (bool, False),
+        "chunksize": (int, False),
+    },
+    "monitoring": {
+        "reference_path": (str, False),
+        "report_path": (str, False),
+        "bins": (int, False),
+        "ks_points": (int, False),
+        "top_k": (int, False),
+        "chunksize": (int, False),
+        "psi_threshold": (_NUMBER, False),
+        "log_to_mlflow": (bool, False),
+    },
+    "security": {
+        "anomaly": (Mapping, False),
+        "sampling": (Mapping, False),
+        "dependency_scan": (Mapping, False),
+    },
+    "deploy": {
+        "onnx": (Mapping, False),
+    },
+    "serving": {
+        "cache": (Mapping, False),
+        "hot_swap": (Mapping, False),
+        "server": (Mapping, False),
+    },
+    "incremental": {
+        "enabled": (bool, False),
+        "key_columns": ((list, tuple), False),
+        "time_budget_fraction": (_NUMBER, False),
+        "max_delta_fraction": (_NUMBER, False),
+        "top_k_families": (int, False),
+    },
+    "profiling": {
+        "report_path": (str, False),
+        "log_to_mlflow": (bool, False),
+    },
+}
+REQUIRED_SECTIONS = ("paths", "mlflow", "training", "preprocess")
+
+
+class ConfigError(ValueError):
+    """Raised when the pipeline config is missing keys or has wrong types."""
+
+
+class FrozenConfig(Mapping):
+    """Read-only, nested view of a config tree; sub-sections are shared, never copied."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        object.__setattr__(self, "_data", {key: _freeze(value) for key, value in data.items()})
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return self._data[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise TypeError("FrozenConfig is immutable")
+
+    def __repr__(self) -> str:
+        return f"FrozenConfig({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (FrozenConfig, (thaw(self),))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return thaw(self)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return FrozenConfig(value)
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Convert a frozen (sub)tree back to plain dicts/lists for external libraries."""
+    if isinstance(value, FrozenConfig):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def _env_overrides() -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, v) for k, v in os.environ.items() if k.startswith(ENV_PREFIX)))
+
+
+def _apply_overrides(raw: Dict[str, Any], overrides: Tuple[Tuple[str, str], ...]) -> None:
+    """Apply ``MLOPS__SECTION__KEY=value`` env vars; values are parsed as YAML scalars."""
+    for env_key, env_value in overrides:
+        parts = [part.lower() for part in env_key[len(ENV_PREFIX):].split("__") if part]
+        if not parts:
+            continue
+        node = raw
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                raise ConfigError(f"{env_key} overrides a non-mapping config value.")
+        node[parts[-1]] = yaml.safe_load(env_value)
+
+
+def validate_config(raw: Mapping[str, Any]) -> None:
+    """Check required sections/keys and value types; raise one ConfigError listing all problems."""
+    errors: List[str] = []
+    for section in REQUIRED_SECTIONS:
+        if not isinstance(raw.get(section), Mapping):
+            errors.append(f"missing section '{section}'")
+    for section, keys in SCHEMA.items():
+        values = raw.get(section)
+        if not isinstance(values, Mapping):
+            continue
+        for key, (expected, required) in keys.items():
+            if key not in values or values[key] is None:
+                if required:
+                    errors.append(f"missing '{section}.{key}'")
+                continue
+            value = values[key]
+            # bool is an int subclass; only accept it where bool is expected.
+            if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+                errors.append(f"'{section}.{key}' has type {type(value).__name__}")
+
+    preprocess = raw.get("preprocess") or {}
+    test_size = preprocess.get("test_size")
+    if isinstance(test_size, _NUMBER) and not 0 < test_size < 1:
+        errors.append("'preprocess.test_size' must be between 0 and 1")
+    float_rtol = preprocess.get("float_rtol")
+    if isinstance(float_rtol, _NUMBER) and float_rtol < 0:
+        errors.append("'preprocess.float_rtol' must not be negative")
+    time_limit = (raw.get("training") or {}).get("time_limit")
+    if isinstance(time_limit, _NUMBER) and time_limit <= 0:
+        errors.append("'training.time_limit' must be positive")
+    mode = (raw.get("gating") or {}).get("mode")
+    if mode is not None and mode not in ("max", "min"):
+        errors.append("'gating.mode' must be 'max' or 'min'")
+
+    if errors:
+        raise ConfigError("Invalid config: " + "; ".join(errors))
+
+
+_yaml_cache: Dict[str, Tuple[int, Any]] = {}
+_config_cache: Dict[str, Tuple[Any, FrozenConfig]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_yaml(path: str) -> Any:
+    """Parse a YAML file once per (path, mtime); returns None for empty files."""
+    abs_path = os.path.abspath(path)
+    mtime = os.stat(abs_path).st_mtime_ns
+    with _cache_lock:
+        cached = _yaml_cache.get(abs_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(abs_path, "r", encoding="utf-8") as fp:
+        data = yaml.safe_load(fp)
+    with _cache_lock:
+        _yaml_cache[abs_path] = (mtime, data)
+    return data
+
+
+def load_config(path: str) -> FrozenConfig:
+    """Load, override from env, validate and freeze the config; cached per path, mtime and env."""
+    abs_path = os.path.abspath(path)
+    overrides = _env_overrides()
+    key = (os.stat(abs_path).st_mtime_ns, overrides)
+    with _cache_lock:
+        cached = _config_cache.get(abs_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
 
-def load_config(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as fp:
-        return yaml.safe_load(fp)
+    # Deep-copy via thaw/freeze so env overrides never mutate the cached YAML.
+    raw = thaw(_freeze(load_yaml(abs_path) or {}))
+    _apply_overrides(raw, overrides)
+    validate_config(raw)
+    config = FrozenConfig(raw)
+    with _cache_lock:
+        _config_cache[abs_path] = (key, config)
+    return config
@@ -8,14 +8,6 @@ from pathlib import Path
 from typing import Optional
 from urllib.parse import urlparse
 
-import boto3
-from botocore.exceptions import (
-    BotoCoreError,
-    ClientError,
-    EndpointConnectionError,
-    NoCredentialsError,
-)
-
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -97,6 +89,14 @@ def test_s3_connection(
     region_name: Optional[str] = None,
 ) -> bool:
     """Connectivity check to the specified bucket; returns True if HeadBucket passes."""
+    import boto3
+    from botocore.exceptions import (
+        BotoCoreError,
+        ClientError,
+        EndpointConnectionError,
+        NoCredentialsError,
+    )
+
     bucket_url = os.getenv("DVC_BUCKET_URL")
     if not bucket_url:
         cfg_path = Path(".dvc") / "config"
@@ -0,0 +1,65 @@
+"""Content fingerprints for files and directories (used as ZenML cache keys)."""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+_CHUNK_SIZE = 1 << 20
+_cache: Dict[Tuple[str, int, int], str] = {}
+_cache_lock = threading.Lock()
+
+
+def file_sha256(path: str | Path) -> str:
+    """Streaming SHA256 of a file's bytes, memoised on (path, size, mtime)."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _cache_lock:
+        _cache[key] = value
+    return value
+
+
+def dir_manifest(root: str | Path) -> Dict[str, str]:
+    """Map every file under ``root`` (POSIX relative path) to its SHA256."""
+    root = Path(root)
+    if not root.exists():
+        return {}
+    return {
+        path.relative_to(root).as_posix(): file_sha256(path)
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+def dir_fingerprint(root: str | Path, exclude: Tuple[str, ...] = ()) -> str:
+    """Single hash over a directory's manifest; empty string when the directory is missing."""
+    manifest = dir_manifest(root)
+    if not manifest:
+        return ""
+    digest = hashlib.sha256()
+    for rel_path, file_hash in manifest.items():
+        if rel_path in exclude:
+            continue
+        digest.update(f"{rel_path}\0{file_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def path_fingerprint(path: str | Path) -> str:
+    """Fingerprint a file or directory; empty string when it does not exist."""
+    path = Path(path)
+    if path.is_dir():
+        return dir_fingerprint(path)
+    if path.is_file():
+        return file_sha256(path)
+    return ""
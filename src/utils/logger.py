@@ -1,6 +1,27 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
 import os
-from typing import Optional
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_CONTEXT: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("log_context", default={})
+# True inside a ``log_context`` block; ``update_log_context`` only applies there.
+_SCOPED: contextvars.ContextVar[bool] = contextvars.ContextVar("log_context_scoped", default=False)
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+_TEXT_FORMAT = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_lock = threading.Lock()
+_shared_handler: Optional[logging.Handler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
 
 
 def _log_level() -> int:
@@ -9,17 +30,191 @@ def _log_level() -> int:
     return getattr(logging, level, logging.INFO)
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _rate_limit() -> Optional[Tuple[int, float]]:
+    """Parse LOG_RATE_LIMIT (``<count>/<seconds>``); None disables rate limiting."""
+    raw = os.getenv("LOG_RATE_LIMIT", "").strip()
+    if not raw:
+        return None
+    try:
+        count, _, window = raw.partition("/")
+        limit = (int(count), float(window or 60))
+    except ValueError:
+        return None
+    return limit if limit[0] > 0 else None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with stage/run_id context and any ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": self.formatTime(record, _DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already rendered in the logging thread by ``_InProcessQueueHandler.prepare``.
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the active ``log_context`` fields onto the record in the caller's thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _CONTEXT.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Allow at most ``limit`` records per message template and level per ``window`` seconds."""
+
+    def __init__(self, limit: int, window: float) -> None:
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._state: Dict[Tuple[Any, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.msg, record.levelno)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self._state[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                    record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+                return True
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue a copy with ``msg % args`` and the traceback rendered in the logging thread.
+
+    Arguments may be mutated after the call returns, so they are resolved here
+    as the stdlib ``QueueHandler.prepare`` does; the line layout (timestamp,
+    JSON) is still produced on the listener thread, and context fields copied
+    onto the record by ``ContextFilter`` are kept.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_formatter() -> logging.Formatter:
+    if os.getenv("LOG_FORMAT", "text").strip().lower() == "json":
+        return JsonFormatter()
+    return logging.Formatter(fmt=_TEXT_FORMAT, datefmt=_DATE_FORMAT)
+
+
+def _start_listener(stream_handler: logging.Handler) -> logging.handlers.QueueListener:
+    global _listener
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def _get_shared_handler() -> logging.Handler:
+    """Build the process-wide handler once: a queue feeding a background stderr writer."""
+    global _shared_handler
+    if _shared_handler is not None:
+        return _shared_handler
+    with _lock:
+        if _shared_handler is not None:
+            return _shared_handler
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(_build_formatter())
+        if _env_flag("LOG_ASYNC", True):
+            listener = _start_listener(stream_handler)
+            handler: logging.Handler = _InProcessQueueHandler(listener.queue)
+        else:
+            handler = stream_handler
+        handler.addFilter(ContextFilter())
+        _shared_handler = handler
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    # Forked children inherit the queue but not the writer thread.
+    if isinstance(_shared_handler, _InProcessQueueHandler) and _listener is not None:
+        _start_listener(_listener.handlers[0])
+        _shared_handler.queue = _listener.queue
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Attach fields such as ``stage`` or ``run_id`` to every record logged inside the block."""
+    token = _CONTEXT.set({**_CONTEXT.get(), **fields})
+    scoped = _SCOPED.set(True)
+    try:
+        yield
+    finally:
+        _SCOPED.reset(scoped)
+        _CONTEXT.reset(token)
+
+
+def update_log_context(**fields: Any) -> None:
+    """Add fields to the current context until the enclosing ``log_context`` exits.
+
+    Outside any ``log_context`` this is a no-op, so fields such as ``run_id``
+    never outlive the stage that set them.
+    """
+    if _SCOPED.get():
+        _CONTEXT.set({**_CONTEXT.get(), **fields})
+
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """Return a configured logger shared across the project."""
     logger = logging.getLogger(name if name else __name__)
     if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            fmt="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        logger.addHandler(_get_shared_handler())
+        limit = _rate_limit()
+        if limit:
+            logger.addFilter(RateLimitFilter(*limit))
         logger.setLevel(_log_level())
         logger.propagate = False
     else:
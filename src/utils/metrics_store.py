@@ -0,0 +1,394 @@
+"""Local SQLite index of MLflow runs, params, metrics and model versions.
+
+``mlflow_utils`` writes through to this store as runs are logged, so questions
+such as "best accuracy in this experiment", "metric trend across model
+versions" or "who is champion" are answered by indexed queries instead of
+scanning runs through ``MlflowClient``. The store can be rebuilt at any time
+from a ``file:`` mlruns directory (or any tracking server)::
+
+    python -m src.utils.metrics_store rebuild --mlruns ./mlruns
+    python -m src.utils.metrics_store best --experiment mlops_experiment --metric accuracy
+    python -m src.utils.metrics_store trend --model autogluon_best --metric accuracy
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping
+
+import yaml
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_STORE_PATH = "artifacts/metrics_store.sqlite"
+STORE_ENV = "MLOPS_METRICS_STORE"
+ENABLED_ENV = "MLOPS_METRICS_STORE_ENABLED"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY, experiment TEXT, run_name TEXT, status TEXT,
+    start_time INTEGER, end_time INTEGER
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id TEXT, key TEXT, value TEXT, PRIMARY KEY (run_id, key)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT, experiment TEXT, key TEXT, value REAL, step INTEGER, timestamp INTEGER
+);
+CREATE TABLE IF NOT EXISTS model_versions (
+    model_name TEXT, version TEXT, run_id TEXT, created_at INTEGER,
+    PRIMARY KEY (model_name, version)
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    model_name TEXT, alias TEXT, version TEXT, PRIMARY KEY (model_name, alias)
+);
+CREATE TABLE IF NOT EXISTS champions (
+    model_name TEXT, run_id TEXT, model_version TEXT, metrics TEXT, promoted_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_experiment ON runs (experiment, start_time);
+CREATE INDEX IF NOT EXISTS idx_metrics_key ON metrics (experiment, key, value);
+CREATE INDEX IF NOT EXISTS idx_metrics_time ON metrics (experiment, key, timestamp);
+CREATE INDEX IF NOT EXISTS idx_metrics_run ON metrics (run_id, key);
+CREATE INDEX IF NOT EXISTS idx_versions_run ON model_versions (run_id);
+CREATE INDEX IF NOT EXISTS idx_champions_model ON champions (model_name, promoted_at);
+"""
+
+
+def default_store_path() -> str:
+    return os.getenv(STORE_ENV, DEFAULT_STORE_PATH)
+
+
+def store_enabled() -> bool:
+    """``metrics_store.enabled`` as exported by ``run_pipelines`` (default on)."""
+    value = os.getenv(ENABLED_ENV)
+    return value is None or value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class MetricsStore:
+    """Thin wrapper around one SQLite file; safe to share between threads and processes."""
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path or default_store_path())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            # WAL lets dashboards read while a pipeline process writes.
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -- writes -----------------------------------------------------------
+
+    def record_run(
+        self,
+        run_id: str,
+        experiment: str,
+        run_name: str | None = None,
+        status: str = "RUNNING",
+        start_time: int | None = None,
+        end_time: int | None = None,
+    ) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, experiment, run_name, status, start_time or _now_ms(), end_time),
+            )
+
+    def end_run(self, run_id: str, status: str = "FINISHED") -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE runs SET status = ?, end_time = ? WHERE run_id = ?", (status, _now_ms(), run_id))
+
+    def log_params(self, run_id: str, params: Mapping[str, Any]) -> None:
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO params VALUES (?, ?, ?)",
+                [(run_id, key, str(value)) for key, value in params.items()],
+            )
+
+    def log_metrics(
+        self, run_id: str, metrics: Mapping[str, float], step: int = 0, timestamp: int | None = None
+    ) -> None:
+        timestamp = timestamp or _now_ms()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT experiment FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            experiment = row[0] if row else None
+            conn.executemany(
+                "INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, experiment, key, float(value), step, timestamp) for key, value in metrics.items()],
+            )
+
+    def record_model_version(
+        self, model_name: str, version: str, run_id: str | None, created_at: int | None = None
+    ) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO model_versions VALUES (?, ?, ?, ?)",
+                (model_name, str(version), run_id, created_at or _now_ms()),
+            )
+
+    def set_alias(self, model_name: str, alias: str, version: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)", (model_name, alias, str(version)))
+
+    def record_champion(
+        self,
+        model_name: str,
+        run_id: str,
+        model_version: str | None,
+        metrics: Mapping[str, float],
+        promoted_at: str,
+    ) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO champions VALUES (?, ?, ?, ?, ?)",
+                (model_name, run_id, model_version, json.dumps({k: float(v) for k, v in metrics.items()}), promoted_at),
+            )
+
+    # -- queries ----------------------------------------------------------
+
+    def _query(self, sql: str, args: tuple = ()) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, args).fetchall()]
+
+    def champion(self, model_name: str) -> Dict[str, Any] | None:
+        """Latest champion entry in the shape gating expects (run_id, model_version, metrics)."""
+        rows = self._query(
+            "SELECT run_id, model_version, metrics, promoted_at FROM champions "
+            "WHERE model_name = ? ORDER BY promoted_at DESC, rowid DESC LIMIT 1",
+            (model_name,),
+        )
+        if not rows:
+            return None
+        rows[0]["metrics"] = json.loads(rows[0]["metrics"])
+        return rows[0]
+
+    def best_run(self, experiment: str, metric: str, mode: str = "max") -> Dict[str, Any] | None:
+        """Run whose latest value of ``metric`` is the best in ``experiment``.
+
+        Only each run's most recent value counts, so an early step that scored
+        better than the run's final value never wins.
+        """
+        order = "DESC" if mode == "max" else "ASC"
+        rows = self._query(
+            f"""
+            SELECT run_id, run_name, value, timestamp FROM (
+                SELECT m.run_id, r.run_name, m.value, m.timestamp,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY m.run_id ORDER BY m.timestamp DESC, m.step DESC, m.rowid DESC
+                       ) AS recency
+                FROM metrics m JOIN runs r ON r.run_id = m.run_id
+                WHERE m.experiment = ? AND m.key = ?
+            )
+            WHERE recency = 1
+            ORDER BY value {order}, timestamp DESC LIMIT 1
+            """,
+            (experiment, metric),
+        )
+        return rows[0] if rows else None
+
+    def metric_history(
+        self, experiment: str, metric: str, since_ms: int | None = None, until_ms: int | None = None
+    ) -> List[Dict[str, Any]]:
+        return self._query(
+            """
+            SELECT run_id, value, step, timestamp FROM metrics
+            WHERE experiment = ? AND key = ? AND timestamp >= ? AND timestamp <= ?
+            ORDER BY timestamp
+            """,
+            (experiment, metric, since_ms or 0, until_ms or 2**62),
+        )
+
+    def metric_by_version(self, model_name: str, metric: str) -> List[Dict[str, Any]]:
+        """Latest ``metric`` value of each registered version's source run, oldest version first."""
+        return self._query(
+            """
+            SELECT v.version, v.run_id, v.created_at,
+                   (SELECT m.value FROM metrics m WHERE m.run_id = v.run_id AND m.key = ?
+                    ORDER BY m.timestamp DESC, m.step DESC LIMIT 1) AS value
+            FROM model_versions v WHERE v.model_name = ?
+            ORDER BY CAST(v.version AS INTEGER)
+            """,
+            (metric, model_name),
+        )
+
+    def runs(
+        self, experiment: str, since_ms: int | None = None, until_ms: int | None = None
+    ) -> List[Dict[str, Any]]:
+        return self._query(
+            "SELECT * FROM runs WHERE experiment = ? AND start_time >= ? AND start_time <= ? ORDER BY start_time",
+            (experiment, since_ms or 0, until_ms or 2**62),
+        )
+
+    # -- rebuild ----------------------------------------------------------
+
+    def clear(self) -> None:
+        """Drop everything MLflow can recreate; champion history is kept (it is not in MLflow)."""
+        with self._lock, self._connect() as conn:
+            for table in ("runs", "params", "metrics", "model_versions", "aliases"):
+                conn.execute(f"DELETE FROM {table}")
+
+
+def _read_meta(path: Path) -> Dict[str, Any]:
+    try:
+        return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+
+
+def rebuild_from_mlruns(store: MetricsStore, mlruns: str | Path) -> Dict[str, int]:
+    """Re-index a ``file:`` tracking directory by reading its files directly."""
+    mlruns = Path(mlruns)
+    counts = {"runs": 0, "metrics": 0, "model_versions": 0}
+    store.clear()
+    with store._lock, store._connect() as conn:  # pylint: disable=protected-access
+        for exp_dir in sorted(p for p in mlruns.iterdir() if p.is_dir() and p.name not in ("models", ".trash")):
+            experiment = _read_meta(exp_dir / "meta.yaml").get("name")
+            if experiment is None:
+                continue
+            for run_dir in (p for p in exp_dir.iterdir() if (p / "meta.yaml").exists()):
+                meta = _read_meta(run_dir / "meta.yaml")
+                run_id = meta.get("run_id") or run_dir.name
+                status = {1: "RUNNING", 2: "SCHEDULED", 3: "FINISHED", 4: "FAILED", 5: "KILLED"}.get(
+                    meta.get("status"), str(meta.get("status"))
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                    (run_id, experiment, meta.get("run_name"), status, meta.get("start_time"), meta.get("end_time")),
+                )
+                counts["runs"] += 1
+                params_dir = run_dir / "params"
+                if params_dir.exists():
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO params VALUES (?, ?, ?)",
+                        [
+                            (run_id, p.relative_to(params_dir).as_posix(), p.read_text(encoding="utf-8"))
+                            for p in params_dir.rglob("*")
+                            if p.is_file()
+                        ],
+                    )
+                metrics_dir = run_dir / "metrics"
+                if not metrics_dir.exists():
+                    continue
+                for metric_file in (p for p in metrics_dir.rglob("*") if p.is_file()):
+                    key = metric_file.relative_to(metrics_dir).as_posix()
+                    rows = []
+                    for line in metric_file.read_text(encoding="utf-8").splitlines():
+                        parts = line.split()
+                        if len(parts) >= 2:
+                            step = int(parts[2]) if len(parts) > 2 else 0
+                            rows.append((run_id, experiment, key, float(parts[1]), step, int(parts[0])))
+                    conn.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?)", rows)
+                    counts["metrics"] += len(rows)
+
+        models_dir = mlruns / "models"
+        for model_dir in (p for p in models_dir.iterdir() if p.is_dir()) if models_dir.exists() else []:
+            for version_dir in model_dir.glob("version-*"):
+                meta = _read_meta(version_dir / "meta.yaml")
+                conn.execute(
+                    "INSERT OR REPLACE INTO model_versions VALUES (?, ?, ?, ?)",
+                    (meta.get("name", model_dir.name), str(meta.get("version")), meta.get("run_id"),
+                     meta.get("creation_timestamp")),
+                )
+                counts["model_versions"] += 1
+            aliases_dir = model_dir / "aliases"
+            for alias_file in aliases_dir.iterdir() if aliases_dir.exists() else []:
+                conn.execute(
+                    "INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)",
+                    (model_dir.name, alias_file.name, alias_file.read_text(encoding="utf-8").strip()),
+                )
+    return counts
+
+
+def rebuild_from_tracking_server(store: MetricsStore, tracking_uri: str) -> Dict[str, int]:
+    """Re-index any tracking backend through ``MlflowClient`` (slow path, used once)."""
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient(tracking_uri=tracking_uri)
+    counts = {"runs": 0, "metrics": 0, "model_versions": 0}
+    store.clear()
+    for experiment in client.search_experiments():
+        for run in client.search_runs([experiment.experiment_id], max_results=50_000):
+            run_id = run.info.run_id
+            store.record_run(
+                run_id, experiment.name, run.info.run_name, run.info.status, run.info.start_time, run.info.end_time
+            )
+            store.log_params(run_id, run.data.params)
+            for key in run.data.metrics:
+                history = client.get_metric_history(run_id, key)
+                with store._lock, store._connect() as conn:  # pylint: disable=protected-access
+                    conn.executemany(
+                        "INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?)",
+                        [(run_id, experiment.name, key, m.value, m.step, m.timestamp) for m in history],
+                    )
+                counts["metrics"] += len(history)
+            counts["runs"] += 1
+    for model in client.search_registered_models():
+        for version in client.search_model_versions(f"name='{model.name}'"):
+            store.record_model_version(model.name, version.version, version.run_id, version.creation_timestamp)
+            counts["model_versions"] += 1
+        for alias, version in (getattr(model, "aliases", None) or {}).items():
+            store.set_alias(model.name, alias, version)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query or rebuild the local MLflow metrics store.")
+    parser.add_argument("--store", default=None, help=f"SQLite path (default ${STORE_ENV} or {DEFAULT_STORE_PATH}).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Re-index all runs from MLflow.")
+    rebuild.add_argument("--mlruns", default="mlruns", help="file: tracking directory.")
+    rebuild.add_argument("--tracking-uri", default=None, help="Use MlflowClient against this URI instead.")
+    best = sub.add_parser("best", help="Best run of an experiment by a metric.")
+    best.add_argument("--experiment", required=True)
+    best.add_argument("--metric", required=True)
+    best.add_argument("--mode", choices=["max", "min"], default="max")
+    trend = sub.add_parser("trend", help="Metric value per registered model version.")
+    trend.add_argument("--model", required=True)
+    trend.add_argument("--metric", required=True)
+    history = sub.add_parser("history", help="Metric values of an experiment over a time range.")
+    history.add_argument("--experiment", required=True)
+    history.add_argument("--metric", required=True)
+    history.add_argument("--since-ms", type=int, default=None)
+    history.add_argument("--until-ms", type=int, default=None)
+    args = parser.parse_args()
+
+    store = MetricsStore(args.store)
+    start = time.perf_counter()
+    if args.command == "rebuild":
+        if args.tracking_uri:
+            result: Any = rebuild_from_tracking_server(store, args.tracking_uri)
+        else:
+            result = rebuild_from_mlruns(store, args.mlruns)
+    elif args.command == "best":
+        result = store.best_run(args.experiment, args.metric, args.mode)
+    elif args.command == "trend":
+        result = store.metric_by_version(args.model, args.metric)
+    else:
+        result = store.metric_history(args.experiment, args.metric, args.since_ms, args.until_ms)
+    print(json.dumps(result, indent=2, default=str))
+    logger.info("%s answered in %.1f ms", args.command, (time.perf_counter() - start) * 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,7 @@ import time
 from pathlib import Path
 from typing import Any, Dict, List
 
-import mlflow
-from mlflow.tracking import MlflowClient
-
-from src.utils.logger import get_logger
+from src.utils.logger import get_logger, update_log_context
 
 logger = get_logger(__name__)
 
@@ -20,8 +17,38 @@ def _as_bool(value: str | None, default: bool) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+_metrics_store = None
+
+
+def _index(method: str, *args: Any) -> None:
+    """Write through to the local metrics store; it is a cache, so failures never fail a run."""
+    global _metrics_store
+    from src.utils.metrics_store import store_enabled
+
+    if not store_enabled():
+        return
+    try:
+        from src.utils.metrics_store import MetricsStore, default_store_path
+
+        if _metrics_store is None or str(_metrics_store.path) != default_store_path():
+            _metrics_store = MetricsStore()
+        getattr(_metrics_store, method)(*args)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("Metrics store update (%s) failed: %s", method, exc)
+
+
+def _active_run_id() -> str | None:
+    import mlflow
+
+    run = mlflow.active_run()
+    return run.info.run_id if run else None
+
+
 def _can_reach_uri(uri: str) -> bool:
     """Quick reachability check: set URI and list experiments."""
+    import mlflow
+    from mlflow.tracking import MlflowClient
+
     try:
         mlflow.set_tracking_uri(uri)
         MlflowClient().search_experiments(max_results=1)
@@ -133,6 +160,8 @@ def configure_mlflow(
     experiment_name: str, tracking_uri: str | None = None, artifact_location: str | None = None
 ) -> str:
     """Set tracking URI/experiment; ensure artifact root exists for file-based setups."""
+    import mlflow
+
     resolved_uri = tracking_uri
     if resolved_uri:
         if not _can_reach_uri(resolved_uri):
@@ -157,46 +186,93 @@ def configure_mlflow(
 
 
 def start_run(experiment_name: str, run_name: str | None = None):
+    import mlflow
+
     tracking_uri = configure_mlflow(
         experiment_name=experiment_name,
         tracking_uri=os.getenv("MLFLOW_TRACKING_URI"),
         artifact_location=os.getenv("MLFLOW_ARTIFACT_ROOT"),
     )
     run = mlflow.start_run(run_name=run_name)
+    update_log_context(run_id=run.info.run_id)
+    _index("record_run", run.info.run_id, experiment_name, run_name, "RUNNING", run.info.start_time)
     logger.info("MLflow run started: %s (tracking_uri=%s)", run.info.run_id, tracking_uri)
     return run
 
 
 def log_params(params: Dict[str, Any]) -> None:
+    import mlflow
+
     mlflow.log_params(params)
+    run_id = _active_run_id()
+    if run_id:
+        _index("log_params", run_id, params)
     logger.info("Logged parameters to MLflow.")
 
 
 def log_metrics(metrics: Dict[str, float]) -> None:
+    import mlflow
+
     mlflow.log_metrics(metrics)
+    run_id = _active_run_id()
+    if run_id:
+        _index("log_metrics", run_id, metrics)
     logger.info("Logged metrics to MLflow.")
 
 
 def log_metrics_to_run(run_id: str, metrics: Dict[str, float]) -> None:
+    from mlflow.tracking import MlflowClient
+
     client = MlflowClient()
     for key, value in metrics.items():
         client.log_metric(run_id=run_id, key=key, value=value)
+    _index("log_metrics", run_id, metrics)
     logger.info("Logged metrics to MLflow run %s.", run_id)
 
 
 def log_artifact(path: str) -> None:
+    import mlflow
+
     mlflow.log_artifact(path)
     logger.info("Logged artifact: %s", path)
 
 
+def log_artifact_to_run(run_id: str, path: str, artifact_path: str | None = None) -> None:
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient()
+    client.log_artifact(run_id=run_id, local_path=path, artifact_path=artifact_path)
+    logger.info("Logged artifact %s to MLflow run %s (dest=%s).", path, run_id, artifact_path)
+
+
 def log_artifacts_to_run(run_id: str, artifact_path: str, path: str) -> None:
+    from mlflow.tracking import MlflowClient
+
     client = MlflowClient()
     client.log_artifacts(run_id=run_id, local_dir=path, artifact_path=artifact_path)
     logger.info("Logged artifacts from %s to MLflow run %s (dest=%s).", path, run_id, artifact_path)
 
 
+def log_artifacts_dedup(run_id: str, artifact_path: str, path: str) -> None:
+    """Log a directory as a manifest over content-addressed blobs (see ``artifact_store``).
+
+    Falls back to a plain upload when ``MLOPS_ARTIFACT_DEDUP`` is off.
+    """
+    if not _as_bool(os.getenv("MLOPS_ARTIFACT_DEDUP"), True):
+        log_artifacts_to_run(run_id, artifact_path, path)
+        return
+    from src.utils.artifact_store import log_artifacts_dedup as _log_dedup
+
+    _log_dedup(run_id, artifact_path, path)
+
+
 def log_autogluon_model(run_id: str, predictor: Any, artifact_path: str) -> str:
-    """Log AutoGluon predictor if supported; otherwise fallback to artifacts."""
+    """Log AutoGluon predictor if supported; otherwise fallback to artifacts.
+
+    The fallback uploads the predictor files as-is (never a dedup manifest):
+    ``runs:/<id>/<artifact_path>`` is registered as the model version source and
+    must hold a loadable predictor.
+    """
     try:
         import mlflow.autogluon  # type: ignore
 
@@ -206,27 +282,55 @@ def log_autogluon_model(run_id: str, predictor: Any, artifact_path: str) -> str:
         return model_uri
     except Exception as exc:  # pragma: no cover - defensive
         logger.warning("mlflow.autogluon logging failed (%s); falling back to raw artifacts.", exc)
-        predictor_path = predictor.path
-        log_artifacts_to_run(run_id, artifact_path=artifact_path, path=predictor_path)
+        log_artifacts_to_run(run_id, artifact_path=artifact_path, path=predictor.path)
         return f"runs:/{run_id}/{artifact_path}"
 
 
 def register_model(model_uri: str, name: str, run_id: str | None = None) -> str:
+    from mlflow.tracking import MlflowClient
+
     client = MlflowClient()
     try:
         client.get_registered_model(name)
     except Exception:
         client.create_registered_model(name)
     version = client.create_model_version(name=name, source=model_uri, run_id=run_id)
+    _index("record_model_version", name, version.version, run_id)
     logger.info("Created model version: %s v%s", name, version.version)
     return version.version
 
 
+def set_model_alias(name: str, alias: str, version: str) -> None:
+    """Point a registered model alias (e.g. ``champion``) at ``version``."""
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient()
+    try:
+        client.set_registered_model_alias(name=name, alias=alias, version=version)
+        _index("set_alias", name, alias, version)
+        logger.info("Alias %s of %s now points at v%s.", alias, name, version)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("Failed to set alias %s on %s v%s: %s", alias, name, version, exc)
+
+
+def end_active_run() -> None:
+    """End the fluent-API active run, if any."""
+    import mlflow
+
+    run_id = _active_run_id()
+    mlflow.end_run()
+    if run_id:
+        _index("end_run", run_id, "FINISHED")
+
+
 def end_run(run_id: str, status: str = "FINISHED") -> None:
     """Terminate a run by id to avoid dangling active runs."""
+    from mlflow.tracking import MlflowClient
+
     client = MlflowClient()
     try:
         client.set_terminated(run_id=run_id, status=status)
+        _index("end_run", run_id, status)
         logger.info("MLflow run %s marked as %s.", run_id, status)
     except Exception as exc:  # pragma: no cover - defensive
         logger.warning("Failed to terminate MLflow run %s: %s", run_id, exc)
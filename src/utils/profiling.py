@@ -0,0 +1,253 @@
+"""Stage and sub-step timing instrumentation with optional cProfile dumps."""
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_STAGE: contextvars.ContextVar[str | None] = contextvars.ContextVar("profiling_stage", default=None)
+_STAGE_THREAD: contextvars.ContextVar[int | None] = contextvars.ContextVar("profiling_stage_thread", default=None)
+_records: List["TimingRecord"] = []
+_records_lock = threading.Lock()
+_profile_dir: Path | None = None
+
+
+@dataclass
+class TimingRecord:
+    name: str
+    stage: str | None
+    wall_s: float
+    cpu_s: float
+    # ru_maxrss is a process-lifetime high-water mark: a later step reports an
+    # earlier step's peak, so the growth during the step is recorded separately.
+    process_peak_rss_mb: float
+    peak_rss_growth_mb: float | None
+    read_bytes: int | None
+    write_bytes: int | None
+    # A sub-step run on a worker thread next to its siblings: cpu_s is that
+    # thread's CPU time and the process-wide I/O and RSS growth are not recorded.
+    concurrent: bool = False
+
+    @property
+    def key(self) -> str:
+        if self.stage and self.stage != self.name:
+            return f"{self.stage}.{self.name}"
+        return self.name
+
+
+def _io_counters() -> Tuple[int, int]:
+    """Bytes read/written by this process (page cache included), 0 when unavailable."""
+    proc_io = Path("/proc/self/io")
+    if proc_io.exists():
+        values = dict(
+            line.split(": ", 1) for line in proc_io.read_text(encoding="ascii").splitlines() if ": " in line
+        )
+        return int(values.get("rchar", 0)), int(values.get("wchar", 0))
+    try:
+        import psutil  # type: ignore
+
+        counters = psutil.Process().io_counters()
+        return int(counters.read_bytes), int(counters.write_bytes)
+    except Exception:
+        return 0, 0
+
+
+def _peak_rss_mb() -> float:
+    """Process high-water resident set size in MiB."""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS reports bytes.
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        try:
+            import psutil  # type: ignore
+
+            info = psutil.Process().memory_info()
+            return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+
+@contextmanager
+def _measure(name: str, stage: str | None, concurrent: bool = False) -> Iterator[None]:
+    cpu_clock = time.thread_time if concurrent else time.process_time
+    read_start, write_start = _io_counters()
+    peak_start = _peak_rss_mb()
+    cpu_start = cpu_clock()
+    wall_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        read_end, write_end = _io_counters()
+        peak_end = _peak_rss_mb()
+        record = TimingRecord(
+            name=name,
+            stage=stage,
+            wall_s=time.perf_counter() - wall_start,
+            cpu_s=cpu_clock() - cpu_start,
+            process_peak_rss_mb=peak_end,
+            peak_rss_growth_mb=None if concurrent else peak_end - peak_start,
+            read_bytes=None if concurrent else read_end - read_start,
+            write_bytes=None if concurrent else write_end - write_start,
+            concurrent=concurrent,
+        )
+        with _records_lock:
+            _records.append(record)
+        logger.debug(
+            "Timing %s: wall=%.3fs cpu=%.3fs%s process_peak_rss=%.1fMiB",
+            record.key,
+            record.wall_s,
+            record.cpu_s,
+            " (thread)" if concurrent else "",
+            record.process_peak_rss_mb,
+            extra={"timing": asdict(record)},
+        )
+
+
+def enable_profiling(output_dir: str | Path) -> None:
+    """Dump a cProfile of every subsequent ``stage_timer`` block into ``output_dir``.
+
+    cProfile only sees the thread that enabled it, so sub-steps running on
+    worker threads get their own ``<stage>.<substep>.prof`` dump.
+    """
+    global _profile_dir
+    _profile_dir = Path(output_dir)
+    _profile_dir.mkdir(parents=True, exist_ok=True)
+
+
+def _dump_profile(profiler: cProfile.Profile, name: str) -> None:
+    assert _profile_dir is not None
+    prof_path = _profile_dir / f"{name}.prof"
+    profiler.dump_stats(str(prof_path))
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(40)
+    (_profile_dir / f"{name}.txt").write_text(summary.getvalue(), encoding="utf-8")
+    logger.info("cProfile output for %s written to %s", name, prof_path)
+
+
+@contextmanager
+def _profiled(name: str) -> Iterator[None]:
+    """cProfile the calling thread for the block when profiling is enabled."""
+    if _profile_dir is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as exc:  # Python 3.12+ allows one active profiler per process
+        logger.debug("cProfile for %s skipped: %s", name, exc)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _dump_profile(profiler, name)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time a top-level pipeline stage; sub-steps inside it are attributed to it."""
+    token = _STAGE.set(stage)
+    thread_token = _STAGE_THREAD.set(threading.get_ident())
+    try:
+        with _measure(stage, stage), _profiled(stage):
+            yield
+    finally:
+        _STAGE_THREAD.reset(thread_token)
+        _STAGE.reset(token)
+
+
+@contextmanager
+def substep(name: str) -> Iterator[None]:
+    """Time a named sub-step (e.g. ``csv_read``, ``fit``) of the active stage.
+
+    Off the stage's thread (e.g. ``run_pipelines._run_parallel``) the sub-step
+    is recorded as concurrent and profiled on its own.
+    """
+    stage = _STAGE.get()
+    stage_thread = _STAGE_THREAD.get()
+    if stage_thread is None or stage_thread == threading.get_ident():
+        with _measure(name, stage):
+            yield
+        return
+    with _measure(name, stage, concurrent=True), _profiled(f"{stage}.{name}"):
+        yield
+
+
+def timed(name: str | None = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of ``substep``; defaults to the function name."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with substep(name or func.__name__):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_records() -> List[TimingRecord]:
+    with _records_lock:
+        return list(_records)
+
+
+def reset_records() -> None:
+    """Drop recorded timings (a reused worker process starts each job clean)."""
+    with _records_lock:
+        _records.clear()
+
+
+def timing_metrics() -> Dict[str, float]:
+    """Flatten recorded timings into MLflow-friendly metric names."""
+    metrics: Dict[str, float] = {}
+
+    def _add(name: str, value: float | None) -> None:
+        if value is not None:
+            metrics[name] = metrics.get(name, 0.0) + value
+
+    for record in get_records():
+        prefix = f"timing.{record.key}"
+        _add(f"{prefix}.wall_s", record.wall_s)
+        _add(f"{prefix}.thread_cpu_s" if record.concurrent else f"{prefix}.cpu_s", record.cpu_s)
+        metrics[f"{prefix}.process_peak_rss_mb"] = max(
+            metrics.get(f"{prefix}.process_peak_rss_mb", 0.0), record.process_peak_rss_mb
+        )
+        _add(f"{prefix}.peak_rss_growth_mb", record.peak_rss_growth_mb)
+        _add(f"{prefix}.read_bytes", record.read_bytes)
+        _add(f"{prefix}.write_bytes", record.write_bytes)
+    return metrics
+
+
+def write_timing_report(output_path: str | Path) -> Path:
+    """Persist every recorded timing as JSON."""
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "pid": os.getpid(),
+        "records": [{**asdict(r), "key": r.key} for r in get_records()],
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    logger.info("Timing report written to %s", path)
+    return path